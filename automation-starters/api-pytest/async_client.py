@@ -0,0 +1,212 @@
+"""Asyncio client for the Processing API.
+
+All requests share one aiohttp connection pool with keep-alive enabled, so a
+single test can submit and track hundreds of jobs concurrently without
+paying a TCP handshake per request. The network layer is a small transport
+object (`send(method, url, headers, body)`), which lets the in-process
+stand-in replace TCP entirely.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+import aiohttp
+from requests.structures import CaseInsensitiveDict
+
+from config import config
+
+RawResponse = Tuple[int, Mapping[str, str], bytes]
+STATUS_QUERY_GET_MAX = 100  # ids the server takes in a GET /api/v1/qa/status query string
+
+
+class ApiError(Exception):
+    """Raised by ApiResponse.raise_for_status for 4xx/5xx responses"""
+
+    def __init__(self, response: "ApiResponse"):
+        super().__init__(f"{response.status_code} for {response.method} {response.url}: {response.text}")
+        self.response = response
+
+
+class ApiResponse:
+    """Fully read response with the parts of the requests.Response API tests use"""
+
+    __slots__ = ("status_code", "headers", "content", "method", "url", "elapsed")
+
+    def __init__(
+        self, status_code: int, headers: Mapping[str, str], content: bytes, method: str, url: str, elapsed: float
+    ):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.method = method
+        self.url = url
+        self.elapsed = elapsed  # seconds from send to fully read body
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise ApiError(self)
+
+
+class AiohttpTransport:
+    """Pooled keep-alive TCP transport"""
+
+    def __init__(self, max_connections: int, keepalive_expiry: float, timeout: float):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def send(self, method: str, url: str, headers: Dict[str, str], body: bytes) -> RawResponse:
+        if self._session is None:
+            # Created lazily so it binds to the loop the requests run on
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections, keepalive_timeout=self.keepalive_expiry
+                ),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout),
+            )
+        async with self._session.request(method, url, headers=headers, data=body or None) as response:
+            return response.status, response.headers, await response.read()
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncApiClient:
+    """Async counterpart of the `session` fixture with a pooled transport"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        token: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        transport=None,
+    ):
+        self.base_url = base_url or config.base_url
+        self.token = token
+        self.max_connections = max_connections or config.max_connections
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+
+        self._owns_transport = transport is None
+        self.transport = transport or AiohttpTransport(
+            self.max_connections, config.keepalive_expiry, config.request_timeout
+        )
+        # Caps in-flight requests at the pool size so bulk helpers queue
+        # locally instead of piling onto the connector.
+        self._slots = asyncio.Semaphore(self.max_connections)
+        # Called with every ApiResponse, e.g. by the latency plugin
+        self.hooks: List[Callable[[ApiResponse], None]] = []
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_transport:
+            await self.transport.aclose()
+
+    def auth_headers(self, token: Optional[str] = None) -> Dict[str, str]:
+        """Authorization header for the given token, or the client's own"""
+        token = token or self.token
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        token: Optional[str] = None,
+        json_body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> ApiResponse:
+        """Send a request, attaching the bearer token unless headers override it"""
+        url = self.base_url + path
+        all_headers = {**self.headers, **self.auth_headers(token), **(headers or {})}
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+        async with self._slots:
+            started = time.perf_counter()
+            status, response_headers, content = await self.transport.send(method, url, all_headers, body)
+            elapsed = time.perf_counter() - started
+        response = ApiResponse(status, response_headers, content, method, url, elapsed)
+        for hook in self.hooks:
+            hook(response)
+        return response
+
+    # Authentication
+
+    async def login(self, email: str, password: str) -> ApiResponse:
+        return await self.request(
+            "POST", "/api/v1/auth/login", json_body={"email": email, "password": password}
+        )
+
+    async def logout(self, token: Optional[str] = None) -> ApiResponse:
+        return await self.request("POST", "/api/v1/auth/logout", token=token)
+
+    # Question & Answer
+
+    async def submit_question(self, question: str, company: str, token: Optional[str] = None) -> ApiResponse:
+        return await self.request(
+            "POST", "/api/v1/qa", token=token, json_body={"question": question, "company": company}
+        )
+
+    async def submit_batch(self, items: Iterable[Dict[str, str]], token: Optional[str] = None) -> ApiResponse:
+        """Submit up to 100 {question, company} items in one request; results come back in order"""
+        return await self.request("POST", "/api/v1/qa/batch", token=token, json_body={"items": list(items)})
+
+    async def get_job(
+        self, job_id: str, token: Optional[str] = None, wait_for: Optional[str] = None,
+        timeout: Optional[int] = None,
+    ) -> ApiResponse:
+        """Job status; with wait_for ("terminal" or "change") the server holds the request.
+
+        Keep `timeout` (server seconds, default 15) below TestConfig.request_timeout.
+        """
+        params = {k: v for k, v in (("waitFor", wait_for), ("timeout", timeout)) if v is not None}
+        query = f"?{urlencode(params)}" if params else ""
+        return await self.request("GET", f"/api/v1/qa/{job_id}{query}", token=token)
+
+    async def get_statuses(
+        self, job_ids: Iterable[str], changed_since: Optional[str] = None, token: Optional[str] = None
+    ) -> ApiResponse:
+        """Status of many jobs in one request: GET for up to 100 ids, POST beyond (max 1000).
+
+        Pass the previous response's `asOf` as `changed_since` to get only jobs that moved.
+        """
+        ids = list(job_ids)
+        if len(ids) > STATUS_QUERY_GET_MAX:
+            body = {"ids": ids, **({"changedSince": changed_since} if changed_since else {})}
+            return await self.request("POST", "/api/v1/qa/status", token=token, json_body=body)
+        params = {"ids": ",".join(ids), **({"changedSince": changed_since} if changed_since else {})}
+        return await self.request("GET", f"/api/v1/qa/status?{urlencode(params)}", token=token)
+
+    async def get_answers(
+        self, token: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> ApiResponse:
+        """Newest page of the user's answer history; pass nextCursor back for the next one"""
+        params = {k: v for k, v in (("limit", limit), ("cursor", cursor)) if v is not None}
+        query = f"?{urlencode(params)}" if params else ""
+        return await self.request("GET", f"/api/v1/qa{query}", token=token)
+
+    # Bulk helpers
+
+    async def submit_many(self, items: Iterable[Dict[str, str]], token: Optional[str] = None) -> List[ApiResponse]:
+        """Submit every {question, company} item concurrently, preserving order"""
+        return await asyncio.gather(
+            *(self.submit_question(item["question"], item["company"], token=token) for item in items)
+        )
+
+    async def get_many(self, job_ids: Iterable[str], token: Optional[str] = None) -> List[ApiResponse]:
+        """Fetch the status of every job concurrently, preserving order"""
+        return await asyncio.gather(*(self.get_job(job_id, token=token) for job_id in job_ids))
@@ -0,0 +1,323 @@
+"""Record/replay cassettes for the API test session.
+
+In record mode every request/response pair sent through the `session`
+fixture or an async client fixture, plus every message received by
+JobWaiter's WebSocket, is written to one gzipped JSON cassette per test. In
+replay mode the same fixtures are served from the cassette without touching
+the server, with recorded delays multiplied by a time scale (0 by default),
+so a test that waited 10s for job processing replays in milliseconds.
+
+A streamed response (the SSE job stream) may never end, so its body is not
+read up front: what the caller consumed is recorded when it closes the
+response, and replayed as the whole body.
+
+Requests are matched on method, path with query and a hash of the body.
+Repeated identical requests (status polls) are answered in recorded order,
+and the last answer is repeated once the recording runs out. A request
+missing from the test's own cassette is looked up in every other cassette,
+which covers logins that TokenCache made during a different test.
+
+A cassette recorded against another version of docs/api-spec.yaml, or a
+missing one, is re-recorded automatically in replay mode, which needs the
+server to be reachable for that test.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Hop-by-hop and volatile headers are not worth storing
+SKIPPED_HEADERS = {"date", "connection", "keep-alive", "transfer-encoding", "content-length"}
+REPLAY_HEADER = "X-Cassette"
+
+Key = Tuple[str, str, str]
+
+
+def request_key(method: str, url: str, body: bytes) -> Key:
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return method.upper(), path, hashlib.sha1(body or b"").hexdigest()[:16]
+
+
+class Cassette:
+    """Interactions and WebSocket messages recorded for one test"""
+
+    def __init__(self, path: Path, spec_hash: str):
+        self.path = path
+        self.spec_hash = spec_hash
+        self.interactions: List[dict] = []
+        self.websocket: List[dict] = []
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            data = json.load(handle)
+        cassette = cls(path, data["spec_hash"])
+        cassette.interactions = data["interactions"]
+        cassette.websocket = data["websocket"]
+        return cassette
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"spec_hash": self.spec_hash, "interactions": self.interactions, "websocket": self.websocket}
+        with gzip.open(self.path, "wt", encoding="utf-8") as handle:
+            json.dump(data, handle, separators=(",", ":"))
+
+    def queues(self) -> Dict[Key, Deque[dict]]:
+        queues: Dict[Key, Deque[dict]] = {}
+        for interaction in self.interactions:
+            queues.setdefault(tuple(interaction["key"]), deque()).append(interaction)
+        return queues
+
+
+class CassetteManager:
+    """Switches the client fixtures between recording and replaying per test"""
+
+    def __init__(self, directory: Path, mode: str, spec_hash: str, time_scale: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.spec_hash = spec_hash
+        self.time_scale = time_scale
+        self.cassette: Optional[Cassette] = None
+        self.replaying = False
+        self._queues: Dict[Key, Deque[dict]] = {}
+        self._fallback: Optional[Dict[Key, dict]] = None
+        self._started = 0.0
+
+    def path_for(self, test_id: str) -> Path:
+        return self.directory / (re.sub(r"[^\w.-]+", "_", test_id) + ".json.gz")
+
+    def start(self, test_id: str) -> None:
+        path = self.path_for(test_id)
+        self.replaying = False
+        if self.mode == "replay" and path.is_file():
+            cassette = Cassette.load(path)
+            self.replaying = cassette.spec_hash == self.spec_hash
+        if self.replaying:
+            self.cassette = cassette
+            self._queues = cassette.queues()
+        else:
+            self.cassette = Cassette(path, self.spec_hash)
+        self._started = time.monotonic()
+
+    def stop(self) -> None:
+        if self.cassette is not None and not self.replaying:
+            self.cassette.save()
+        self.cassette = None
+        self.replaying = False
+
+    # Recording
+
+    def record(self, method: str, url: str, body: bytes, status: int, headers, content: bytes, elapsed: float) -> None:
+        if self.cassette is None:
+            return
+        self.cassette.interactions.append({
+            "key": list(request_key(method, url, body)),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in SKIPPED_HEADERS},
+            "body": content.decode("utf-8", errors="replace"),
+            "elapsed": round(elapsed, 6),
+        })
+
+    def record_message(self, message: str) -> None:
+        if self.cassette is not None:
+            self.cassette.websocket.append({"at": round(time.monotonic() - self._started, 6), "message": message})
+
+    # Replaying
+
+    def lookup(self, method: str, url: str, body: bytes) -> dict:
+        key = request_key(method, url, body)
+        queue = self._queues.get(key)
+        if queue:
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+        if self._fallback is None:
+            self._fallback = {}
+            for path in sorted(self.directory.glob("*.json.gz")):
+                cassette = Cassette.load(path)
+                if cassette.spec_hash == self.spec_hash:
+                    for interaction in cassette.interactions:
+                        self._fallback.setdefault(tuple(interaction["key"]), interaction)
+        if key in self._fallback:
+            return self._fallback[key]
+        raise LookupError(f"No recorded response for {method} {url} in {self.cassette.path.name}")
+
+    def delay(self, seconds: float) -> float:
+        return seconds * self.time_scale
+
+    # Client integration
+
+    def wrap_adapter(self, inner: BaseAdapter) -> "CassetteAdapter":
+        return CassetteAdapter(self, inner)
+
+    def wrap_transport(self, inner) -> "CassetteTransport":
+        return CassetteTransport(self, inner)
+
+    def websocket_connect(self, connect):
+        """Wrap a websockets-style connect() so JobWaiter's socket is recorded or replayed"""
+        async def cassette_connect(url: str):
+            if self.replaying:
+                if not self.cassette.websocket:
+                    raise OSError("No WebSocket traffic recorded for this test")
+                return ReplayWebSocket(self, self.cassette.websocket)
+            return RecordingWebSocket(self, await connect(url))
+        return cassette_connect
+
+
+class CassetteAdapter(BaseAdapter):
+    """requests adapter that records through, or replays instead of, another adapter"""
+
+    def __init__(self, manager: CassetteManager, inner: BaseAdapter):
+        super().__init__()
+        self.manager = manager
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        if not self.manager.replaying:
+            started = time.perf_counter()
+            response = self.inner.send(request, **kwargs)
+            elapsed = time.perf_counter() - started
+            if kwargs.get("stream"):
+                self._record_on_close(request, body, response, elapsed)
+            else:
+                self.manager.record(
+                    request.method, request.url, body, response.status_code, response.headers,
+                    response.content, elapsed,
+                )
+            return response
+
+        interaction = self.manager.lookup(request.method, request.url, body)
+        time.sleep(self.manager.delay(interaction["elapsed"]))
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.headers = CaseInsensitiveDict({**interaction["headers"], REPLAY_HEADER: "replay"})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = interaction["body"].encode("utf-8")
+        response._content_consumed = True  # body is in memory, also for stream=True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def _record_on_close(self, request, body: bytes, response: requests.Response, elapsed: float) -> None:
+        """Record the part of a streamed body the caller read, once it closes the response"""
+        chunks: List[bytes] = []
+        iter_content, close = response.iter_content, response.close
+
+        def recording_iter_content(*args, **kwargs):
+            for chunk in iter_content(*args, **kwargs):
+                chunks.append(chunk.encode(response.encoding or "utf-8") if isinstance(chunk, str) else chunk)
+                yield chunk
+
+        def recording_close():
+            close()
+            if response.iter_content is recording_iter_content:
+                response.iter_content, response.close = iter_content, close
+                self.manager.record(
+                    request.method, request.url, body, response.status_code, response.headers,
+                    b"".join(chunks), elapsed,
+                )
+
+        # iter_lines(), .content and the context manager all go through these
+        response.iter_content, response.close = recording_iter_content, recording_close
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class CassetteTransport:
+    """AsyncApiClient transport that records through, or replays instead of, another transport"""
+
+    def __init__(self, manager: CassetteManager, inner):
+        self.manager = manager
+        self.inner = inner
+
+    async def send(self, method: str, url: str, headers: Dict[str, str], body: bytes):
+        if not self.manager.replaying:
+            started = time.perf_counter()
+            status, response_headers, content = await self.inner.send(method, url, headers, body)
+            self.manager.record(method, url, body, status, response_headers, content, time.perf_counter() - started)
+            return status, response_headers, content
+
+        interaction = self.manager.lookup(method, url, body)
+        await asyncio.sleep(self.manager.delay(interaction["elapsed"]))
+        headers = {**interaction["headers"], REPLAY_HEADER: "replay"}
+        return interaction["status"], headers, interaction["body"].encode("utf-8")
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class RecordingWebSocket:
+    """Proxies a live socket, logging every received message"""
+
+    def __init__(self, manager: CassetteManager, ws):
+        self.manager = manager
+        self.ws = ws
+
+    async def send(self, message: str) -> None:
+        await self.ws.send(message)
+
+    async def recv(self) -> str:
+        message = await self.ws.recv()
+        self.manager.record_message(message)
+        return message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        # ConnectionClosed propagates exactly as it would from the live socket
+        return await self.recv()
+
+    async def close(self) -> None:
+        await self.ws.close()
+
+
+class ReplayWebSocket:
+    """Plays recorded messages back with compressed timing"""
+
+    def __init__(self, manager: CassetteManager, messages: List[dict]):
+        self.manager = manager
+        self.messages = deque(messages)
+        self._last_at = 0.0
+        self._closed = asyncio.Event()
+
+    async def send(self, message: str) -> None:
+        pass
+
+    async def recv(self) -> str:
+        if not self.messages:
+            # Like a live socket with nothing more to say: block until closed
+            await self._closed.wait()
+            raise StopAsyncIteration
+        entry = self.messages.popleft()
+        await asyncio.sleep(self.manager.delay(max(entry["at"] - self._last_at, 0.0)))
+        self._last_at = entry["at"]
+        return entry["message"]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        return await self.recv()
+
+    async def close(self) -> None:
+        self._closed.set()
@@ -0,0 +1,64 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+# Configuration
+@dataclass
+class TestConfig:
+    __test__ = False  # not a test class, despite the name
+
+    base_url: str = os.getenv("BASE_URL", "http://localhost:3001")
+
+    # Start a private mock server per pytest-xdist worker (always on under
+    # xdist, opt in with SPAWN_MOCK_SERVER=1 for single-process runs)
+    spawn_server: bool = os.getenv("SPAWN_MOCK_SERVER") == "1"
+    node_bin: str = os.getenv("NODE_BIN", "node")
+
+    # "http" talks to a real server over TCP; "inprocess" serves requests from
+    # the Python stand-in in inprocess_api.py without touching the network
+    transport: str = os.getenv("API_TRANSPORT", "http")
+
+    # Cassettes: "off", "record" (always hit the server and save), or
+    # "replay" (serve saved responses, re-recording missing or stale ones)
+    cassette_mode: str = os.getenv("API_CASSETTES", "off")
+    cassette_dir: Path = Path(os.getenv("API_CASSETTE_DIR", Path(__file__).parent / "cassettes"))
+    # Multiplier for recorded delays on replay; 0 replays instantly
+    cassette_time_scale: float = float(os.getenv("API_CASSETTE_TIME_SCALE", "0"))
+
+    # Send If-None-Match on repeated GETs and fill 304s in from the client
+    # fixtures' ETag cache (http_cache.py); "0" always fetches full bodies
+    conditional_get: bool = os.getenv("API_CONDITIONAL_GET", "1") != "0"
+
+    # When set, every test reseeds the server's random streams with
+    # "<seed>:<test id>", so outcomes do not depend on test order
+    random_seed: Optional[str] = os.getenv("RANDOM_SEED")
+
+    # Per-user requests per minute the suite sets on the mock server for its
+    # duration; the concurrency examples alone exceed the documented 100.
+    # Empty keeps the server's own limit.
+    user_rate_limit: Optional[int] = int(os.getenv("API_USER_RATE_LIMIT", "1000") or 0) or None
+
+    # Answer cache size the suite sets on the mock server for its duration.
+    # 0 turns it off, so repeated example questions still run the whole job
+    # lifecycle; the `answer_cache` fixture turns it on for one test. Empty
+    # keeps the server's own cache.
+    answer_cache_entries: Optional[int] = (
+        None if os.getenv("API_ANSWER_CACHE_ENTRIES", "0") == "" else int(os.getenv("API_ANSWER_CACHE_ENTRIES", "0"))
+    )
+
+    # Test user credentials
+    analyst_email: str = "analyst@test.com"
+    analyst_password: str = "TestPass123!"
+    admin_email: str = "admin@test.com"
+    admin_password: str = "AdminPass123!"
+
+    # Async client connection pool
+    max_connections: int = 100
+    max_keepalive_connections: int = 100
+    keepalive_expiry: float = 30.0
+    request_timeout: float = 10.0
+
+
+config = TestConfig()
@@ -0,0 +1,260 @@
+import os
+
+import pytest
+import pytest_asyncio
+import requests
+import websockets
+
+from async_client import AsyncApiClient
+from cassette import CassetteManager
+from config import config
+from http_cache import ConditionalCache
+from inprocess_transport import InProcessServer
+from job_waiter import JobWaiter
+from mock_controls import MockAnswerCache, MockClock, MockRateLimits, MockScheduler, MockSeed
+from mock_server import MockServer
+from schema_validators import SchemaValidators
+from token_cache import TokenCache
+
+pytest_plugins = ["latency_plugin"]
+
+
+# Fixtures
+@pytest.fixture(scope="session")
+def inprocess_server():
+    """Python stand-in for the API when API_TRANSPORT=inprocess, else None"""
+    if config.transport != "inprocess":
+        yield None
+        return
+
+    server = InProcessServer()
+    try:
+        yield server
+    finally:
+        server.close()
+
+@pytest.fixture(scope="session", autouse=True)
+def api_server(tmp_path_factory, inprocess_server):
+    """Point the suite at a private mock server when running in parallel"""
+    if inprocess_server is not None:
+        config.base_url = inprocess_server.base_url
+        yield config.base_url
+        return
+
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if not (worker or config.spawn_server):
+        yield config.base_url
+        return
+
+    log_path = tmp_path_factory.getbasetemp() / f"mock-server-{worker or 'main'}.log"
+    server = MockServer(log_path, node_bin=config.node_bin)
+    config.base_url = server.start()
+    try:
+        yield config.base_url
+    finally:
+        server.stop()
+
+@pytest.fixture(scope="session")
+def cassettes(schemas):
+    """Record/replay manager when API_CASSETTES is record or replay, else None"""
+    if config.cassette_mode == "off":
+        return None
+    return CassetteManager(
+        config.cassette_dir, config.cassette_mode, schemas.spec_hash, config.cassette_time_scale
+    )
+
+@pytest.fixture(autouse=True)
+def cassette(request, cassettes):
+    """Points the client fixtures at this test's cassette"""
+    if cassettes is None:
+        yield None
+        return
+
+    cassettes.start(request.node.nodeid)
+    try:
+        yield cassettes.cassette
+    finally:
+        cassettes.stop()
+
+@pytest.fixture(scope="session")
+def http_cache():
+    """ETag cache shared by the client fixtures, or None with API_CONDITIONAL_GET=0"""
+    return ConditionalCache() if config.conditional_get else None
+
+@pytest.fixture(scope="session")
+def session(api_server, inprocess_server, latency_recorder, cassettes, http_cache):
+    """Create a requests session for reuse"""
+    session = requests.Session()
+    session.headers.update({
+        "Content-Type": "application/json",
+        "Accept": "application/json"
+    })
+    session.hooks["response"].append(latency_recorder.requests_hook)
+    if inprocess_server is not None:
+        session.mount(inprocess_server.base_url, inprocess_server.requests_adapter())
+        # Proxy settings never apply in-process; skip the per-request env scan
+        session.trust_env = False
+    if cassettes is not None:
+        session.mount(config.base_url, cassettes.wrap_adapter(session.get_adapter(config.base_url)))
+    if http_cache is not None:
+        session.mount(config.base_url, http_cache.wrap_adapter(session.get_adapter(config.base_url)))
+    return session
+
+@pytest.fixture(scope="session")
+def schemas():
+    """Validators compiled once from docs/api-spec.yaml components/schemas"""
+    return SchemaValidators()
+
+@pytest.fixture(scope="session")
+def token_cache(session, tmp_path_factory):
+    """Session-wide JWT cache, shared across pytest-xdist workers"""
+    def login(email, password):
+        response = session.post(
+            f"{config.base_url}/api/v1/auth/login",
+            json={"email": email, "password": password}
+        )
+        assert response.status_code == 200, f"Login failed: {response.text}"
+        return response.json()
+
+    shared_dir = None
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        # The parent of basetemp is common to every worker of one run
+        shared_dir = tmp_path_factory.getbasetemp().parent / "tokens"
+        shared_dir.mkdir(exist_ok=True)
+
+    return TokenCache(login, config.base_url, shared_dir=shared_dir)
+
+@pytest.fixture
+def analyst_token(token_cache):
+    """Get authentication token for analyst user"""
+    return token_cache.get(config.analyst_email, config.analyst_password)
+
+@pytest.fixture
+def admin_token(token_cache):
+    """Get authentication token for admin user"""
+    return token_cache.get(config.admin_email, config.admin_password)
+
+@pytest.fixture
+def auth_headers(analyst_token):
+    """Create authorization headers with analyst token"""
+    return {"Authorization": f"Bearer {analyst_token}"}
+
+@pytest.fixture
+def admin_headers(admin_token):
+    """Create authorization headers with admin token"""
+    return {"Authorization": f"Bearer {admin_token}"}
+
+@pytest.fixture
+def mock_clock(session, token_cache):
+    """Controls the server's virtual clock; restores its scale afterwards"""
+    with MockClock(session).saved() as clock:
+        try:
+            yield clock
+        finally:
+            if clock.advanced:
+                # Cached tokens may have expired in virtual time
+                token_cache.clear()
+
+@pytest.fixture
+def frozen_clock(mock_clock):
+    """Virtual clock that only moves through frozen_clock.advance(seconds)"""
+    mock_clock.freeze()
+    return mock_clock
+
+@pytest.fixture
+def mock_seed(session):
+    """Reseeds the server's per-subsystem random streams"""
+    return MockSeed(session)
+
+@pytest.fixture
+def rate_limits(session):
+    """Changes the server's rate limits; restores them afterwards"""
+    with MockRateLimits(session).saved() as limits:
+        yield limits
+
+@pytest.fixture
+def scheduler(session):
+    """Resizes the server's AIML worker pool and job queue; restores them afterwards"""
+    with MockScheduler(session).saved() as control:
+        yield control
+
+@pytest.fixture(scope="session", autouse=True)
+def suite_rate_limit(session, cassettes):
+    """Raises the per-user API limit to config.user_rate_limit for the session"""
+    if config.user_rate_limit is None or config.cassette_mode == "replay":
+        yield None
+        return
+
+    with MockRateLimits(session).saved() as limits:
+        limits.set("api", config.user_rate_limit)
+        yield limits
+
+@pytest.fixture(scope="session", autouse=True)
+def suite_answer_cache(session, cassettes):
+    """Sizes the server's answer cache to config.answer_cache_entries for the session"""
+    if config.answer_cache_entries is None or config.cassette_mode == "replay":
+        yield None
+        return
+
+    with MockAnswerCache(session).saved() as cache:
+        cache.set(config.answer_cache_entries)
+        yield cache
+
+@pytest.fixture
+def answer_cache(session, suite_answer_cache):
+    """An empty, enabled answer cache for one test; the suite's is put back afterwards"""
+    with MockAnswerCache(session).saved() as cache:
+        cache.set(1000)
+        yield cache
+
+@pytest.fixture(autouse=True)
+def seeded_random(request, cassette):
+    """With RANDOM_SEED set, gives each test its own reproducible random streams"""
+    if config.random_seed is None:
+        return None
+    seed = f"{config.random_seed}:{request.node.nodeid}"
+    MockSeed(request.getfixturevalue("session")).set(seed)
+    return seed
+
+# Async fixtures
+@pytest.fixture(scope="session")
+def async_transport(api_server, inprocess_server):
+    """Transport for the async clients (None means pooled TCP)"""
+    if inprocess_server is None:
+        return None
+    return inprocess_server.async_transport()
+
+def _instrument(client, latency_recorder, cassettes, http_cache):
+    client.hooks.append(latency_recorder.async_hook)
+    if cassettes is not None:
+        client.transport = cassettes.wrap_transport(client.transport)
+    if http_cache is not None:
+        client.transport = http_cache.wrap_transport(client.transport)
+    return client
+
+@pytest_asyncio.fixture
+async def async_client(async_transport, latency_recorder, cassettes, http_cache):
+    """Unauthenticated async client backed by a keep-alive connection pool"""
+    async with AsyncApiClient(transport=async_transport) as client:
+        yield _instrument(client, latency_recorder, cassettes, http_cache)
+
+@pytest_asyncio.fixture
+async def analyst_async_client(analyst_token, async_transport, latency_recorder, cassettes, http_cache):
+    """Async client that sends the analyst token on every request"""
+    async with AsyncApiClient(token=analyst_token, transport=async_transport) as client:
+        yield _instrument(client, latency_recorder, cassettes, http_cache)
+
+@pytest.fixture(scope="session")
+def websocket_connect(api_server, inprocess_server):
+    """websockets.connect, or its in-process equivalent with API_TRANSPORT=inprocess"""
+    return websockets.connect if inprocess_server is None else inprocess_server.websocket_connect
+
+@pytest_asyncio.fixture
+async def job_waiter(analyst_async_client, websocket_connect, cassettes):
+    """Tracks analyst jobs to completion over one WebSocket"""
+    connect = websocket_connect
+    if cassettes is not None:
+        connect = cassettes.websocket_connect(connect)
+    waiter = JobWaiter(analyst_async_client, connect=connect)
+    async with waiter:
+        yield waiter
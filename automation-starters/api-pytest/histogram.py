@@ -0,0 +1,106 @@
+"""Mergeable HDR-style latency histogram.
+
+Values are recorded in microseconds into log-linear buckets: exact below
+128us, then 64 sub-buckets per power of two, which keeps every bucket within
+about 1.6% of its true value. Recording is O(1), memory grows with the
+number of distinct buckets touched (a few hundred at most), and two
+histograms merge by adding bucket counts, so per-worker or per-interval
+histograms can be combined without keeping raw samples.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+
+
+def bucket_index(value: int) -> int:
+    if value < (1 << SUB_BUCKET_BITS):
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKET_HALF * shift + (value >> shift)
+
+
+def bucket_value(index: int) -> int:
+    """Highest value that maps to the bucket (reported percentiles never understate)"""
+    if index < (1 << SUB_BUCKET_BITS):
+        return index
+    shift = index // SUB_BUCKET_HALF - 1
+    return ((index - SUB_BUCKET_HALF * shift + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Sparse log-linear histogram of latencies in microseconds"""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+
+    def record(self, seconds: float) -> None:
+        value = max(int(seconds * 1_000_000), 0)
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentiles(self, pcts: Iterable[float]) -> List[float]:
+        """Values in milliseconds at each requested percentile"""
+        pcts = list(pcts)
+        if not self.count:
+            return [0.0 for _ in pcts]
+
+        targets = sorted((max(1, -(-pct * self.count // 100)), i) for i, pct in enumerate(pcts))
+        results = [0.0] * len(pcts)
+        seen = 0
+        pending = iter(targets)
+        target, slot = next(pending)
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while seen >= target:
+                results[slot] = min(bucket_value(index), self.max) / 1000
+                nxt = next(pending, None)
+                if nxt is None:
+                    return results
+                target, slot = nxt
+        return results
+
+    def summary(self) -> Dict[str, float]:
+        p50, p95, p99 = self.percentiles((50, 95, 99))
+        return {
+            "count": self.count,
+            "min": (self.min or 0) / 1000,
+            "mean": self.total / self.count / 1000 if self.count else 0.0,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "max": self.max / 1000,
+        }
+
+    def to_state(self) -> Tuple[List[Tuple[int, int]], int, int, Optional[int], int]:
+        """Plain-data form, safe to ship between pytest-xdist workers or write as JSON"""
+        return sorted(self.counts.items()), self.count, self.total, self.min, self.max
+
+    @classmethod
+    def from_state(cls, state) -> "LatencyHistogram":
+        histogram = cls()
+        counts, histogram.count, histogram.total, histogram.min, histogram.max = state
+        histogram.counts = {int(index): count for index, count in counts}
+        return histogram
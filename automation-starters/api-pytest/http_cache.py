@@ -0,0 +1,144 @@
+"""Conditional-GET cache for the client fixtures.
+
+GET responses that carry an ETag are kept, per URL and Authorization
+header, in a bounded LRU. The next GET of the same URL sends If-None-Match;
+a 304 is turned back into the cached 200 body, marked with an
+`X-Http-Cache: revalidated` header, so tests see the same response either
+way while the server skips building and sending the body. Requests that set
+If-None-Match themselves pass through untouched, so 304s stay testable, and
+so do streamed ones (SSE), whose body is never read here.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CACHE_HEADER = "X-Http-Cache"
+# Headers of a 304 that must not replace the cached body's own
+BODY_HEADERS = {"content-length", "content-type", "content-encoding", "transfer-encoding"}
+
+Key = Tuple[str, Optional[str]]
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    headers: Dict[str, str]
+    content: bytes
+
+
+class ConditionalCache:
+    """ETag-validated response bodies shared by a session and its async clients"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.revalidated = 0  # 304s answered from the cache
+        self._entries: "OrderedDict[Key, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, headers: Mapping[str, str]) -> Key:
+        return url, CaseInsensitiveDict(headers).get("Authorization")
+
+    def get(self, key: Key) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: Key, headers: Mapping[str, str], content: bytes) -> None:
+        headers = CaseInsensitiveDict(headers)
+        etag = headers.get("ETag")
+        if not etag:
+            return
+        with self._lock:
+            self._entries[key] = CachedResponse(etag, dict(headers), content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revalidate(self, entry: CachedResponse, headers: Mapping[str, str]) -> Dict[str, str]:
+        """Headers for the cached 200 standing in for a 304"""
+        with self._lock:
+            self.revalidated += 1
+        fresh = {k: v for k, v in headers.items() if k.lower() not in BODY_HEADERS}
+        return {**entry.headers, **fresh, CACHE_HEADER: "revalidated"}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # Client integration
+
+    def wrap_adapter(self, inner: BaseAdapter) -> "ConditionalAdapter":
+        return ConditionalAdapter(self, inner)
+
+    def wrap_transport(self, inner) -> "ConditionalTransport":
+        return ConditionalTransport(self, inner)
+
+
+def _conditional(method: str, headers: Mapping[str, str]) -> bool:
+    return method.upper() == "GET" and "If-None-Match" not in CaseInsensitiveDict(headers)
+
+
+class ConditionalAdapter(BaseAdapter):
+    """requests adapter adding If-None-Match to GETs and filling in 304 bodies"""
+
+    def __init__(self, cache: ConditionalCache, inner: BaseAdapter):
+        super().__init__()
+        self.cache = cache
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        if kwargs.get("stream") or not _conditional(request.method, request.headers):
+            return self.inner.send(request, **kwargs)
+
+        key = self.cache.key(request.url, request.headers)
+        entry = self.cache.get(key)
+        if entry is not None:
+            request.headers["If-None-Match"] = entry.etag
+        response = self.inner.send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            response.status_code = 200
+            response.reason = "OK"
+            response.headers = CaseInsensitiveDict(self.cache.revalidate(entry, response.headers))
+            response.encoding = get_encoding_from_headers(response.headers)
+            response._content = entry.content
+            response._content_consumed = True
+        elif response.status_code == 200 and "ETag" in response.headers:
+            self.cache.store(key, response.headers, response.content)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class ConditionalTransport:
+    """AsyncApiClient transport adding If-None-Match to GETs and filling in 304 bodies"""
+
+    def __init__(self, cache: ConditionalCache, inner):
+        self.cache = cache
+        self.inner = inner
+
+    async def send(self, method: str, url: str, headers: Dict[str, str], body: bytes):
+        if not _conditional(method, headers):
+            return await self.inner.send(method, url, headers, body)
+
+        key = self.cache.key(url, headers)
+        entry = self.cache.get(key)
+        if entry is not None:
+            headers = {**headers, "If-None-Match": entry.etag}
+        status, response_headers, content = await self.inner.send(method, url, headers, body)
+
+        if status == 304 and entry is not None:
+            return 200, self.cache.revalidate(entry, response_headers), entry.content
+        if status == 200:
+            self.cache.store(key, response_headers, content)
+        return status, response_headers, content
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
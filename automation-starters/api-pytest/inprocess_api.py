@@ -0,0 +1,1475 @@
+"""In-process Python stand-in for the Processing API.
+
+ProcessingApiApp is a plain ASGI application that mirrors mock-api/server.js
+for the endpoints in docs/api-spec.yaml: login, logout, POST/GET /api/v1/qa,
+the admin CSV upload and /aiml/answer. Behaviour (status codes, error bodies,
+processing delays, random failures, rate limits) follows server.js so the
+same tests pass against either. The WebSocket feed is served as an ASGI
+websocket session with the same auth handshake, and job updates reach only
+the owner's authenticated sockets. The SSE stream
+keeps the same per-user replay buffer but, since responses are not
+streamed, answers with the backlog after Last-Event-ID and ends, which an
+EventSource treats as a reconnect.
+
+Job timers, timestamps, the AIML rate-limit window and JWT expiry run on a
+VirtualClock scaled by CLOCK_SCALE and controlled through /mock/clock, like
+the Node server. Randomness comes from the same seeded per-subsystem
+streams (RANDOM_SEED, /mock/seed), bit for bit, so one seed yields the same
+delays, failures and answers from either implementation. Jobs live in the
+same bounded JobStore (TTL after finishing, LRU cap, 410 for evicted ids).
+"""
+import asyncio
+import base64
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import jwt
+
+JWT_SECRET = "test-secret-key-for-assignment"
+TOKEN_TTL_SECONDS = 3600
+AIML_RATE_LIMIT = 10  # documented /aiml/answer requests per minute, per client
+MAX_UPLOAD_BYTES = 2 * 1024 * 1024
+MAX_QUESTION_LENGTH = 10000
+RANDOM_STREAMS = ("jobTiming", "jobFailures", "answers", "confidence", "aiml", "aimlRetries")
+SSE_REPLAY_LIMIT = 100  # events kept per user
+SSE_RETRY_MS = 3000
+JOB_OVERHEAD_BYTES = 200  # matches server.js's per-entry estimate
+ANSWER_PAGE_SIZE = 10
+STATUS_QUERY_GET_MAX = 100  # ids per GET /api/v1/qa/status
+STATUS_QUERY_POST_MAX = 1000  # ids per POST /api/v1/qa/status
+LONG_POLL_MAX_SECONDS = 30  # longest ?timeout= for GET /api/v1/qa/{jobId}?waitFor=
+LONG_POLL_DEFAULT_SECONDS = 15
+LONG_POLL_CONDITIONS: Dict[str, Callable[[dict, str], bool]] = {
+    "terminal": lambda job, initial: job["status"] in ("done", "failed"),
+    "change": lambda job, initial: job["status"] != initial,
+}
+WAIT_SAMPLES = 1024  # recent queue waits kept for the p95
+AIML_TIMEOUT = 8.0  # seconds, covering every attempt of one AIML call
+AIML_RETRY_BASE = 0.5  # first backoff in seconds; doubles per attempt, with jitter
+# Simulated job timing in virtual seconds (server.js JOB_HANDOFF_*, AIML_RESPONSE_*, AIML_STALL_RATE)
+JOB_HANDOFF_MIN = 1.0
+JOB_HANDOFF_SPREAD = 2.0
+AIML_RESPONSE_MIN = 0.5
+AIML_RESPONSE_SPREAD = 1.0
+AIML_STALL_RATE = 0.1
+# Mean worker time per job under that model, before retries
+EXPECTED_SERVICE_TIME = (
+    JOB_HANDOFF_MIN + JOB_HANDOFF_SPREAD / 2
+    + (1 - AIML_STALL_RATE) * (AIML_RESPONSE_MIN + AIML_RESPONSE_SPREAD / 2)
+    + AIML_STALL_RATE * AIML_TIMEOUT
+)
+UUID_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$", re.IGNORECASE
+)
+
+
+def iso_time(seconds: float) -> str:
+    """Epoch seconds formatted like JavaScript's Date.toISOString()"""
+    moment = datetime.fromtimestamp(seconds, timezone.utc)
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def parse_iso_time(text: Any) -> Optional[float]:
+    """ISO 8601 timestamp -> epoch seconds (UTC unless offset), None if unparseable"""
+    if not isinstance(text, str):
+        return None
+    try:
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00").replace("z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+_U32 = 0xFFFFFFFF
+
+
+def _imul(a: int, b: int) -> int:
+    """Math.imul on unsigned 32-bit values"""
+    return (a * b) & _U32
+
+
+def xmur3(text: str) -> int:
+    """32-bit string hash, as xmur3 in server.js"""
+    h = 1779033703 ^ len(text)
+    for char in text:
+        h = _imul(h ^ ord(char), 3432918353)
+        h = ((h << 13) & _U32) | (h >> 19)
+    h = _imul(h ^ (h >> 16), 2246822507)
+    h = _imul(h ^ (h >> 13), 3266489909)
+    return h ^ (h >> 16)
+
+
+class Mulberry32:
+    """mulberry32 PRNG; the same seed gives the same floats as server.js"""
+
+    __slots__ = ("state",)
+
+    def __init__(self, seed: int):
+        self.state = seed & _U32
+
+    def random(self) -> float:
+        self.state = (self.state + 0x6D2B79F5) & _U32
+        state = self.state
+        t = _imul(state ^ (state >> 15), 1 | state)
+        t = ((t + _imul(t ^ (t >> 7), 61 | t)) & _U32) ^ t
+        return (t ^ (t >> 14)) / 4294967296
+
+
+def seeded_streams(seed: str) -> Dict[str, Mulberry32]:
+    return {name: Mulberry32(xmur3(f"{seed}:{name}")) for name in RANDOM_STREAMS}
+
+
+class VirtualClock:
+    """Scalable, freezable clock driving the app's timers (server.js VirtualClock)"""
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+        self._real_base = time.time()
+        self._virtual_base = self._real_base
+        self.timers: List[Tuple[float, int, Callable[[], None]]] = []  # heap of (due, seq, fn)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def now(self) -> float:
+        """Virtual epoch seconds"""
+        return self._virtual_base + (time.time() - self._real_base) * self.scale
+
+    def iso(self) -> str:
+        return iso_time(self.now())
+
+    def _rebase(self, virtual_now: float) -> None:
+        self._real_base = time.time()
+        self._virtual_base = virtual_now
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Tuple[float, int, Callable[[], None]]:
+        """Run callback after `delay` virtual seconds; must be called on the app loop.
+        Returns a handle for cancel()."""
+        entry = (self.now() + delay, next(self._seq), callback)
+        heapq.heappush(self.timers, entry)
+        if self.timers[0] is entry:
+            self._schedule()
+        return entry
+
+    def cancel(self, entry: Optional[Tuple[float, int, Callable[[], None]]]) -> None:
+        """Drop a pending timer; one that already fired is ignored"""
+        if entry is None or entry not in self.timers:
+            return
+        first = self.timers[0] is entry
+        self.timers.remove(entry)
+        heapq.heapify(self.timers)
+        if first:
+            self._schedule()
+
+    async def sleep(self, delay: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self.call_later(delay, lambda: future.done() or future.set_result(None))
+        await future
+
+    def set_scale(self, scale: float) -> None:
+        self._rebase(self.now())
+        self.scale = scale
+        self._schedule()
+
+    def advance(self, seconds: float) -> None:
+        """Jump ahead, firing due timers (and any they schedule) at their own due time"""
+        target = self.now() + seconds
+        while self.timers and self.timers[0][0] <= target:
+            due, _, callback = heapq.heappop(self.timers)
+            self._rebase(max(due, self.now()))
+            callback()
+        self._rebase(max(target, self.now()))
+        self._schedule()
+
+    def _run_due(self) -> None:
+        while self.timers and self.timers[0][0] <= self.now():
+            heapq.heappop(self.timers)[2]()
+        self._schedule()
+
+    def _schedule(self) -> None:
+        """One loop timer for the earliest virtual timer; none while frozen"""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        if not self.timers or self.scale <= 0:
+            return
+        delay = max(0.0, (self.timers[0][0] - self.now()) / self.scale)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._run_due)
+
+
+class HttpError(Exception):
+    """Short-circuits a handler with an error response"""
+
+    def __init__(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        super().__init__(body.get("error"))
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class Request:
+    """The parts of an ASGI HTTP scope the handlers need"""
+
+    def __init__(self, scope: dict, body: bytes):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query_lists = parse_qs(scope.get("query_string", b"").decode())
+        self.query = {k: v[-1] for k, v in self.query_lists.items()}
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.client_ip = (scope.get("client") or ("127.0.0.1", 0))[0]
+        self.body = body
+        self.user: Optional[dict] = None
+        self.response_headers: Dict[str, str] = {}  # like res.set() in server.js
+
+    def json(self) -> dict:
+        """Parsed JSON body, or {} when the request is not JSON (like express.json)"""
+        if "json" not in self.headers.get("content-type", "") or not self.body:
+            return {}
+        data = json.loads(self.body)
+        return data if isinstance(data, dict) else {}
+
+
+class EventStream(str):
+    """text/event-stream response body"""
+
+
+Response = Tuple[int, Any]
+Route = Tuple[str, "re.Pattern[str]", Callable, bool]
+
+
+class JobStore:
+    """Jobs with TTL expiry after finishing and an LRU entry cap (server.js JobStore)"""
+
+    def __init__(self, clock: VirtualClock, max_entries: int, ttl: float):
+        self.clock = clock
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()  # least recently used first
+        self.sizes: Dict[str, int] = {}
+        self.bytes = 0
+        self.expiries: deque = deque()  # (at, jobId) in finishing order, i.e. expiry order
+        # jobId -> ("ttl" | "capacity", userId), oldest first
+        self.tombstones: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.evictions = {"ttl": 0, "capacity": 0}
+
+    def peek(self, job_id: str) -> Optional[dict]:
+        """Lookup without refreshing recency, for the processing timers"""
+        return self.entries.get(job_id)
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[dict]:
+        """With user_id, only a job that user owns; another user's stays untouched"""
+        self.sweep()
+        job = self.entries.get(job_id)
+        if job is None or (user_id is not None and job["userId"] != user_id):
+            return None
+        self.entries.move_to_end(job_id)
+        return job
+
+    def set(self, job: dict) -> None:
+        self.sweep()
+        self.entries[job["jobId"]] = job
+        self._account(job)
+        while len(self.entries) > self.max_entries:
+            self._evict(next(iter(self.entries)), "capacity")
+
+    def finish(self, job: dict) -> None:
+        """Called when a job reaches done/failed: its size grew and its TTL starts"""
+        if job["jobId"] not in self.entries:
+            return
+        self._account(job)
+        job["expiresAt"] = self.clock.now() + self.ttl
+        self.expiries.append((job["expiresAt"], job["jobId"]))
+
+    def evicted(self, job_id: str, user_id: Optional[str] = None) -> Optional[str]:
+        """Why the job was evicted; with user_id, only if that user owned it"""
+        tombstone = self.tombstones.get(job_id)
+        if tombstone is None or (user_id is not None and tombstone[1] != user_id):
+            return None
+        return tombstone[0]
+
+    def _account(self, job: dict) -> None:
+        size = len(json.dumps(job, separators=(",", ":"), ensure_ascii=False)) + JOB_OVERHEAD_BYTES
+        self.bytes += size - self.sizes.get(job["jobId"], 0)
+        self.sizes[job["jobId"]] = size
+
+    def _evict(self, job_id: str, reason: str) -> None:
+        user_id = self.entries.pop(job_id)["userId"]
+        self.bytes -= self.sizes.pop(job_id, 0)
+        self.evictions[reason] += 1
+        self.tombstones[job_id] = (reason, user_id)
+        if len(self.tombstones) > self.max_entries:
+            self.tombstones.popitem(last=False)
+
+    def sweep(self) -> None:
+        now = self.clock.now()
+        while self.expiries and self.expiries[0][0] <= now:
+            at, job_id = self.expiries.popleft()
+            job = self.entries.get(job_id)
+            if job is not None and job.get("expiresAt") == at:
+                self._evict(job_id, "ttl")
+
+    def stats(self) -> dict:
+        self.sweep()
+        return {
+            "entries": len(self.entries),
+            "approxBytes": self.bytes,
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl,
+            "evictions": dict(self.evictions),
+            "tombstones": len(self.tombstones),
+        }
+
+
+class JobScheduler:
+    """FIFO job queue drained by a fixed pool of AIML workers (server.js JobScheduler)"""
+
+    def __init__(self, clock: VirtualClock, workers: int, max_queue: int, service_time: float):
+        self.clock = clock
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue: deque = deque()  # (run, enqueued at)
+        self.busy = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.service_time = service_time  # moving average of worker seconds per job, from the expected one
+        self.waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def accepts(self, n: int) -> bool:
+        """Whether n more jobs fit, counting idle workers that would take some at once"""
+        return len(self.queue) + max(0, n - (self.workers - self.busy)) <= self.max_queue
+
+    @property
+    def full(self) -> bool:
+        return not self.accepts(1)
+
+    def refuse(self) -> float:
+        """Count a submission turned away; seconds until a queue slot likely frees up"""
+        self.rejected += 1
+        return self.service_time / self.workers
+
+    def submit(self, run: Callable[[Callable[[], None]], None]) -> None:
+        """Queue run(done); run calls done() when its worker is free again"""
+        self.submit_all([run])
+
+    def submit_all(self, runs: List[Callable[[Callable[[], None]], None]]) -> None:
+        """Queue several runs back to back, in order"""
+        now = self.clock.now()
+        self.queue.extend((run, now) for run in runs)
+        self.accepted += len(runs)
+        self.pump()
+
+    def pump(self) -> None:
+        while self.busy < self.workers and self.queue:
+            run, enqueued = self.queue.popleft()
+            started = self.clock.now()
+            wait = started - enqueued
+            self.waits.append(wait)
+            self.wait_count += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.busy += 1
+            run(self._done_callback(started))
+
+    def _done_callback(self, started: float) -> Callable[[], None]:
+        finished = False
+
+        def done() -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            self.busy -= 1
+            self.service_time = self.service_time * 0.9 + (self.clock.now() - started) * 0.1
+            self.pump()
+
+        return done
+
+    def resize(self, workers: Optional[int] = None, max_queue: Optional[int] = None) -> None:
+        self.workers = workers or self.workers
+        self.max_queue = max_queue or self.max_queue
+        self.pump()
+
+    def stats(self) -> dict:
+        recent = sorted(self.waits)
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": len(self.queue),
+            "maxQueue": self.max_queue,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "waitMs": {
+                "count": self.wait_count,
+                "mean": self.wait_total * 1000 / self.wait_count if self.wait_count else 0,
+                "p95": recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000 if recent else 0,
+                "max": self.wait_max * 1000,
+            },
+            "serviceMs": round(self.service_time * 1000),
+        }
+
+
+class SlidingWindowLimiter:
+    """O(1) per-key sliding-window counter with lazy idle-key sweeps (server.js SlidingWindowLimiter)"""
+
+    def __init__(self, clock: VirtualClock, limit: int, window: float):
+        self.clock = clock
+        self.limit = limit
+        self.window = window
+        self.keys: Dict[str, List[float]] = {}  # key -> [window index, current, previous]
+        self.next_sweep = 0.0
+
+    def hit(self, key: str) -> dict:
+        now = self.clock.now()
+        if now >= self.next_sweep:
+            self.sweep(now)
+
+        window = int(now // self.window)
+        entry = self.keys.get(key)
+        if entry is None:
+            entry = self.keys[key] = [window, 0, 0]
+        elif entry[0] != window:
+            entry[2] = entry[1] if entry[0] == window - 1 else 0
+            entry[1] = 0
+            entry[0] = window
+
+        elapsed = now - window * self.window
+        used = entry[2] * (1 - elapsed / self.window) + entry[1]
+        allowed = used + 1 <= self.limit
+        if allowed:
+            entry[1] += 1
+        return {
+            "allowed": allowed,
+            "limit": self.limit,
+            "remaining": max(0, math.floor(self.limit - used - allowed)),
+            "reset": self.window - elapsed,
+            "retryAfter": 0.0 if allowed else self._retry_after(entry, elapsed),
+        }
+
+    def _retry_after(self, entry: List[float], elapsed: float) -> float:
+        room = self.limit - 1
+        if entry[1] > room:
+            return self.window - elapsed + self.window * (1 - room / entry[1])
+        return max(0.0, self.window * (1 - (room - entry[1]) / entry[2]) - elapsed)
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        now = self.clock.now() if now is None else now
+        stale = int(now // self.window) - 1
+        for key in [key for key, entry in self.keys.items() if entry[0] < stale]:
+            del self.keys[key]
+        self.next_sweep = now + self.window
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "windowSeconds": self.window, "keys": len(self.keys)}
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Set the strong ETag; True if If-None-Match already has it (answer 304, no body)"""
+    request.response_headers["ETag"] = etag
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or any(
+        tag.strip().removeprefix("W/") == etag for tag in header.split(",")
+    )
+
+
+def rate_limit_headers(result: dict) -> Dict[str, str]:
+    headers = {
+        "RateLimit-Limit": str(result["limit"]),
+        "RateLimit-Remaining": str(result["remaining"]),
+        "RateLimit-Reset": str(math.ceil(result["reset"])),
+    }
+    if not result["allowed"]:
+        headers["Retry-After"] = str(math.ceil(result["retryAfter"]))
+    return headers
+
+
+class AnswerHistory:
+    """Fixed-size ring of one user's latest answers (server.js AnswerHistory)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ring: List[Optional[dict]] = [None] * capacity
+        self.total = 0  # answers ever added; the newest has sequence total - 1
+
+    def add(self, answer: dict) -> None:
+        self.ring[self.total % self.capacity] = answer
+        self.total += 1
+
+    def page(self, limit: int, before: Optional[int] = None) -> Tuple[List[dict], Optional[int]]:
+        """Newest first below sequence `before`, plus the sequence to continue from"""
+        oldest = max(0, self.total - self.capacity)
+        seq = min(self.total if before is None else before, self.total) - 1
+        answers = []
+        while seq >= oldest and len(answers) < limit:
+            answers.append(self.ring[seq % self.capacity])
+            seq -= 1
+        return answers, (seq + 1 if seq >= oldest else None)
+
+
+class AnswerCache:
+    """LRU of answers by normalized (company, question) with a TTL (server.js AnswerCache)"""
+
+    def __init__(self, clock: VirtualClock, max_entries: int, ttl: float):
+        self.clock = clock
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()  # least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"ttl": 0, "capacity": 0}
+
+    @staticmethod
+    def key(item: dict) -> str:
+        """Case and runs of whitespace do not make a question new"""
+        def normalize(text: Any) -> str:
+            return " ".join(str(text).split()).lower()
+        return f"{normalize(item['company'])}\n{normalize(item['question'])}"
+
+    def peek(self, item: dict) -> Optional[dict]:
+        """Uncounted lookup that leaves recency alone; always None while the cache is off"""
+        if self.max_entries == 0:
+            return None
+        key = self.key(item)
+        entry = self.entries.get(key)
+        if entry is not None and entry["expiresAt"] <= self.clock.now():
+            del self.entries[key]
+            self.evictions["ttl"] += 1
+            return None
+        return entry
+
+    def record(self, item: dict, entry: Optional[dict]) -> None:
+        """Counts the outcome of a peek once the submission is accepted"""
+        if self.max_entries == 0:
+            return
+        if entry is None:
+            self.misses += 1
+            return
+        key = self.key(item)
+        if self.entries.get(key) is entry:
+            self.entries.move_to_end(key)
+        self.hits += 1
+
+    def set(self, item: dict, entry: dict) -> None:
+        if self.max_entries == 0:
+            return
+        key = self.key(item)
+        self.entries.pop(key, None)
+        self.entries[key] = {**entry, "expiresAt": self.clock.now() + self.ttl}
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions["capacity"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0,
+            "evictions": dict(self.evictions),
+        }
+
+
+def encode_cursor(seq: int) -> str:
+    return base64.urlsafe_b64encode(f"a{seq}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except ValueError:
+        return None
+    match = re.fullmatch(r"a(\d+)", text)
+    return int(match.group(1)) if match else None
+
+
+class AimlClient:
+    """Retrying caller of the AIML service used by job workers (server.js AimlClient).
+
+    Only the in-process path exists here: every attempt goes to
+    ProcessingApiApp.aiml_service under the `aimlJobs` quota. 429s and 5xx
+    are retried with exponential backoff and jitter, never sooner than the
+    service's retryAfter, until AIML_TIMEOUT runs out.
+    """
+
+    def __init__(self, app: "ProcessingApiApp", timeout: float, max_attempts: int, base_delay: float):
+        self.app = app
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+
+    def answer(self, body: dict, stall: bool, done: Callable[[Optional[str], Optional[dict], List[dict]], None]) -> None:
+        """done(error, payload, attempts); `stall` simulates an upstream hang that only the timeout ends"""
+        clock = self.app.clock
+        deadline = clock.now() + self.timeout
+        attempts: List[dict] = []
+        current: Dict[str, Any] = {}
+        timers: Dict[str, Any] = {}  # "timeout", "retry" -> clock handles
+        finished = False
+
+        def finish(error: Optional[str], payload: Optional[dict] = None) -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            clock.cancel(timers.get("timeout"))
+            clock.cancel(timers.get("retry"))
+            if current and current["record"]["status"] is None:
+                current["record"]["durationMs"] = round((clock.now() - current["sent_at"]) * 1000)
+            done(error, payload, attempts)
+
+        def attempt() -> None:
+            if finished:
+                return
+            record = {"attempt": len(attempts) + 1, "startedAt": clock.iso(), "status": None, "durationMs": None}
+            attempts.append(record)
+            sent_at = clock.now()
+            current.update(record=record, sent_at=sent_at)
+            if stall:
+                return
+
+            def reply(status: int, payload: dict, rate_limit: Optional[dict] = None) -> None:
+                if finished or record["status"] is not None:
+                    return
+                record["status"] = status
+                record["durationMs"] = round((clock.now() - sent_at) * 1000)
+                if status == 200:
+                    finish(None, payload)
+                    return
+
+                retryable = status == 0 or status == 429 or status >= 500
+                backoff = self.base_delay * 2 ** (len(attempts) - 1) * (
+                    0.5 + self.app.random["aimlRetries"].random() * 0.5
+                )
+                delay = max(backoff, (payload or {}).get("retryAfter") or 0)
+                if not retryable or len(attempts) >= self.max_attempts or clock.now() + delay >= deadline:
+                    finish("AIML service rate limit exceeded - please try again" if status == 429
+                           else "AIML service error - please try again")
+                    return
+                record["retryInMs"] = round(delay * 1000)
+                timers["retry"] = clock.call_later(delay, attempt)
+
+            self.app.aiml_service(body, self.app.rate_limits["aimlJobs"], "processing-api", reply)
+
+        timers["timeout"] = clock.call_later(self.timeout, lambda: finish("AIML service timeout - please try again"))
+        attempt()
+
+
+class ProcessingApiApp:
+    """ASGI implementation of the mock Processing API"""
+
+    def __init__(self, clock_scale: Optional[float] = None, seed: Optional[str] = None):
+        if clock_scale is None:
+            clock_scale = float(os.getenv("CLOCK_SCALE", "1"))
+        if not clock_scale >= 0:  # float() accepts "nan" and negative values
+            raise ValueError(f"CLOCK_SCALE must be a non-negative number, got {clock_scale!r}")
+        self.clock = VirtualClock(clock_scale)
+        self.seed_random(seed or os.getenv("RANDOM_SEED") or str(int(time.time() * 1000)))
+        self.users = [
+            {
+                "id": str(uuid.uuid4()),
+                "email": "analyst@test.com",
+                "password": "TestPass123!",
+                "role": "Analyst",
+                "name": "Test Analyst",
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "email": "admin@test.com",
+                "password": "AdminPass123!",
+                "role": "Admin",
+                "name": "Test Admin",
+            },
+        ]
+        self.jobs = JobStore(
+            self.clock,
+            max_entries=int(os.getenv("JOB_STORE_MAX", "10000")),
+            ttl=float(os.getenv("JOB_TTL_SECONDS", "600")),
+        )
+        self.scheduler = JobScheduler(
+            self.clock,
+            workers=int(os.getenv("AIML_WORKERS", "200")),
+            max_queue=int(os.getenv("JOB_QUEUE_MAX", "2000")),
+            service_time=EXPECTED_SERVICE_TIME,
+        )
+        self.batch_max = int(os.getenv("QA_BATCH_MAX", "100"))
+        self.answer_histories: Dict[str, AnswerHistory] = {}
+        self.answer_history_limit = int(os.getenv("ANSWER_HISTORY_LIMIT", "100"))
+        if self.answer_history_limit < 1:  # an empty ring has no slot to write to
+            raise ValueError(f"ANSWER_HISTORY_LIMIT must be a positive integer, got {self.answer_history_limit!r}")
+        # Replaced, not mutated, by PUT /mock/answer-cache
+        self.answer_cache = AnswerCache(
+            self.clock,
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX", "1000")),
+            ttl=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+        )
+        # Looked up by name per request, so /mock/rate-limits can replace one
+        self.rate_limits = {
+            "aiml": SlidingWindowLimiter(self.clock, AIML_RATE_LIMIT, 60),  # per client IP
+            "api": SlidingWindowLimiter(self.clock, int(os.getenv("API_RATE_LIMIT", "100")), 60),  # per user
+            "upload": SlidingWindowLimiter(self.clock, int(os.getenv("UPLOAD_RATE_LIMIT", "5")), 3600),  # per admin
+            # The job workers are one more AIML client, so by default they get the same quota
+            "aimlJobs": SlidingWindowLimiter(
+                self.clock, int(os.getenv("AIML_JOB_RATE_LIMIT", str(AIML_RATE_LIMIT))), 60
+            ),
+        }
+        self.aiml_client = AimlClient(
+            self, AIML_TIMEOUT, int(os.getenv("AIML_MAX_ATTEMPTS", "3")), AIML_RETRY_BASE
+        )
+        # userId -> deliver(update) callbacks of that user's authenticated
+        # WebSocket sessions, so every socket a user has open gets their
+        # updates and nobody else's
+        self.subscribers: Dict[str, List[Callable[[dict], None]]] = {}
+        # userId -> recent (id, frame) SSE events, and the last id evicted from it
+        self.sse_replay: Dict[str, deque] = {}
+        self.sse_evicted: Dict[str, int] = {}
+        self.sse_event_id = 0
+        # jobId -> wake(job) callbacks of long-polls held on that job
+        self.job_waiters: Dict[str, List[Callable[[dict], None]]] = {}
+
+        # (method, path pattern, handler, requires auth)
+        self.routes: List[Route] = [
+            ("GET", re.compile(r"^/health$"), self.health, False),
+            ("POST", re.compile(r"^/api/v1/auth/login$"), self.login, False),
+            ("POST", re.compile(r"^/api/v1/auth/logout$"), self.logout, True),
+            ("POST", re.compile(r"^/api/v1/qa$"), self.submit_question, True),
+            ("POST", re.compile(r"^/api/v1/qa/batch$"), self.submit_batch, True),
+            ("GET", re.compile(r"^/api/v1/qa/stream$"), self.job_stream, False),
+            ("GET", re.compile(r"^/api/v1/qa/status$"), self.get_statuses, True),
+            ("POST", re.compile(r"^/api/v1/qa/status$"), self.post_statuses, True),
+            ("GET", re.compile(r"^/api/v1/qa/(?P<job_id>[^/]+)$"), self.get_job, True),
+            ("GET", re.compile(r"^/api/v1/qa$"), self.get_answers, True),
+            ("POST", re.compile(r"^/api/v1/admin/companies/upload$"), self.upload_companies, True),
+            ("POST", re.compile(r"^/aiml/answer$"), self.aiml_answer, False),
+            ("GET", re.compile(r"^/mock/clock$"), self.get_clock, False),
+            ("PUT", re.compile(r"^/mock/clock$"), self.set_clock, False),
+            ("POST", re.compile(r"^/mock/clock/advance$"), self.advance_clock, False),
+            ("GET", re.compile(r"^/mock/stats$"), self.get_stats, False),
+            ("GET", re.compile(r"^/mock/answer-cache$"), self.get_answer_cache, False),
+            ("PUT", re.compile(r"^/mock/answer-cache$"), self.set_answer_cache, False),
+            ("GET", re.compile(r"^/mock/seed$"), self.get_seed, False),
+            ("PUT", re.compile(r"^/mock/seed$"), self.set_seed, False),
+            ("GET", re.compile(r"^/mock/scheduler$"), self.get_scheduler, False),
+            ("PUT", re.compile(r"^/mock/scheduler$"), self.set_scheduler, False),
+            ("GET", re.compile(r"^/mock/rate-limits$"), self.get_rate_limits, False),
+            ("PUT", re.compile(r"^/mock/rate-limits$"), self.set_rate_limits, False),
+        ]
+
+    # ASGI entry point
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] == "websocket":
+            await self.websocket_session(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        request = Request(scope, body)
+        status, payload = await self.dispatch(request)
+        content_headers = []
+        if payload is None:  # 304
+            content = b""
+        elif isinstance(payload, EventStream):
+            content = payload.encode()
+            content_headers.append((b"content-type", b"text/event-stream"))
+        else:
+            content = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+            content_headers.append((b"content-type", b"application/json; charset=utf-8"))
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                *content_headers,
+                (b"content-length", str(len(content)).encode()),
+                *((k.encode("latin-1"), v.encode("latin-1")) for k, v in request.response_headers.items()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
+
+    async def websocket_session(self, receive: Callable, send: Callable) -> None:
+        """Job status feed (wss.on('connection')): {type: 'auth', token} subscribes the socket"""
+        if (await receive())["type"] != "websocket.connect":
+            return
+        await send({"type": "websocket.accept"})
+
+        def deliver(update: dict) -> None:
+            asyncio.ensure_future(send({"type": "websocket.send", "text": json.dumps(update)}))
+
+        user_id = None
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                try:
+                    data = json.loads(message.get("text") or message.get("bytes") or b"")
+                except ValueError:
+                    continue
+                if not isinstance(data, dict) or data.get("type") != "auth" or not data.get("token"):
+                    continue
+                try:
+                    claims = self.verify_token(None, data["token"])
+                except HttpError:
+                    reply = {"type": "auth", "status": "error", "message": "Invalid token"}
+                else:
+                    self.unsubscribe(user_id, deliver)
+                    user_id = claims["userId"]
+                    self.subscribers.setdefault(user_id, []).append(deliver)
+                    reply = {"type": "auth", "status": "success"}
+                await send({"type": "websocket.send", "text": json.dumps(reply)})
+        finally:
+            self.unsubscribe(user_id, deliver)
+
+    def unsubscribe(self, user_id: Optional[str], deliver: Callable[[dict], None]) -> None:
+        subscribers = self.subscribers.get(user_id)
+        if subscribers and deliver in subscribers:
+            subscribers.remove(deliver)
+            if not subscribers:
+                del self.subscribers[user_id]
+
+    async def dispatch(self, request: Request) -> Response:
+        for method, pattern, handler, requires_auth in self.routes:
+            match = pattern.match(request.path)
+            if not match or method != request.method:
+                continue
+            try:
+                if requires_auth:
+                    request.user = self.verify_token(request)
+                    self.check_rate_limit(request, "api")
+                return await handler(request, **match.groupdict())
+            except HttpError as error:
+                request.response_headers.update(error.headers)
+                return error.status, error.body
+            except ValueError:
+                # Malformed JSON body lands in the generic error handler, as in server.js
+                return 500, {"error": "Something went wrong!"}
+        return 404, {"error": "Endpoint not found"}
+
+    # Helpers
+
+    def generate_token(self, user: dict) -> str:
+        now = int(self.clock.now())
+        claims = {
+            "userId": user["id"],
+            "email": user["email"],
+            "role": user["role"],
+            "iat": now,
+            "exp": now + TOKEN_TTL_SECONDS,
+        }
+        return jwt.encode(claims, JWT_SECRET, algorithm="HS256")
+
+    def verify_token(self, request: Request, token: Optional[str] = None) -> dict:
+        if token is None:
+            auth_header = request.headers.get("authorization", "")
+            if not auth_header.startswith("Bearer "):
+                raise HttpError(401, {"error": "Unauthorized - No token provided"})
+            token = auth_header[7:]
+        try:
+            # Expiry is checked against the virtual clock, not PyJWT's wall clock
+            claims = jwt.decode(
+                token, JWT_SECRET, algorithms=["HS256"], options={"verify_exp": False, "verify_iat": False}
+            )
+        except jwt.PyJWTError:
+            raise HttpError(401, {"error": "Unauthorized - Invalid token"})
+        if "exp" in claims and int(self.clock.now()) >= claims["exp"]:
+            raise HttpError(401, {"error": "Unauthorized - Invalid token"})
+        return claims
+
+    def seed_random(self, seed) -> None:
+        # JavaScript's String(seed): integral floats lose the ".0"
+        if isinstance(seed, float) and seed.is_integer():
+            seed = int(seed)
+        self.random_seed = str(seed)
+        self.random = seeded_streams(self.random_seed)
+
+    def require_admin(self, request: Request) -> None:
+        if request.user["role"] != "Admin":
+            raise HttpError(403, {"error": "Forbidden - Admin access required"})
+
+    def check_rate_limit(self, request: Request, name: str) -> None:
+        """Count the request against a per-user limit (userRateLimit middleware)"""
+        result = self.rate_limits[name].hit(request.user["userId"])
+        request.response_headers.update(rate_limit_headers(result))
+        if not result["allowed"]:
+            raise HttpError(429, {"error": "Too Many Requests - Rate limit exceeded",
+                                  "retryAfter": math.ceil(result["retryAfter"])})
+
+    def broadcast_job_update(self, job: dict) -> None:
+        update = {"jobId": job["jobId"], "status": job["status"], "timestamp": self.clock.iso()}
+        # Every status change is broadcast, so this is where it is stamped
+        job["updatedAt"] = update["timestamp"]
+        job["version"] += 1
+        for subscriber in self.subscribers.get(job["userId"], ()):
+            subscriber(update)
+        self.publish_job_event(job["userId"], update)
+        for wake in list(self.job_waiters.get(job["jobId"], ())):
+            wake(job)
+
+    def remove_job_waiter(self, job_id: str, wake: Callable[[dict], None]) -> None:
+        waiters = self.job_waiters.get(job_id)
+        if waiters and wake in waiters:
+            waiters.remove(wake)
+            if not waiters:
+                del self.job_waiters[job_id]
+
+    def publish_job_event(self, user_id: str, update: dict) -> None:
+        self.sse_event_id += 1
+        frame = f"id: {self.sse_event_id}\ndata: {json.dumps(update, separators=(',', ':'))}\n\n"
+        replay = self.sse_replay.setdefault(user_id, deque())
+        replay.append((self.sse_event_id, frame))
+        if len(replay) > SSE_REPLAY_LIMIT:
+            self.sse_evicted[user_id] = replay.popleft()[0]
+
+    def complete_job(self, job: dict, answer: dict) -> None:
+        """Mark a job done and add its answer to the owner's history; the caller finishes and broadcasts it"""
+        job["status"] = "done"
+        job["completedAt"] = self.clock.iso()
+        job["result"] = {"question": job["question"], "company": job["company"], **answer,
+                         "timestamp": self.clock.iso()}
+        history = self.answer_histories.get(job["userId"])
+        if history is None:
+            history = self.answer_histories[job["userId"]] = AnswerHistory(self.answer_history_limit)
+        history.add(job["result"])
+
+    def simulate_aiml_processing(self, job_id: str, done: Callable[[], None]) -> None:
+        """Runs on a scheduler worker; calls done() once the worker is free again"""
+        def complete(error: Optional[str], answer: Optional[dict], attempts: List[dict]) -> None:
+            job = self.jobs.peek(job_id)
+            if not job or job["status"] != "running":
+                done()
+                return
+            job["aimlAttempts"] = attempts
+            if error:
+                job["status"] = "failed"
+                job["error"] = error
+            else:
+                text, confidence = answer["answer"], answer["confidence"]
+                self.answer_cache.set(job, {"answer": text, "confidence": confidence, "jobId": job_id,
+                                            "userId": job["userId"], "answeredAt": self.clock.iso()})
+                self.complete_job(job, {"answer": text, "confidence": confidence, "source": "aiml"})
+            self.jobs.finish(job)
+            self.broadcast_job_update(job)
+            done()
+
+        def start() -> None:
+            job = self.jobs.peek(job_id)
+            if not job or job["status"] != "queued":
+                done()
+                return
+            job["status"] = "running"
+            self.broadcast_job_update(job)
+            # 10% of calls hang upstream and run into the AIML timeout
+            stall = self.random["jobFailures"].random() < AIML_STALL_RATE
+            self.aiml_client.answer({"question": job["question"], "company": job["company"]}, stall, complete)
+
+        if self.jobs.peek(job_id) is None:
+            done()
+            return
+        # The hand-off to the AIML service; the job still reads as queued
+        self.clock.call_later(self.random["jobTiming"].random() * JOB_HANDOFF_SPREAD + JOB_HANDOFF_MIN, start)
+
+    # Routes
+
+    async def health(self, request: Request) -> Response:
+        return 200, {"status": "OK", "message": "Mock API server is running"}
+
+    async def login(self, request: Request) -> Response:
+        data = request.json()
+        email, password = data.get("email"), data.get("password")
+        if not email or not password:
+            return 400, {"error": "Email and password are required"}
+
+        user = next((u for u in self.users if u["email"] == email and u["password"] == password), None)
+        if user is None:
+            return 401, {"error": "Invalid credentials"}
+
+        return 200, {
+            "token": self.generate_token(user),
+            "user": {k: user[k] for k in ("id", "email", "role", "name")},
+            "expiresIn": TOKEN_TTL_SECONDS,
+        }
+
+    async def logout(self, request: Request) -> Response:
+        return 200, {"message": "Logout successful"}
+
+    def validate_question(self, item: Any) -> Optional[Tuple[int, str]]:
+        """(status, error) for an invalid question, shared by single and batch submission"""
+        if not isinstance(item, dict) or not item.get("question") or not item.get("company"):
+            return 400, "Question and company are required"
+        if isinstance(item["question"], str) and len(item["question"]) > MAX_QUESTION_LENGTH:
+            return 413, "Question too long - maximum 10,000 characters"
+        return None
+
+    def refuse_full_queue(self, request: Request) -> Response:
+        retry_after = max(1, math.ceil(self.scheduler.refuse()))
+        request.response_headers["Retry-After"] = str(retry_after)
+        return 503, {"error": "Service Unavailable - job queue is full", "retryAfter": retry_after}
+
+    def create_job(self, item: dict, user_id: str,
+                   cached: Optional[dict] = None) -> Tuple[dict, Optional[Callable[[Callable[[], None]], None]]]:
+        """Store a queued job; returns it with the scheduler run that processes it.
+        A job with a cached answer is done at once and has no run."""
+        job_id = str(uuid.uuid4())
+        job = {
+            "jobId": job_id,
+            "question": item["question"],
+            "company": item["company"],
+            "status": "queued",
+            "submittedAt": self.clock.iso(),
+            "userId": user_id,
+        }
+        job["updatedAt"] = job["submittedAt"]
+        job["version"] = 1  # bumped on every status change; the job's ETag
+        self.jobs.set(job)
+
+        if cached is not None:
+            # The cache is shared, but job ids are not: only the owner learns which job answered
+            cached_from = {"answeredAt": cached["answeredAt"]}
+            if cached["userId"] == user_id:
+                cached_from["jobId"] = cached["jobId"]
+            self.complete_job(job, {
+                "answer": cached["answer"],
+                "confidence": cached["confidence"],
+                "source": "cache",
+                "cachedFrom": cached_from,
+            })
+            self.jobs.finish(job)
+            self.broadcast_job_update(job)
+            return job, None
+        return job, lambda done: self.simulate_aiml_processing(job_id, done)
+
+    async def submit_question(self, request: Request) -> Response:
+        data = request.json()
+        invalid = self.validate_question(data)
+        if invalid:
+            return invalid[0], {"error": invalid[1]}
+
+        # A cached answer needs no worker, so it is served even when the queue is full
+        cached = self.answer_cache.peek(data)
+        if cached is None and self.scheduler.full:
+            return self.refuse_full_queue(request)
+        self.answer_cache.record(data, cached)
+
+        job, run = self.create_job(data, request.user["userId"], cached)
+        if run is not None:
+            self.scheduler.submit(run)
+        return 202, {"jobId": job["jobId"], "status": job["status"], "submittedAt": job["submittedAt"]}
+
+    async def submit_batch(self, request: Request) -> Response:
+        items = request.json().get("items")
+        if not isinstance(items, list) or not 1 <= len(items) <= self.batch_max:
+            return 400, {"error": f"items must be an array of 1 to {self.batch_max} questions"}
+
+        checks = [self.validate_question(item) for item in items]
+        valid = [item for item, invalid in zip(items, checks) if not invalid]
+        if not valid:
+            return 400, {
+                "error": "No valid items in batch",
+                "results": [{"statusCode": status, "error": error} for status, error in checks],
+            }
+
+        cached = [self.answer_cache.peek(item) for item in valid]
+        if not self.scheduler.accepts(sum(entry is None for entry in cached)):
+            return self.refuse_full_queue(request)
+        for item, entry in zip(valid, cached):
+            self.answer_cache.record(item, entry)
+
+        created = [self.create_job(item, request.user["userId"], entry) for item, entry in zip(valid, cached)]
+        self.scheduler.submit_all([run for _, run in created if run is not None])
+
+        jobs = iter(job for job, _ in created)
+        results = []
+        for invalid in checks:
+            if invalid:
+                results.append({"statusCode": invalid[0], "error": invalid[1]})
+            else:
+                job = next(jobs)
+                results.append({"jobId": job["jobId"], "status": job["status"], "submittedAt": job["submittedAt"]})
+        return 202, {"accepted": len(valid), "rejected": len(items) - len(valid), "results": results}
+
+    async def job_stream(self, request: Request) -> Response:
+        user = self.verify_token(request, request.query.get("token"))
+        frames = [f"retry: {SSE_RETRY_MS}\n\n"]
+
+        last_event_id = request.headers.get("last-event-id") or request.query.get("lastEventId")
+        if last_event_id is not None and last_event_id.isdigit():
+            last_event_id = int(last_event_id)
+            if last_event_id < self.sse_evicted.get(user["userId"], 0) or last_event_id > self.sse_event_id:
+                frames.append(f"event: reset\ndata: {json.dumps({'lastEventId': self.sse_event_id})}\n\n")
+            frames.extend(
+                frame for event_id, frame in self.sse_replay.get(user["userId"], ()) if event_id > last_event_id
+            )
+        return 200, EventStream("".join(frames))
+
+    async def get_job(self, request: Request, job_id: str) -> Response:
+        if not UUID_PATTERN.match(job_id):
+            return 400, {"error": "Invalid job ID format"}
+
+        wait_for = request.query.get("waitFor")
+        if wait_for is not None:
+            ready = LONG_POLL_CONDITIONS.get(wait_for)
+            if ready is None:
+                return 400, {"error": "waitFor must be 'terminal' or 'change'"}
+            timeout = request.query.get("timeout", str(LONG_POLL_DEFAULT_SECONDS))
+            if not timeout.isdigit() or not 1 <= int(timeout) <= LONG_POLL_MAX_SECONDS:
+                return 400, {"error": f"timeout must be an integer between 1 and {LONG_POLL_MAX_SECONDS}"}
+            job = self.jobs.peek(job_id)
+            if job is not None and job["userId"] == request.user["userId"] and not ready(job, job["status"]):
+                return await self.long_poll(request, job, ready, int(timeout))
+
+        return self.job_status(request, job_id)
+
+    async def long_poll(
+        self, request: Request, job: dict, ready: Callable[[dict, str], bool], timeout: int
+    ) -> Response:
+        """Hold until broadcast_job_update reports a status that satisfies `ready`, or timeout"""
+        job_id, initial = job["jobId"], job["status"]
+        woken = asyncio.get_running_loop().create_future()
+
+        def answer() -> None:
+            # The status is taken now, like server.js answering inside the broadcast
+            self.remove_job_waiter(job_id, wake)
+            if not woken.done():
+                woken.set_result(self.job_status(request, job_id))
+
+        def wake(updated: dict) -> None:
+            if ready(updated, initial):
+                answer()
+
+        self.job_waiters.setdefault(job_id, []).append(wake)
+        timer = self.clock.call_later(timeout, answer)
+        try:
+            return await woken
+        finally:
+            self.remove_job_waiter(job_id, wake)
+            self.clock.cancel(timer)
+
+    def job_status(self, request: Request, job_id: str) -> Response:
+        """Another user's job gets the same 404 as one that never existed"""
+        user_id = request.user["userId"]
+        job = self.jobs.get(job_id, user_id)
+        if job is None:
+            if self.jobs.evicted(job_id, user_id):
+                return 410, {
+                    "jobId": job_id,
+                    "status": "evicted",
+                    "error": "Job expired and was removed from the job store",
+                }
+            return 404, {"error": "Job not found"}
+
+        if not_modified(request, f'"j{job["version"]}"'):
+            return 304, None
+        return 200, job_status_body(job)
+
+    def job_status_query(self, user_id: str, raw_ids: Any, changed_since: Any, max_ids: int) -> Response:
+        """Many of the user's jobs' status at once; `changedSince` leaves out jobs that have not moved.
+        Other users' jobs are reported as missing, exactly like unknown ids."""
+        ids = list(dict.fromkeys(raw_ids)) if isinstance(raw_ids, list) else []
+        if not 1 <= len(ids) <= max_ids:
+            return 400, {"error": f"ids must list 1 to {max_ids} job IDs"}
+        if not all(isinstance(job_id, str) and UUID_PATTERN.match(job_id) for job_id in ids):
+            return 400, {"error": "Invalid job ID format"}
+
+        since = None
+        if changed_since is not None:
+            since = parse_iso_time(changed_since)
+            if since is None:
+                return 400, {"error": "changedSince must be an ISO 8601 timestamp"}
+
+        as_of = self.clock.iso()
+        found, evicted, missing = [], [], []
+        for job_id in ids:
+            job = self.jobs.get(job_id, user_id)
+            if job is not None:
+                # Inclusive, so a change in the same millisecond as asOf is not lost
+                if since is None or parse_iso_time(job["updatedAt"]) >= since:
+                    found.append(job_status_body(job))
+            elif self.jobs.evicted(job_id, user_id):
+                evicted.append({"jobId": job_id, "status": "evicted",
+                                "error": "Job expired and was removed from the job store"})
+            else:
+                missing.append(job_id)
+        return 200, {"asOf": as_of, "jobs": found, "evicted": evicted, "missing": missing}
+
+    async def get_statuses(self, request: Request) -> Response:
+        ids = [job_id for value in request.query_lists.get("ids", []) for job_id in value.split(",") if job_id]
+        return self.job_status_query(request.user["userId"], ids, request.query.get("changedSince"),
+                                     STATUS_QUERY_GET_MAX)
+
+    async def post_statuses(self, request: Request) -> Response:
+        data = request.json()
+        return self.job_status_query(request.user["userId"], data.get("ids"), data.get("changedSince"),
+                                     STATUS_QUERY_POST_MAX)
+
+    async def get_answers(self, request: Request) -> Response:
+        limit = request.query.get("limit", str(ANSWER_PAGE_SIZE))
+        if not limit.isdigit() or not 1 <= int(limit) <= ANSWER_PAGE_SIZE:
+            return 400, {"error": f"limit must be an integer between 1 and {ANSWER_PAGE_SIZE}"}
+
+        before = None
+        if "cursor" in request.query:
+            before = decode_cursor(request.query["cursor"])
+            if before is None:
+                return 400, {"error": "Invalid cursor"}
+
+        # The history's answer count versions every page of it; pages differ per user
+        history = self.answer_histories.get(request.user["userId"])
+        request.response_headers["Vary"] = "Authorization"
+        if not_modified(request, f'"h{history.total if history else 0}"'):
+            return 304, None
+        if history is None:
+            return 200, {"answers": [], "nextCursor": None}
+        answers, next_seq = history.page(int(limit), before)
+        return 200, {"answers": answers, "nextCursor": None if next_seq is None else encode_cursor(next_seq)}
+
+    async def upload_companies(self, request: Request) -> Response:
+        self.require_admin(request)
+        self.check_rate_limit(request, "upload")
+
+        upload = parse_upload(request)
+        if upload is None:
+            return 400, {"error": "No file uploaded"}
+        filename, mimetype, content = upload
+        if mimetype != "text/csv" and not filename.endswith(".csv"):
+            return 415, {"error": "Unsupported file type - only CSV files are allowed"}
+        if len(content) > MAX_UPLOAD_BYTES:
+            return 413, {"error": "File too large - maximum size is 2MB"}
+
+        lines = [line for line in content.decode("utf-8", errors="replace").split("\n") if line.strip()]
+        if not lines:
+            return 400, {"error": "File is empty"}
+
+        header = lines[0].lower()
+        if "companyname" not in header or "isin" not in header or "sector" not in header:
+            return 400, {
+                "error": "Invalid CSV format - Expected columns: companyName, isin, sector",
+                "details": {"expectedColumns": ["companyName", "isin", "sector"]},
+            }
+
+        processed_rows = len(lines) - 1
+        errors = [{"row": 3, "message": "Invalid ISIN format"}] if processed_rows > 5 else []
+        return 200, {"message": "File uploaded successfully", "processedRows": processed_rows, "errors": errors}
+
+    def aiml_service(self, body: dict, limiter: SlidingWindowLimiter, key: str,
+                     reply: Callable[..., None]) -> None:
+        """The AIML service; reply(status, payload, rate_limit=None) is called exactly once"""
+        question, company = body.get("question"), body.get("company")
+        if not question or not company:
+            reply(400, {"error": "Question and company are required"})
+            return
+
+        rate_limit = limiter.hit(key)
+        if not rate_limit["allowed"]:
+            reply(429, {"error": "Too Many Requests - Rate limit exceeded",
+                        "retryAfter": math.ceil(rate_limit["retryAfter"])}, rate_limit)
+            return
+
+        # Simulate occasional server errors
+        if self.random["aiml"].random() < 0.05:
+            reply(500, {"error": "Internal server error"}, rate_limit)
+            return
+
+        def respond() -> None:
+            reply(200, {
+                "answer": generate_answer(question, company, self.random["answers"]),
+                "confidence": generate_confidence(self.random["confidence"]),
+            }, rate_limit)
+
+        self.clock.call_later(self.random["aiml"].random() * AIML_RESPONSE_SPREAD + AIML_RESPONSE_MIN, respond)
+
+    async def aiml_answer(self, request: Request) -> Response:
+        future = asyncio.get_running_loop().create_future()
+
+        def reply(status: int, payload: dict, rate_limit: Optional[dict] = None) -> None:
+            if rate_limit is not None:
+                request.response_headers.update(rate_limit_headers(rate_limit))
+            future.set_result((status, payload))
+
+        self.aiml_service(request.json(), self.rate_limits["aiml"], request.client_ip, reply)
+        return await future
+
+    # Virtual clock controls
+
+    def clock_state(self) -> dict:
+        return {"now": self.clock.iso(), "scale": self.clock.scale, "pendingTimers": len(self.clock.timers)}
+
+    async def get_clock(self, request: Request) -> Response:
+        return 200, self.clock_state()
+
+    async def set_clock(self, request: Request) -> Response:
+        scale = request.json().get("scale")
+        if isinstance(scale, bool) or not isinstance(scale, (int, float)) or not scale >= 0:
+            return 400, {"error": "scale must be a non-negative number"}
+        self.clock.set_scale(scale)
+        return 200, self.clock_state()
+
+    async def advance_clock(self, request: Request) -> Response:
+        seconds = request.json().get("seconds")
+        if isinstance(seconds, bool) or not isinstance(seconds, (int, float)) or not seconds >= 0:
+            return 400, {"error": "seconds must be a non-negative number"}
+        self.clock.advance(seconds)
+        return 200, self.clock_state()
+
+    # Store statistics
+
+    async def get_stats(self, request: Request) -> Response:
+        return 200, {"jobs": self.jobs.stats(), "scheduler": self.scheduler.stats(),
+                     "answerCache": self.answer_cache.stats(), "rateLimits": self.rate_limit_state()}
+
+    # Answer cache controls
+
+    async def get_answer_cache(self, request: Request) -> Response:
+        return 200, self.answer_cache.stats()
+
+    async def set_answer_cache(self, request: Request) -> Response:
+        """Replace the cache, clearing its entries and counters; maxEntries 0 turns it off"""
+        data = request.json()
+        max_entries = data.get("maxEntries", self.answer_cache.max_entries)
+        ttl = data.get("ttlSeconds", self.answer_cache.ttl)
+        if (not isinstance(max_entries, int) or isinstance(max_entries, bool) or max_entries < 0
+                or not isinstance(ttl, (int, float)) or isinstance(ttl, bool) or not ttl > 0):
+            return 400, {"error": "maxEntries must be a non-negative integer and ttlSeconds positive"}
+        self.answer_cache = AnswerCache(self.clock, max_entries, ttl)
+        return 200, self.answer_cache.stats()
+
+    # Random seed controls
+
+    async def get_seed(self, request: Request) -> Response:
+        return 200, {"seed": self.random_seed, "streams": list(RANDOM_STREAMS)}
+
+    async def set_seed(self, request: Request) -> Response:
+        seed = request.json().get("seed")
+        if isinstance(seed, bool) or not isinstance(seed, (str, int, float)):
+            return 400, {"error": "seed must be a string or number"}
+        self.seed_random(seed)
+        return 200, {"seed": self.random_seed, "streams": list(RANDOM_STREAMS)}
+
+    # Job scheduler controls
+
+    async def get_scheduler(self, request: Request) -> Response:
+        return 200, self.scheduler.stats()
+
+    async def set_scheduler(self, request: Request) -> Response:
+        data = request.json()
+        workers, max_queue = data.get("workers"), data.get("maxQueue")
+        for value in (workers, max_queue):
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+                return 400, {"error": "workers and maxQueue must be positive integers"}
+        self.scheduler.resize(workers, max_queue)
+        return 200, self.scheduler.stats()
+
+    # Rate limit controls
+
+    def rate_limit_state(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.rate_limits.items()}
+
+    async def get_rate_limits(self, request: Request) -> Response:
+        return 200, self.rate_limit_state()
+
+    async def set_rate_limits(self, request: Request) -> Response:
+        updates = request.json()
+        for name, value in updates.items():
+            if name not in self.rate_limits:
+                return 400, {"error": f"Unknown rate limit: {name}"}
+            value = value if isinstance(value, dict) else {}
+            limit, window = value.get("limit"), value.get("windowSeconds")
+            valid_window = window is None or (isinstance(window, (int, float)) and not isinstance(window, bool)
+                                              and window > 0)
+            if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1 or not valid_window:
+                return 400, {"error": "limit must be a positive integer and windowSeconds positive"}
+        for name, value in updates.items():
+            window = value.get("windowSeconds") or self.rate_limits[name].window
+            self.rate_limits[name] = SlidingWindowLimiter(self.clock, value["limit"], window)
+        return 200, self.rate_limit_state()
+
+
+def job_status_body(job: dict) -> dict:
+    """JobStatus as returned by GET /api/v1/qa/{jobId} and the status query"""
+    body = {k: job[k] for k in ("jobId", "status", "submittedAt", "updatedAt")}
+    for key in ("completedAt", "result", "error", "aimlAttempts"):
+        if job.get(key):
+            body[key] = job[key]
+    return body
+
+
+def generate_answer(question: str, company: str, rng: Mulberry32) -> str:
+    def pick(n: int) -> int:
+        return math.floor(rng.random() * n)
+
+    # Like the template literals in server.js, every template is rendered
+    # (drawing from rng) before one is picked, so the streams stay in step
+    templates = [
+        f"{company}'s Scope 1 emissions for 2023 were approximately {pick(100000)} tCO2e, "
+        f"representing a {pick(20)}% {'increase' if rng.random() > 0.5 else 'decrease'} "
+        f"from the previous year.",
+        f"{company} has committed to achieving carbon neutrality by {2030 + pick(20)}, "
+        f"with interim targets of {math.floor(rng.random() * 50 + 30)}% reduction by 2030.",
+        f"{company}'s sustainability initiatives include renewable energy adoption "
+        f"({pick(100)}% renewable by 2030), waste reduction programs, and water conservation measures.",
+        f"According to {company}'s latest ESG report, their environmental score improved by "
+        f"{pick(30)}% year-over-year, driven by enhanced "
+        f"{'energy efficiency' if rng.random() > 0.5 else 'waste management'} practices.",
+    ]
+    return templates[pick(len(templates))]
+
+
+def generate_confidence(rng: Mulberry32) -> float:
+    # Occasionally return invalid confidence for testing
+    if rng.random() < 0.05:
+        return 1.2
+    return math.floor((rng.random() * 0.4 + 0.6) * 100 + 0.5) / 100  # 0.6-1.0 range, Math.round
+
+
+def parse_upload(request: Request) -> Optional[Tuple[str, str, bytes]]:
+    """Return (filename, mimetype, content) of the multipart `file` field"""
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        return None
+
+    message = BytesParser().parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + request.body
+    )
+    if not message.is_multipart():
+        return None
+
+    for part in message.get_payload():
+        filename = part.get_filename()
+        if filename is None:
+            continue
+        if part.get_param("name", header="content-disposition") != "file":
+            raise HttpError(400, {"error": "Unexpected field"})
+        return filename, part.get_content_type(), part.get_payload(decode=True) or b""
+    return None
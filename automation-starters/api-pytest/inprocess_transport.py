@@ -0,0 +1,241 @@
+"""Zero-network transports for the in-process Processing API.
+
+InProcessServer runs an ASGI app on a private event loop thread, so job
+timers keep firing between requests and both the synchronous `session`
+fixture and the async client share one copy of the app's state. Requests
+are handed to the app as ASGI calls; nothing touches a socket.
+websocket_connect() opens the app's WebSocket feed the same way, as a
+websockets-style connection JobWaiter can use in place of a real one.
+"""
+import asyncio
+import threading
+from http import HTTPStatus
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+import websockets
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from inprocess_api import ProcessingApiApp
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+
+class InProcessServer:
+    """Hosts an ASGI app on a background event loop"""
+
+    base_url = "http://inprocess.test"
+
+    def __init__(self, app=None, client_ip: str = "127.0.0.1"):
+        self.app = app or ProcessingApiApp()
+        self.client_ip = client_ip
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="inprocess-api", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def requests_adapter(self) -> "InProcessAdapter":
+        return InProcessAdapter(self)
+
+    def async_transport(self) -> "InProcessTransport":
+        return InProcessTransport(self)
+
+    def request(self, method: str, url: str, headers: RawHeaders, body: bytes, timeout: Optional[float] = None):
+        """Run one request on the app loop from any other thread"""
+        future = asyncio.run_coroutine_threadsafe(self._call(method, url, headers, body), self.loop)
+        return future.result(timeout)
+
+    async def websocket_connect(self, url: str) -> "InProcessWebSocket":
+        """Open a connection to the app's WebSocket feed from another event loop"""
+        socket = InProcessWebSocket(self)
+        await socket.open(url)
+        return socket
+
+    async def arequest(self, method: str, url: str, headers: RawHeaders, body: bytes):
+        """Run one request on the app loop from another event loop"""
+        future = asyncio.run_coroutine_threadsafe(self._call(method, url, headers, body), self.loop)
+        return await asyncio.wrap_future(future)
+
+    async def _call(self, method: str, url: str, headers: RawHeaders, body: bytes) -> Tuple[int, RawHeaders, bytes]:
+        parts = urlsplit(url)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": parts.scheme or "http",
+            "path": parts.path or "/",
+            "raw_path": (parts.path or "/").encode(),
+            "query_string": parts.query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": (self.client_ip, 0),
+            "server": (parts.hostname, parts.port or 80),
+        }
+        request_sent = False
+        disconnected = asyncio.Event()
+        status = 500
+        response_headers: RawHeaders = []
+        chunks = []
+
+        async def receive() -> dict:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            disconnected.set()
+        return status, response_headers, b"".join(chunks)
+
+
+def _raw_headers(headers: Iterable[Tuple[str, str]]) -> RawHeaders:
+    return [(k.lower().encode("latin-1"), str(v).encode("latin-1")) for k, v in headers]
+
+
+class InProcessWebSocket:
+    """websockets-style client end of an ASGI websocket session on the app loop"""
+
+    def __init__(self, server: InProcessServer):
+        self.server = server
+        self._loop = asyncio.get_running_loop()
+        self._to_app: asyncio.Queue = asyncio.Queue()  # only touched on the app loop
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._session = None
+        self._closed = False
+
+    async def open(self, url: str) -> None:
+        parts = urlsplit(url)
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": parts.scheme or "ws",
+            "path": parts.path or "/",
+            "raw_path": (parts.path or "/").encode(),
+            "query_string": parts.query.encode(),
+            "root_path": "",
+            "headers": [],
+            "client": (self.server.client_ip, 0),
+            "server": (parts.hostname, parts.port or 80),
+            "subprotocols": [],
+        }
+        connected = False
+
+        async def receive() -> dict:
+            nonlocal connected
+            if not connected:
+                connected = True
+                return {"type": "websocket.connect"}
+            return await self._to_app.get()
+
+        async def send(message: dict) -> None:
+            self._deliver(message)
+
+        self._session = asyncio.run_coroutine_threadsafe(self.server.app(scope, receive, send), self.server.loop)
+        self._session.add_done_callback(lambda _: self._deliver({"type": "websocket.close"}))
+        if (await self._from_app.get())["type"] != "websocket.accept":
+            self._closed = True
+            raise ConnectionRefusedError(f"WebSocket connection to {url} was refused")
+
+    def _deliver(self, message: dict) -> None:
+        """Hand a message from the app loop to this connection's loop"""
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._from_app.put_nowait, message)
+
+    async def send(self, message: str) -> None:
+        if self._closed:
+            raise websockets.exceptions.ConnectionClosedOK(None, None)
+        event = {"type": "websocket.receive", "text": message}
+        self.server.loop.call_soon_threadsafe(self._to_app.put_nowait, event)
+
+    async def recv(self) -> str:
+        message = await self._from_app.get() if not self._closed else {"type": "websocket.close"}
+        if message["type"] == "websocket.close":
+            self._closed = True
+            raise websockets.exceptions.ConnectionClosedOK(None, None)
+        return message["text"]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        try:
+            return await self.recv()
+        except websockets.exceptions.ConnectionClosedOK:
+            raise StopAsyncIteration
+
+    async def close(self) -> None:
+        if self._session is None or self._session.done():
+            self._closed = True
+            return
+        self._closed = True
+        event = {"type": "websocket.disconnect", "code": 1000}
+        self.server.loop.call_soon_threadsafe(self._to_app.put_nowait, event)
+        await asyncio.wrap_future(self._session)
+
+
+class InProcessAdapter(BaseAdapter):
+    """requests transport adapter that calls the in-process app directly"""
+
+    def __init__(self, server: InProcessServer):
+        super().__init__()
+        self.server = server
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if isinstance(timeout, tuple):
+            timeout = timeout[1]
+
+        status, headers, content = self.server.request(
+            request.method, request.url, _raw_headers(request.headers.items()), body, timeout
+        )
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response.headers = CaseInsensitiveDict({k.decode("latin-1"): v.decode("latin-1") for k, v in headers})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        response._content_consumed = True  # body is in memory, also for stream=True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class InProcessTransport:
+    """AsyncApiClient transport that calls the in-process app directly"""
+
+    def __init__(self, server: InProcessServer):
+        self.server = server
+
+    async def send(self, method: str, url: str, headers: Dict[str, str], body: bytes):
+        status, raw_headers, content = await self.server.arequest(method, url, _raw_headers(headers.items()), body)
+        return status, {k.decode("latin-1"): v.decode("latin-1") for k, v in raw_headers}, content
+
+    async def aclose(self) -> None:
+        pass
@@ -0,0 +1,200 @@
+"""Wait for many jobs to finish over a single WebSocket.
+
+JobWaiter authenticates one socket with the `{type: 'auth', token}` handshake
+and resolves a future per jobId as `broadcastJobUpdate` messages arrive. If
+the socket cannot be opened, or drops mid-run, pending jobs are tracked by
+polling the multi-job status query instead: one request per 1000 jobs,
+asking only for jobs that changed since the previous poll, backing off while
+nothing changes. Jobs first waited on while streaming are looked up once
+through the same query, since they may have finished before the socket was
+authenticated and will get no further update.
+A job the server already evicted (410) counts as finished with status
+"evicted".
+"""
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import websockets
+
+from async_client import AsyncApiClient
+
+TERMINAL_STATUSES = ("done", "failed", "evicted")
+STATUS_QUERY_MAX = 1000  # ids per status query
+
+
+class JobWaiter:
+    """Resolves job futures from WebSocket updates, falling back to polling"""
+
+    def __init__(
+        self,
+        client: AsyncApiClient,
+        token: Optional[str] = None,
+        ws_url: Optional[str] = None,
+        poll_min: float = 0.25,
+        poll_max: float = 2.0,
+        websocket: bool = True,
+        connect: Callable = websockets.connect,
+    ):
+        self.client = client
+        self.token = token or client.token
+        self.ws_url = ws_url or client.base_url.replace("http", "ws", 1)
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.websocket = websocket
+        self.connect = connect
+
+        # jobId -> [(status, server timestamp, local monotonic receive time)]
+        self.transitions: Dict[str, List[Tuple[str, str, float]]] = {}
+        self._status: Dict[str, str] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        # jobId -> asOf of the last status query that covered it
+        self._polled_as_of: Dict[str, str] = {}
+        self._ws = None
+        self._reader: Optional[asyncio.Task] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def streaming(self) -> bool:
+        """True while updates arrive over the WebSocket rather than polling"""
+        return self._reader is not None and not self._reader.done()
+
+    async def start(self) -> "JobWaiter":
+        if not self.websocket:
+            self._start_polling()
+            return self
+
+        try:
+            self._ws = await self.connect(self.ws_url)
+            await self._ws.send(json.dumps({"type": "auth", "token": self.token}))
+            ack = json.loads(await asyncio.wait_for(self._ws.recv(), timeout=5))
+            if ack.get("status") != "success":
+                raise ConnectionError(f"WebSocket auth failed: {ack}")
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException, ConnectionError):
+            await self._close_socket()
+            self._start_polling()
+            return self
+
+        self._reader = asyncio.create_task(self._read())
+        return self
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in (self._reader, self._poller):
+            if task is not None:
+                task.cancel()
+        await self._close_socket()
+        for future in self._futures.values():
+            if not future.done():
+                future.cancel()
+
+    async def __aenter__(self) -> "JobWaiter":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def wait(self, job_id: str, timeout: float = 30.0) -> dict:
+        """Block until the job is done, failed or evicted and return its status body"""
+        await self._track([job_id])
+        return await self._wait(job_id, timeout)
+
+    async def wait_all(self, job_ids: Iterable[str], timeout: float = 30.0) -> List[dict]:
+        """Wait for every job concurrently, preserving order"""
+        job_ids = list(job_ids)
+        await self._track(job_ids)
+        return await asyncio.gather(*(self._wait(job_id, timeout) for job_id in job_ids))
+
+    async def _track(self, job_ids: List[str]) -> None:
+        """Give unfinished jobs a future; while streaming, catch up on ones already over"""
+        loop = asyncio.get_running_loop()
+        new = []
+        for job_id in job_ids:
+            if self._status.get(job_id) not in TERMINAL_STATUSES and job_id not in self._futures:
+                self._futures[job_id] = loop.create_future()
+                new.append(job_id)
+        if new and self.streaming:
+            await self._query(new)
+
+    async def _wait(self, job_id: str, timeout: float) -> dict:
+        future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+
+        response = await self.client.get_job(job_id, token=self.token)
+        if response.status_code != 410:
+            response.raise_for_status()
+        return response.json()
+
+    def _record(self, job_id: str, status: str, timestamp: str) -> None:
+        # A status query answered before a socket update can arrive after it
+        if self._status.get(job_id) in (status, *TERMINAL_STATUSES):
+            return
+        self._status[job_id] = status
+        self.transitions.setdefault(job_id, []).append((status, timestamp, time.monotonic()))
+
+        if status in TERMINAL_STATUSES:
+            self._polled_as_of.pop(job_id, None)
+            future = self._futures.pop(job_id, None)
+            if future is not None and not future.done():
+                future.set_result(status)
+
+    async def _read(self) -> None:
+        try:
+            async for message in self._ws:
+                update = json.loads(message)
+                if "jobId" in update:
+                    self._record(update["jobId"], update["status"], update.get("timestamp"))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self._start_polling()
+
+    def _start_polling(self) -> None:
+        if self._poller is None and not self._closing:
+            self._poller = asyncio.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        """Poll pending jobs, doubling the interval while none of them move"""
+        interval = self.poll_min
+        while True:
+            await asyncio.sleep(interval)
+            pending = list(self._futures)
+            if not pending:
+                continue
+
+            # Jobs not polled yet are asked for unconditionally, the rest by changedSince
+            groups: Dict[Optional[str], List[str]] = {}
+            for job_id in pending:
+                groups.setdefault(self._polled_as_of.get(job_id), []).append(job_id)
+
+            changed = False
+            for since, job_ids in groups.items():
+                changed = await self._query(job_ids, since) or changed
+
+            interval = self.poll_min if changed else min(interval * 2, self.poll_max)
+
+    async def _query(self, job_ids: List[str], changed_since: Optional[str] = None) -> bool:
+        """Record what the status query says about `job_ids`; True if any of them moved"""
+        changed = False
+        for start in range(0, len(job_ids), STATUS_QUERY_MAX):
+            chunk = job_ids[start:start + STATUS_QUERY_MAX]
+            response = await self.client.get_statuses(chunk, changed_since=changed_since, token=self.token)
+            if response.status_code != 200:
+                continue
+            body = response.json()
+            for job in body["jobs"] + body["evicted"]:
+                if self._status.get(job["jobId"]) != job["status"]:
+                    changed = True
+                self._record(job["jobId"], job["status"], job.get("updatedAt"))
+            for job_id in chunk:
+                if job_id in self._futures:
+                    self._polled_as_of[job_id] = body["asOf"]
+        return changed
+
+    async def _close_socket(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
@@ -0,0 +1,241 @@
+"""Streaming analyzer for k6 `--out json` results.
+
+Reads the NDJSON file line by line and folds every Point of the tracked
+metrics into LatencyHistograms (trends) or hit counters (`errors`), kept
+overall, per tag value and per time bucket. Nothing per sample is kept, so
+memory depends on the number of routes, statuses and buckets, not on the
+size of the file: a 40-minute soak with 10s buckets is 240 small histograms
+per metric whether the file holds ten thousand points or ten million.
+
+URLs are collapsed to the route templates of docs/api-spec.yaml (the same
+keys the pytest latency table uses), so job IDs never become tag values.
+Several files (e.g. one per k6 instance) are merged into one report, and
+`.gz` files are read without unpacking them first.
+
+Usage:
+    python k6_analyze.py results.json
+    python k6_analyze.py results.json.gz --bucket 30s --json summary.json
+"""
+import argparse
+import gzip
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from histogram import LatencyHistogram
+from latency_plugin import LatencyRecorder
+from loadgen import P95_THRESHOLDS_MS, parse_duration
+
+TREND_METRICS = ("http_req_duration", "qa_submission_time", "job_status_time")
+RATE_METRICS = ("errors",)
+GROUP_TAGS = ("route", "method", "status")
+
+# Cheap substring test run before json.loads; k6 writes ~10 metrics per request
+_MARKERS = tuple(f'"{name}"' for name in TREND_METRICS + RATE_METRICS)
+
+
+class RateCounter:
+    """Mergeable counterpart of a k6 Rate: non-zero samples over all samples"""
+
+    __slots__ = ("count", "hits")
+
+    def __init__(self):
+        self.count = 0
+        self.hits = 0
+
+    def record(self, value: float) -> None:
+        self.count += 1
+        self.hits += value != 0
+
+    def merge(self, other: "RateCounter") -> "RateCounter":
+        self.count += other.count
+        self.hits += other.hits
+        return self
+
+    def summary(self) -> Dict[str, float]:
+        return {"count": self.count, "hits": self.hits, "rate": self.hits / self.count if self.count else 0.0}
+
+
+# Epoch seconds of the last whole second parsed; points arrive in time order
+_second_cache: Dict[str, float] = {}
+
+
+def parse_time(text: str) -> float:
+    """RFC 3339 timestamp with any number of fraction digits -> epoch seconds"""
+    # k6 writes nanoseconds, which datetime cannot parse, so the fraction is split off
+    head, fraction, zone = text[:19], "", "Z"
+    rest = text[19:]
+    if rest.startswith("."):
+        end = 1
+        while end < len(rest) and rest[end].isdigit():
+            end += 1
+        fraction, rest = rest[1:end], rest[end:]
+    if rest:
+        zone = rest
+
+    key = head + zone
+    seconds = _second_cache.get(key)
+    if seconds is None:
+        moment = datetime.strptime(head, "%Y-%m-%dT%H:%M:%S")
+        if zone in ("Z", "z"):
+            offset = timedelta(0)
+        else:
+            sign = -1 if zone[0] == "-" else 1
+            offset = sign * timedelta(hours=int(zone[1:3]), minutes=int(zone[4:6]))
+        seconds = moment.replace(tzinfo=timezone(offset)).timestamp()
+        _second_cache.clear()
+        _second_cache[key] = seconds
+    return seconds + (float(f"0.{fraction}") if fraction else 0.0)
+
+
+class K6Analysis:
+    """Overall, per-tag and per-bucket aggregates for the tracked metrics"""
+
+    def __init__(self, bucket_seconds: float = 10.0):
+        self.bucket_seconds = bucket_seconds
+        self.router = LatencyRecorder()
+        self.overall: Dict[str, object] = {}
+        self.by_tag: Dict[Tuple[str, str, str], object] = {}
+        self.series: Dict[Tuple[str, int], object] = {}
+        self.start: Optional[float] = None
+        self.points = 0
+
+    @staticmethod
+    def _new(metric: str):
+        return RateCounter() if metric in RATE_METRICS else LatencyHistogram()
+
+    def _get(self, table: dict, key, metric: str):
+        aggregate = table.get(key)
+        if aggregate is None:
+            aggregate = table[key] = self._new(metric)
+        return aggregate
+
+    def add(self, metric: str, at: float, value: float, tags: Dict[str, str]) -> None:
+        # Trends are in milliseconds, histograms take seconds
+        sample = value if metric in RATE_METRICS else value / 1000
+        self.points += 1
+        if self.start is None or at < self.start:
+            self.start = at
+
+        self._get(self.overall, metric, metric).record(sample)
+        self._get(self.series, (metric, int(at // self.bucket_seconds)), metric).record(sample)
+
+        url = tags.get("name") or tags.get("url")
+        groups = {"route": self.router.route(url) if url else None, "method": tags.get("method"),
+                  "status": tags.get("status")}
+        for tag in GROUP_TAGS:
+            if groups[tag]:
+                self._get(self.by_tag, (metric, tag, groups[tag]), metric).record(sample)
+
+    def feed(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            if '"Point"' not in line or not any(marker in line for marker in _MARKERS):
+                continue
+            point = json.loads(line)
+            metric = point.get("metric")
+            if point.get("type") != "Point" or metric not in TREND_METRICS + RATE_METRICS:
+                continue
+            data = point["data"]
+            self.add(metric, parse_time(data["time"]), data["value"], data.get("tags") or {})
+
+    def feed_file(self, path: str) -> None:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as handle:
+            self.feed(handle)
+
+    def merge(self, other: "K6Analysis") -> "K6Analysis":
+        for table, theirs in ((self.overall, other.overall), (self.by_tag, other.by_tag),
+                              (self.series, other.series)):
+            for key, aggregate in theirs.items():
+                if key in table:
+                    table[key].merge(aggregate)
+                else:
+                    table[key] = aggregate
+        if other.start is not None and (self.start is None or other.start < self.start):
+            self.start = other.start
+        self.points += other.points
+        return self
+
+    def report(self) -> dict:
+        metrics = {}
+        for metric in TREND_METRICS + RATE_METRICS:
+            if metric not in self.overall:
+                continue
+            by_tag: Dict[str, Dict[str, dict]] = {}
+            for (name, tag, value), aggregate in sorted(self.by_tag.items()):
+                if name == metric:
+                    by_tag.setdefault(tag, {})[value] = aggregate.summary()
+            buckets = sorted(index for name, index in self.series if name == metric)
+            first = int(self.start // self.bucket_seconds)
+            series = [
+                {"offset": (index - first) * self.bucket_seconds, **self.series[(metric, index)].summary()}
+                for index in buckets
+            ]
+            metrics[metric] = {"overall": self.overall[metric].summary(), "by_tag": by_tag, "series": series}
+        return {
+            "start": self.start,
+            "bucket_seconds": self.bucket_seconds,
+            "points": self.points,
+            "metrics": metrics,
+        }
+
+
+def format_report(report: dict) -> List[str]:
+    lines = [f"{report['points']} points, {report['bucket_seconds']:g}s buckets"]
+    for metric, data in report["metrics"].items():
+        lines.append("")
+        overall = data["overall"]
+        if metric in RATE_METRICS:
+            lines.append(f"{metric}: {overall['rate']:.2%} of {overall['count']}")
+            for tag, values in data["by_tag"].items():
+                for value, stats in values.items():
+                    lines.append(f"  {tag}={value:<36} {stats['rate']:>8.2%} of {stats['count']}")
+            lines.append(f"  {'offset':>8} {'count':>7} {'rate':>8}")
+            for point in data["series"]:
+                lines.append(f"  {point['offset']:>7g}s {point['count']:>7} {point['rate']:>8.2%}")
+            continue
+
+        threshold = P95_THRESHOLDS_MS.get(metric)
+        verdict = "" if threshold is None else (" ✓" if overall["p95"] < threshold else " ✗") + f" p95<{threshold}"
+        lines.append(
+            f"{metric}: count={overall['count']} p50={overall['p50']:.1f}ms p95={overall['p95']:.1f}ms "
+            f"p99={overall['p99']:.1f}ms max={overall['max']:.1f}ms{verdict}"
+        )
+        for tag, values in data["by_tag"].items():
+            for value, stats in values.items():
+                lines.append(
+                    f"  {tag}={value:<36} {stats['count']:>7} p50={stats['p50']:>8.1f} "
+                    f"p95={stats['p95']:>8.1f} p99={stats['p99']:>8.1f}"
+                )
+        lines.append(f"  {'offset':>8} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+        for point in data["series"]:
+            lines.append(
+                f"  {point['offset']:>7g}s {point['count']:>7} {point['p50']:>9.1f} {point['p95']:>9.1f} "
+                f"{point['p99']:>9.1f} {point['max']:>9.1f}"
+            )
+    return lines
+
+
+def main(args: argparse.Namespace) -> int:
+    analysis = K6Analysis(parse_duration(args.bucket))
+    for path in args.files:
+        analysis.feed_file(path)
+    if not analysis.points:
+        print("No points for the tracked metrics found", file=sys.stderr)
+        return 1
+
+    report = analysis.report()
+    print("\n".join(format_report(report)))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize k6 --out json results in constant memory")
+    parser.add_argument("files", nargs="+", help="k6 NDJSON output, optionally gzipped")
+    parser.add_argument("--bucket", default="10s", help="time series bucket width (default 10s)")
+    parser.add_argument("--json", help="also write the report as JSON to this path")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+"""pytest plugin that turns every functional run into a latency sample.
+
+Each response seen by the `session` fixture or an AsyncApiClient fixture is
+recorded into a LatencyHistogram keyed by method and route template taken
+from docs/api-spec.yaml, e.g. `GET /api/v1/qa/{jobId}`. At session end the
+per-endpoint count/p50/p95/p99/max is printed in the terminal summary and
+added under "latency" to the pytest-json-report output (`--json-report`).
+Under pytest-xdist each worker ships its histograms to the controller,
+which merges them before reporting. Responses replayed from a cassette are
+not timed.
+"""
+import os
+import re
+from typing import Dict, List, Pattern, Tuple
+from urllib.parse import urlsplit
+
+import pytest
+import yaml
+
+from cassette import REPLAY_HEADER
+from histogram import LatencyHistogram
+from schema_validators import SPEC_PATH
+
+UUID_SEGMENT = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+
+
+def route_patterns(spec_path=SPEC_PATH) -> List[Tuple[Pattern, str]]:
+    """(regex, template) for every path in the spec, literal paths first"""
+    patterns = []
+    for template in yaml.safe_load(spec_path.read_text())["paths"]:
+        regex = re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(template))
+        patterns.append((re.compile(f"^{regex}$"), template))
+    # A literal sibling such as /api/v1/qa/stream must win over /api/v1/qa/{jobId}
+    patterns.sort(key=lambda pattern: "{" in pattern[1])
+    return patterns
+
+
+class LatencyRecorder:
+    """Per-endpoint latency histograms for one pytest process"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.patterns = route_patterns()
+
+    def route(self, url: str) -> str:
+        path = urlsplit(url).path
+        for pattern, template in self.patterns:
+            if pattern.match(path):
+                return template
+        # Unknown paths still must not create one key per job
+        return UUID_SEGMENT.sub("{id}", path)
+
+    def record(self, method: str, url: str, seconds: float) -> None:
+        key = f"{method.upper()} {self.route(url)}"
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def requests_hook(self, response, *args, **kwargs):
+        """Response hook for requests.Session"""
+        if REPLAY_HEADER in response.headers:
+            return
+        self.record(response.request.method, response.url, response.elapsed.total_seconds())
+
+    def async_hook(self, response) -> None:
+        """Hook for AsyncApiClient.hooks"""
+        if REPLAY_HEADER in response.headers:
+            return
+        self.record(response.method, response.url, response.elapsed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {key: self.histograms[key].summary() for key in sorted(self.histograms)}
+
+
+class LatencyPlugin:
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.recorder = LatencyRecorder()
+
+    @pytest.fixture(scope="session")
+    def latency_recorder(self) -> LatencyRecorder:
+        """Records the latency of every request made through the client fixtures"""
+        return self.recorder
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if os.getenv("PYTEST_XDIST_WORKER") and hasattr(session.config, "workeroutput"):
+            session.config.workeroutput["latency"] = {
+                key: histogram.to_state() for key, histogram in self.recorder.histograms.items()
+            }
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error) -> None:
+        for key, state in getattr(node, "workeroutput", {}).get("latency", {}).items():
+            histogram = LatencyHistogram.from_state(state)
+            if key in self.recorder.histograms:
+                self.recorder.histograms[key].merge(histogram)
+            else:
+                self.recorder.histograms[key] = histogram
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_json_modifyreport(self, json_report: dict) -> None:
+        json_report["latency"] = self.recorder.summary()
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if os.getenv("PYTEST_XDIST_WORKER") or not self.recorder.histograms:
+            return
+        terminalreporter.section("API latency (ms)")
+        terminalreporter.write_line(
+            f"{'endpoint':<40} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+        )
+        for key, stats in self.recorder.summary().items():
+            terminalreporter.write_line(
+                f"{key:<40} {stats['count']:>7} {stats['p50']:>9.2f} {stats['p95']:>9.2f} "
+                f"{stats['p99']:>9.2f} {stats['max']:>9.2f}"
+            )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.pluginmanager.register(LatencyPlugin(config), "latency-recorder")
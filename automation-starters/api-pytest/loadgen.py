@@ -0,0 +1,376 @@
+"""Open-model load generator for the Processing API.
+
+Python counterpart of perf/nlq_load_test.js for hosts without k6. Iterations
+are started at a scheduled arrival rate (constant or ramping between stages)
+regardless of how long earlier ones take, so a slow server shows up as
+rising latency and in-flight counts instead of silently lowering the load.
+Each iteration runs the same mix as the k6 script: POST /api/v1/qa, a status
+check of a recently submitted job, and GET /api/v1/qa 30% of the time. Auth
+goes through TokenCache and every body is checked with the compiled schema
+validators used by the tests.
+
+Usage:
+    python loadgen.py                              # k6 default stages, 5 -> 20 RPS
+    python loadgen.py --scenario stress
+    python loadgen.py --rate 1000 --duration 60s   # constant arrival rate
+    python loadgen.py --stages 30s:50,1m:50,30s:0
+    python loadgen.py --inprocess --rate 50 --duration 10s     # smoke run, no server needed
+    python loadgen.py --seed 42                    # reproducible request mix and server randomness
+    python loadgen.py --user-rate-limit 100000     # lift the 100/min per-user limit
+    python loadgen.py --batch-size 20              # submit through POST /api/v1/qa/batch
+    python loadgen.py --status-query multi         # poll recent jobs through /api/v1/qa/status
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from async_client import AsyncApiClient
+from config import config
+from histogram import LatencyHistogram
+from inprocess_transport import InProcessServer
+from mock_controls import MockAnswerCache, MockRateLimits, MockSeed
+from schema_validators import SchemaError, SchemaValidators
+from token_cache import TokenCache
+
+# (duration seconds, target RPS) pairs, ramping linearly from the previous target
+Stages = List[Tuple[float, float]]
+
+SCENARIOS: Dict[str, Stages] = {
+    "load": [(120, 5), (300, 10), (180, 20), (180, 20), (120, 0)],
+    "stress": [(60, 50), (300, 100), (60, 0)],
+    "soak": [(300, 10), (1800, 10), (300, 0)],
+}
+
+# Thresholds from nlq_load_test.js: metric -> p95 limit in milliseconds
+P95_THRESHOLDS_MS = {"http_req_duration": 1000, "qa_submission_time": 500, "job_status_time": 200}
+ERROR_RATE_THRESHOLD = 0.05
+
+TEST_QUESTIONS = [
+    "What are the Scope 1 emissions for this company?",
+    "Describe the company's renewable energy initiatives",
+    "What is the company's carbon neutrality target?",
+    "How does the company handle waste management?",
+    "What are the company's water conservation practices?",
+]
+
+TEST_COMPANIES = ["Nokia", "Apple Inc", "Microsoft Corporation", "Google", "Amazon"]
+
+
+def parse_duration(text: str) -> float:
+    """'90', '90s', '2m' or '1h' -> seconds"""
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def parse_stages(text: str) -> Stages:
+    """'2m:5,5m:10' -> [(120, 5), (300, 10)]"""
+    stages = []
+    for part in text.split(","):
+        duration, target = part.split(":")
+        stages.append((parse_duration(duration), float(target)))
+    return stages
+
+
+def arrival_times(stages: Stages, start_rate: float = 0.0) -> Iterator[float]:
+    """Offsets (seconds from start) of every arrival for piecewise-linear rates.
+
+    Within a stage the rate is r(t) = r0 + k*t, so the expected arrival count
+    is A(t) = r0*t + k*t^2/2; arrival n happens where A(t) = n.
+    """
+    stage_start = 0.0
+    arrivals = 0.0  # expected arrivals before the current stage
+    issued = 0
+    rate = start_rate
+    for duration, target in stages:
+        slope = (target - rate) / duration if duration else 0.0
+        stage_total = rate * duration + slope * duration ** 2 / 2
+        while issued + 1 <= arrivals + stage_total + 1e-9:
+            need = issued + 1 - arrivals
+            if abs(slope) < 1e-12:
+                t = need / rate
+            else:
+                t = (-rate + math.sqrt(max(rate * rate + 2 * slope * need, 0.0))) / slope
+            issued += 1
+            yield stage_start + t
+        stage_start += duration
+        arrivals += stage_total
+        rate = target
+
+
+class Metrics:
+    """Latency histograms per metric plus the k6-style `errors` rate"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {name: LatencyHistogram() for name in P95_THRESHOLDS_MS}
+        self.checks = 0
+        self.errors = 0
+        self.dropped = 0
+        self.throttled = 0  # 429s from the rate limits and 503s from a full job queue
+
+    def record(self, name: Optional[str], seconds: float) -> None:
+        if name:
+            self.histograms[name].record(seconds)
+        self.histograms["http_req_duration"].record(seconds)
+
+    def check(self, ok: bool) -> None:
+        self.checks += 1
+        self.errors += not ok
+
+    def summary(self) -> Tuple[List[str], bool]:
+        lines, passed = [], True
+        for name, histogram in self.histograms.items():
+            stats = histogram.summary()
+            ok = stats["p95"] < P95_THRESHOLDS_MS[name]
+            passed &= ok
+            lines.append(
+                f"{'✓' if ok else '✗'} {name:.<24}: count={stats['count']} p50={stats['p50']:.1f}ms "
+                f"p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms max={stats['max']:.1f}ms"
+            )
+        error_rate = self.errors / self.checks if self.checks else 0.0
+        ok = error_rate < ERROR_RATE_THRESHOLD
+        passed &= ok
+        lines.append(f"{'✓' if ok else '✗'} {'errors':.<24}: {error_rate:.2%} of {self.checks} checks")
+        lines.append(f"  {'dropped_iterations':.<24}: {self.dropped}")
+        lines.append(f"  {'throttled':.<24}: {self.throttled}")
+        return lines, passed
+
+
+class LoadGenerator:
+    """Starts one iteration per scheduled arrival, capped at max_in_flight"""
+
+    def __init__(self, client: AsyncApiClient, schemas: SchemaValidators, max_in_flight: int = 1000,
+                 batch_size: int = 1, status_query: str = "single"):
+        self.client = client
+        self.schemas = schemas
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.status_query = status_query
+        self.status_as_of: Optional[str] = None
+        self.metrics = Metrics()
+        self.submitted_jobs: deque = deque(maxlen=50)
+        self._in_flight = 0
+
+    async def run(self, stages: Stages, start_rate: float = 0.0) -> Metrics:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = set()
+        for offset in arrival_times(stages, start_rate):
+            delay = start + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self._in_flight >= self.max_in_flight:
+                self.metrics.dropped += 1
+                continue
+            task = asyncio.create_task(self.iteration())
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        return self.metrics
+
+    async def iteration(self) -> None:
+        self._in_flight += 1
+        try:
+            await self.submit_question()
+            if self.submitted_jobs:
+                await self.check_job_status()
+            if random.random() < 0.3:
+                await self.get_recent_answers()
+        finally:
+            self._in_flight -= 1
+
+    async def _timed(self, metric: Optional[str], coro):
+        started = time.perf_counter()
+        try:
+            response = await coro
+        except Exception:
+            self.metrics.check(False)
+            return None
+        self.metrics.record(metric, time.perf_counter() - started)
+        self.metrics.throttled += response.status_code in (429, 503)
+        return response
+
+    def _validate(self, response, status: int, schema: str) -> Optional[dict]:
+        if response is None:
+            return None
+        ok = response.status_code == status
+        body = None
+        if ok:
+            try:
+                body = self.schemas.validate(schema, response.json())
+            except (SchemaError, ValueError):
+                ok = False
+        self.metrics.check(ok)
+        return body if ok else None
+
+    async def submit_question(self) -> None:
+        if self.batch_size > 1:
+            await self.submit_batch()
+            return
+        response = await self._timed("qa_submission_time", self.client.submit_question(
+            random.choice(TEST_QUESTIONS), random.choice(TEST_COMPANIES)
+        ))
+        body = self._validate(response, 202, "JobResponse")
+        if body is not None:
+            self.submitted_jobs.append((body["jobId"], time.monotonic()))
+
+    async def submit_batch(self) -> None:
+        items = [{"question": random.choice(TEST_QUESTIONS), "company": random.choice(TEST_COMPANIES)}
+                 for _ in range(self.batch_size)]
+        response = await self._timed("qa_submission_time", self.client.submit_batch(items))
+        body = self._validate(response, 202, "BatchResponse")
+        if body is None:
+            return
+        if body["accepted"] != self.batch_size:
+            self.metrics.check(False)
+        now = time.monotonic()
+        self.submitted_jobs.extend((result["jobId"], now) for result in body["results"] if "jobId" in result)
+
+    async def check_job_status(self) -> None:
+        recent = [job_id for job_id, at in self.submitted_jobs if time.monotonic() - at < 300]
+        if not recent:
+            return
+        if self.status_query == "multi":
+            await self.check_job_statuses(recent)
+            return
+        job_id = random.choice(recent)
+        response = await self._timed("job_status_time", self.client.get_job(job_id))
+        body = self._validate(response, 200, "JobStatus")
+        if body is not None and body["jobId"] != job_id:
+            self.metrics.check(False)
+
+    async def check_job_statuses(self, job_ids: List[str]) -> None:
+        """One query for every recent job; after the first, only jobs that moved come back"""
+        response = await self._timed(
+            "job_status_time", self.client.get_statuses(job_ids, changed_since=self.status_as_of)
+        )
+        if response is None:
+            return
+        ok = response.status_code == 200
+        if ok:
+            try:
+                body = response.json()
+                self.schemas.validate("JobStatusList", body)
+                self.status_as_of = body["asOf"]
+            except (SchemaError, KeyError, ValueError):
+                ok = False
+        self.metrics.check(ok)
+
+    async def get_recent_answers(self) -> None:
+        response = await self._timed(None, self.client.get_answers())
+        if response is None:
+            return
+        ok = response.status_code == 200
+        if ok:
+            try:
+                answers = response.json()["answers"]
+                ok = len(answers) <= 10
+                for answer in answers:
+                    self.schemas.validate("Answer", answer)
+            except (SchemaError, KeyError, ValueError):
+                ok = False
+        self.metrics.check(ok)
+
+
+def login(base_url: str, session: requests.Session) -> str:
+    """Analyst token via the same TokenCache the fixtures use"""
+
+    def do_login(email, password):
+        response = session.post(f"{base_url}/api/v1/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        return response.json()
+
+    return TokenCache(do_login, base_url).get(config.analyst_email, config.analyst_password)
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.rate is not None:
+        stages = [(parse_duration(args.duration), args.rate)]
+        start_rate = args.rate
+    else:
+        stages = parse_stages(args.stages) if args.stages else SCENARIOS[args.scenario]
+        start_rate = 0.0
+
+    session = requests.Session()
+    transport = None
+    server = None
+    if args.inprocess:
+        # Drive the Python stand-in; it shares this process's GIL, so this
+        # checks the script end to end rather than measuring throughput
+        server = InProcessServer()
+        args.base_url = server.base_url
+        session.mount(server.base_url, server.requests_adapter())
+        transport = server.async_transport()
+
+    if args.seed is not None:
+        # Seeds this script's request mix and the mock server's streams alike
+        random.seed(args.seed)
+        MockSeed(session, args.base_url).set(args.seed)
+    if args.user_rate_limit is not None:
+        MockRateLimits(session, args.base_url).set("api", args.user_rate_limit)
+    if args.answer_cache_entries is not None:
+        MockAnswerCache(session, args.base_url).set(args.answer_cache_entries)
+
+    token = login(args.base_url, session)
+    schemas = SchemaValidators()
+    try:
+        async with AsyncApiClient(
+            base_url=args.base_url, token=token, max_connections=args.connections, transport=transport
+        ) as client:
+            generator = LoadGenerator(
+                client, schemas, max_in_flight=args.max_in_flight, batch_size=args.batch_size,
+                status_query=args.status_query,
+            )
+            started = time.perf_counter()
+            await generator.run(stages, start_rate)
+            elapsed = time.perf_counter() - started
+            await client.logout()
+        # Server-side queueing delay and answer cache; only the mock server has /mock endpoints
+        response = session.get(f"{args.base_url}/mock/stats")
+        stats = response.json() if response.status_code == 200 else None
+    finally:
+        if server is not None:
+            server.close()
+
+    lines, passed = generator.metrics.summary()
+    print(f"Ran {sum(d for d, _ in stages):.0f}s of scheduled load in {elapsed:.1f}s against {args.base_url}")
+    print("\n".join(lines))
+    if stats is not None:
+        scheduler, cache = stats["scheduler"], stats["answerCache"]
+        wait = scheduler["waitMs"]
+        print(f"  {'server_job_queue':.<24}: {scheduler['workers']} workers, {scheduler['rejected']} refused, "
+              f"wait p95={wait['p95']:.0f}ms max={wait['max']:.0f}ms")
+        print(f"  {'server_answer_cache':.<24}: {cache['hitRate']:.1%} hits ({cache['hits']} of "
+              f"{cache['hits'] + cache['misses']}), {cache['entries']} entries")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-model load generator for the Processing API")
+    parser.add_argument("--base-url", default=config.base_url)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="load")
+    parser.add_argument("--stages", help="comma-separated duration:target pairs, e.g. 30s:10,1m:20")
+    parser.add_argument("--rate", type=float, help="constant arrival rate in iterations per second")
+    parser.add_argument("--duration", default="1m", help="duration for --rate (default 1m)")
+    parser.add_argument("--connections", type=int, default=config.max_connections, help="connection pool size")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="iterations in flight before dropping")
+    parser.add_argument("--seed", help="seed for the request mix and the mock server's randomness")
+    parser.add_argument("--user-rate-limit", type=int,
+                        help="per-user requests/minute to set on the mock server (default: leave it, 100)")
+    parser.add_argument("--answer-cache-entries", type=int,
+                        help="answer cache size to set on the mock server, 0 to turn it off (default: leave it)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="questions per submission; above 1 uses POST /api/v1/qa/batch (max 100)")
+    parser.add_argument("--status-query", choices=("single", "multi"), default="single",
+                        help="status checks: one random job, or every recent job in one request")
+    parser.add_argument("--inprocess", action="store_true", help="target the in-process Python stand-in")
+    sys.exit(asyncio.run(main(parser.parse_args())))
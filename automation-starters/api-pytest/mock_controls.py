@@ -0,0 +1,189 @@
+"""Clients for the mock server's /mock controls.
+
+mock-api/server.js (and the in-process stand-in) expose their test knobs as
+GET/PUT /mock/<name>: GET reports the current settings and counters, PUT
+replaces the settings. Each control here reads them with state(), changes
+them with its own setters and puts back what state() captured with
+restore(); saved() wraps a block in that save/restore pair, which the
+conftest fixtures build on.
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, Optional, TypeVar, Union
+
+import requests
+
+from config import config
+
+Control = TypeVar("Control", bound="MockControl")
+
+
+class MockControl(ABC):
+    """GET/PUT of one /mock/<name> control"""
+
+    name = ""
+
+    def __init__(self, session: requests.Session, base_url: Optional[str] = None):
+        self.session = session
+        self.base_url = base_url or config.base_url
+
+    def _send(self, method: str, path: str = "", body: Optional[dict] = None) -> dict:
+        response = self.session.request(method, f"{self.base_url}/mock/{self.name}{path}", json=body)
+        response.raise_for_status()
+        return response.json()
+
+    def state(self) -> dict:
+        return self._send("GET")
+
+    @abstractmethod
+    def restore(self, state: dict) -> None:
+        """Put back the settings captured with state()"""
+
+    @contextmanager
+    def saved(self: Control) -> Iterator[Control]:
+        """Restores the current settings when the block exits"""
+        state = self.state()
+        try:
+            yield self
+        finally:
+            self.restore(state)
+
+
+class MockClock(MockControl):
+    """Virtual clock behind job timers, timestamps, rate-limit windows and JWT expiry
+
+    Freeze it so a test decides exactly when jobs move, advance it to skip
+    queue/processing delays or a token's 1-hour lifetime, or run it faster
+    than real time.
+    """
+
+    name = "clock"
+
+    def __init__(self, session: requests.Session, base_url: Optional[str] = None):
+        super().__init__(session, base_url)
+        self.advanced = 0.0  # virtual seconds skipped through this instance
+
+    def state(self) -> dict:
+        """{"now": ISO time, "scale": float, "pendingTimers": int}"""
+        return super().state()
+
+    def set_scale(self, scale: float) -> dict:
+        """Virtual seconds per real second; 0 freezes the clock"""
+        return self._send("PUT", "", {"scale": scale})
+
+    def freeze(self) -> dict:
+        return self.set_scale(0)
+
+    def advance(self, seconds: float) -> dict:
+        """Move the clock forward, firing every timer that falls due on the way"""
+        self.advanced += seconds
+        return self._send("POST", "/advance", {"seconds": seconds})
+
+    def restore(self, state: dict) -> None:
+        """Put back the scale captured with state(); virtual time does not go back"""
+        self.set_scale(state["scale"])
+
+
+class MockSeed(MockControl):
+    """Seed of the server's per-subsystem PRNG streams
+
+    Queue and processing delays, job failures, generated answers, confidence
+    scores and /aiml/answer errors each draw from their own stream derived
+    from one seed, so reseeding makes a test, or a benchmark run, replay the
+    same sequence of outcomes.
+    """
+
+    name = "seed"
+
+    def state(self) -> dict:
+        """{"seed": str, "streams": [names]}"""
+        return super().state()
+
+    def set(self, seed: Union[str, int]) -> dict:
+        """Restart every stream from `seed`"""
+        return self._send("PUT", "", {"seed": seed})
+
+    def restore(self, state: dict) -> None:
+        """Restart every stream from the seed captured with state()"""
+        self.set(state["seed"])
+
+
+class MockScheduler(MockControl):
+    """The server's pool of AIML workers and the bounded queue in front of it
+
+    Shrinking either makes a test reach a full queue, and its 503s, in a
+    couple of submissions.
+    """
+
+    name = "scheduler"
+
+    def state(self) -> dict:
+        """{"workers", "busy", "queued", "maxQueue", "rejected", "waitMs", ...}"""
+        return super().state()
+
+    def set(self, workers: Optional[int] = None, max_queue: Optional[int] = None) -> dict:
+        """Resize the pool and/or the queue; jobs already queued keep their place"""
+        body = {}
+        if workers is not None:
+            body["workers"] = workers
+        if max_queue is not None:
+            body["maxQueue"] = max_queue
+        return self._send("PUT", "", body)
+
+    def restore(self, state: dict) -> None:
+        """Put back the pool and queue sizes captured with state()"""
+        self.set(state["workers"], state["maxQueue"])
+
+
+class MockRateLimits(MockControl):
+    """The server's sliding-window rate limits
+
+    `aiml` (10/min per client IP on /aiml/answer), `api` (100/min per user on
+    every authenticated route) and `upload` (5/hour per admin). Replacing a
+    limit also resets its counts, so a test can provoke a 429 in a few
+    requests or keep a bulk test under the limit.
+    """
+
+    name = "rate-limits"
+
+    def state(self) -> dict:
+        """{name: {"limit", "windowSeconds", "keys"}}"""
+        return super().state()
+
+    def set(self, name: str, limit: int, window_seconds: Optional[float] = None) -> dict:
+        """Replace the `name` limiter with a fresh one allowing `limit` per window"""
+        body = {"limit": limit}
+        if window_seconds is not None:
+            body["windowSeconds"] = window_seconds
+        return self._send("PUT", "", {name: body})
+
+    def restore(self, state: dict) -> None:
+        """Put back limits captured with state()"""
+        self._send("PUT", "", {name: {"limit": s["limit"], "windowSeconds": s["windowSeconds"]}
+                               for name, s in state.items()})
+
+
+class MockAnswerCache(MockControl):
+    """The server's answer cache by normalized (company, question)
+
+    A repeated question is answered at submission, `done` straight away,
+    without an AIML call. Resizing the cache also clears it; a size of 0
+    turns it off, so every job goes through the full processing lifecycle.
+    """
+
+    name = "answer-cache"
+
+    def state(self) -> dict:
+        """{"entries", "maxEntries", "ttlSeconds", "hits", "misses", "hitRate", "evictions"}"""
+        return super().state()
+
+    def set(self, max_entries: int, ttl_seconds: Optional[float] = None) -> dict:
+        """Replace the cache with an empty one holding up to `max_entries` answers"""
+        body = {"maxEntries": max_entries}
+        if ttl_seconds is not None:
+            body["ttlSeconds"] = ttl_seconds
+        return self._send("PUT", "", body)
+
+    def restore(self, state: dict) -> None:
+        """Put back the size and TTL captured with state(); entries and counters start over"""
+        self.set(state["maxEntries"], state["ttlSeconds"])
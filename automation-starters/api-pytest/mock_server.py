@@ -0,0 +1,83 @@
+"""Run a private copy of the mock API server on an ephemeral port.
+
+server.js keeps every job, answer and rate-limit counter in memory, so
+parallel pytest-xdist workers sharing one server trip over each other's
+assertions. MockServer gives each worker its own process instead.
+"""
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+MOCK_API_DIR = Path(__file__).resolve().parents[2] / "mock-api"
+PORT_PATTERN = re.compile(r"running on http://localhost:(\d+)")
+
+
+class MockServer:
+    """Starts `node server.js` with PORT=0 and tears it down afterwards"""
+
+    def __init__(self, log_path: Path, node_bin: str = "node", startup_timeout: float = 15.0):
+        self.log_path = log_path
+        self.node_bin = node_bin
+        self.startup_timeout = startup_timeout
+        self.base_url: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self) -> str:
+        """Launch the server and return its base URL once /health answers"""
+        # Logs go to a file rather than a pipe so a chatty server never
+        # blocks on a full pipe buffer.
+        log = open(self.log_path, "w")
+        self._process = subprocess.Popen(
+            [self.node_bin, "server.js"],
+            cwd=MOCK_API_DIR,
+            env={**os.environ, "PORT": "0"},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        log.close()
+
+        deadline = time.monotonic() + self.startup_timeout
+        port = self._wait_for_port(deadline)
+        self.base_url = f"http://localhost:{port}"
+        self._wait_for_health(deadline)
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def _wait_for_port(self, deadline: float) -> int:
+        while time.monotonic() < deadline:
+            match = PORT_PATTERN.search(self.log_path.read_text(encoding="utf-8", errors="replace"))
+            if match:
+                return int(match.group(1))
+            if self._process.poll() is not None:
+                break
+            time.sleep(0.05)
+
+        self.stop()
+        raise RuntimeError(f"Mock server did not start, see {self.log_path}")
+
+    def _wait_for_health(self, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            try:
+                if requests.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.05)
+
+        self.stop()
+        raise RuntimeError(f"Mock server at {self.base_url} never became healthy")
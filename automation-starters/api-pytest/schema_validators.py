@@ -0,0 +1,190 @@
+"""Response validators compiled from docs/api-spec.yaml.
+
+Each schema under `components/schemas` is turned into Python source for a
+straight-line checker function and compiled once, so validating a response
+costs a handful of isinstance checks rather than a walk over the schema
+dict. Compiled validators are cached by the SHA-256 of the spec file.
+Supported keywords: type, properties, required, enum, format (uuid,
+date-time, email), minimum/maximum, minLength/maxLength, minItems/maxItems,
+items, nullable and $ref. Any other keyword (or format) fails compilation
+rather than being skipped, so a constraint added to the spec is never
+silently left unchecked.
+"""
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+SPEC_PATH = Path(__file__).resolve().parents[2] / "docs" / "api-spec.yaml"
+
+FORMATS = {
+    "uuid": re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE),
+    "date-time": re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$"),
+    "email": re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$"),
+}
+
+Validator = Callable[[Any], None]
+
+KEYWORDS = frozenset({
+    "type", "properties", "required", "enum", "format", "minimum", "maximum",
+    "minLength", "maxLength", "minItems", "maxItems", "items", "nullable", "$ref",
+})
+ANNOTATIONS = frozenset({"description", "example", "title", "deprecated", "readOnly", "writeOnly"})
+FORMAT_HINTS = frozenset({"password"})  # OpenAPI formats that only tell UIs how to display the value
+
+
+class SchemaError(AssertionError):
+    """Raised when a response does not match its schema"""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+
+
+def _fail(path: str, message: str) -> None:
+    raise SchemaError(path, message)
+
+
+_MISSING = object()
+
+
+class _Compiler:
+    """Emits one `_v_<Schema>(data, path)` function per component schema"""
+
+    def __init__(self, schemas: Dict[str, dict]):
+        self.schemas = schemas
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+        self._depth = 0
+
+    def compile(self) -> Dict[str, Validator]:
+        for name, schema in self.schemas.items():
+            self._check_keywords(schema, name)
+            self.lines.append(f"def _v_{name}(v0, path='$'):")
+            self._emit(schema, "v0", "path", 1)
+            self.lines.append("    return None")
+            self.lines.append("")
+
+        namespace = {
+            "_fail": _fail,
+            "_MISSING": _MISSING,
+            **{f"_fmt_{k.replace('-', '_')}": v for k, v in FORMATS.items()},
+            **self.constants,
+        }
+        exec(compile("\n".join(self.lines), f"<validators:{SPEC_PATH.name}>", "exec"), namespace)
+        return {name: namespace[f"_v_{name}"] for name in self.schemas}
+
+    def _check_keywords(self, schema: dict, where: str) -> None:
+        unsupported = set(schema) - KEYWORDS - ANNOTATIONS
+        if unsupported:
+            raise ValueError(f"{where}: unsupported schema keyword(s) {', '.join(sorted(unsupported))}")
+        if "format" in schema and schema["format"] not in FORMATS.keys() | FORMAT_HINTS:
+            raise ValueError(f"{where}: unsupported format {schema['format']!r}")
+        for key, prop in schema.get("properties", {}).items():
+            self._check_keywords(prop, f"{where}.{key}")
+        if "items" in schema:
+            self._check_keywords(schema["items"], f"{where}[]")
+
+    def _const(self, value: Any) -> str:
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def _emit(self, schema: dict, var: str, path: str, indent: int) -> None:
+        pad = "    " * indent
+        out = self.lines.append
+
+        def check(condition: str, message: str, show_value: bool = False) -> None:
+            detail = f" + ': ' + repr({var})" if show_value else ""
+            out(f"{pad}if {condition}: _fail({path}, {message!r}{detail})")
+
+        if schema.get("nullable"):
+            out(f"{pad}if {var} is not None:")
+            indent += 1
+            pad = "    " * indent
+        out(f"{pad}pass")
+
+        if "$ref" in schema:
+            out(f"{pad}_v_{schema['$ref'].rsplit('/', 1)[-1]}({var}, {path})")
+            return
+
+        kind = schema.get("type")
+        if kind == "object":
+            check(f"not isinstance({var}, dict)", "expected object")
+            for key in schema.get("required", []):
+                check(f"{key!r} not in {var}", f"missing required property {key}")
+            for key, prop in schema.get("properties", {}).items():
+                self._depth += 1
+                child = f"v{self._depth}"
+                out(f"{pad}{child} = {var}.get({key!r}, _MISSING)")
+                out(f"{pad}if {child} is not _MISSING:")
+                self._emit(prop, child, f"{path} + {'.' + key!r}", indent + 1)
+        elif kind == "array":
+            check(f"not isinstance({var}, list)", "expected array")
+            if "minItems" in schema:
+                check(f"len({var}) < {schema['minItems']}", f"fewer than {schema['minItems']} items")
+            if "maxItems" in schema:
+                check(f"len({var}) > {schema['maxItems']}", f"more than {schema['maxItems']} items")
+            if "items" in schema:
+                self._depth += 1
+                index, child = f"i{self._depth}", f"v{self._depth}"
+                out(f"{pad}for {index}, {child} in enumerate({var}):")
+                self._emit(schema["items"], child, f"{path} + '[' + str({index}) + ']'", indent + 1)
+        elif kind == "string":
+            check(f"not isinstance({var}, str)", "expected string", True)
+            if "minLength" in schema:
+                check(f"len({var}) < {schema['minLength']}", f"shorter than {schema['minLength']}")
+            if "maxLength" in schema:
+                check(f"len({var}) > {schema['maxLength']}", f"longer than {schema['maxLength']}")
+            if schema.get("format") in FORMATS:
+                fmt = schema["format"]
+                check(f"not _fmt_{fmt.replace('-', '_')}.match({var})", f"not a valid {fmt}", True)
+        elif kind in ("integer", "number"):
+            types = "int" if kind == "integer" else "(int, float)"
+            check(f"isinstance({var}, bool) or not isinstance({var}, {types})", f"expected {kind}", True)
+            if "minimum" in schema:
+                check(f"{var} < {schema['minimum']!r}", f"below minimum {schema['minimum']}", True)
+            if "maximum" in schema:
+                check(f"{var} > {schema['maximum']!r}", f"above maximum {schema['maximum']}", True)
+        elif kind == "boolean":
+            check(f"not isinstance({var}, bool)", "expected boolean", True)
+
+        if "enum" in schema:
+            allowed = self._const(frozenset(schema["enum"]))
+            check(f"{var} not in {allowed}", f"not one of {sorted(schema['enum'])}", True)
+
+
+def spec_hash(spec_path: Path = SPEC_PATH) -> str:
+    """SHA-256 of the spec file, used as the compiled-validator cache key"""
+    return hashlib.sha256(spec_path.read_bytes()).hexdigest()
+
+
+_cache: Dict[str, Dict[str, Validator]] = {}
+
+
+def load_validators(spec_path: Path = SPEC_PATH) -> Dict[str, Validator]:
+    """Compiled validators for every component schema, keyed by schema name"""
+    raw = spec_path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest not in _cache:
+        schemas = yaml.safe_load(raw)["components"]["schemas"]
+        _cache[digest] = _Compiler(schemas).compile()
+    return _cache[digest]
+
+
+class SchemaValidators:
+    """Session-wide access to the compiled validators"""
+
+    def __init__(self, spec_path: Path = SPEC_PATH):
+        self.spec_hash = spec_hash(spec_path)
+        self._validators = load_validators(spec_path)
+
+    def __getitem__(self, name: str) -> Validator:
+        return self._validators[name]
+
+    def validate(self, name: str, data: Any) -> Any:
+        """Raise SchemaError if data does not match the named schema, else return it"""
+        self._validators[name](data)
+        return data
@@ -0,0 +1,46 @@
+"""Canned-response requests adapter for the client-wrapper unit tests"""
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class OpenStream:
+    """Raw body of a stream the server keeps open: reading past `chunks` fails"""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = list(chunks)
+
+    def read(self, amt=None, **kwargs) -> bytes:
+        assert self.chunks, "read past the events the server has sent"
+        return self.chunks.pop(0)
+
+    def close(self) -> None:
+        pass
+
+
+class StubAdapter(BaseAdapter):
+    """Answers every request with `respond(request)`; keeps the requests it saw"""
+
+    def __init__(self, respond):
+        super().__init__()
+        self.respond = respond
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status, headers, body = self.respond(request)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        if isinstance(body, OpenStream):
+            response.raw = body
+        else:
+            response._content = body
+        return response
+
+    def close(self) -> None:
+        pass
@@ -1,54 +1,12 @@
 import pytest
 import requests
 import json
-from typing import Dict, Any
-from dataclasses import dataclass
+import time
+import uuid
+import asyncio
+from typing import Dict, Any, Callable, List
 
-# Configuration
-@dataclass
-class TestConfig:
-    base_url: str = "http://localhost:3001"
-    
-    # Test user credentials
-    analyst_email: str = "analyst@test.com"
-    analyst_password: str = "TestPass123!"
-    admin_email: str = "admin@test.com"
-    admin_password: str = "AdminPass123!"
-
-config = TestConfig()
-
-# Fixtures
-@pytest.fixture(scope="session")
-def session():
-    """Create a requests session for reuse"""
-    session = requests.Session()
-    session.headers.update({
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    })
-    return session
-
-@pytest.fixture
-def analyst_token(session):
-    """Get authentication token for analyst user"""
-    login_data = {
-        "email": config.analyst_email,
-        "password": config.analyst_password
-    }
-    
-    response = session.post(
-        f"{config.base_url}/api/v1/auth/login",
-        json=login_data
-    )
-    
-    assert response.status_code == 200, f"Login failed: {response.text}"
-    token = response.json()["token"]
-    return token
-
-@pytest.fixture
-def auth_headers(analyst_token):
-    """Create authorization headers with analyst token"""
-    return {"Authorization": f"Bearer {analyst_token}"}
+from config import config
 
 # Helper Functions
 def validate_uuid(uuid_string: str) -> bool:
@@ -60,11 +18,39 @@ def validate_uuid(uuid_string: str) -> bool:
     except ValueError:
         return False
 
+def read_sse_events(response, until: Callable[[Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+    """Parse events from a streamed SSE response until `until(event)` is true or it ends"""
+    events, fields = [], {}
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            name, _, value = line.partition(":")
+            fields[name] = value[1:] if value.startswith(" ") else value
+            continue
+        if "data" in fields:
+            events.append({
+                "id": int(fields["id"]) if "id" in fields else None,
+                "event": fields.get("event", "message"),
+                "data": json.loads(fields["data"]),
+            })
+            if until(events[-1]):
+                break
+        fields = {}
+    return events
+
+async def read_ws_messages(ws, idle: float = 0.5) -> List[Dict[str, Any]]:
+    """Collect JSON messages from a WebSocket until it is quiet for `idle` seconds"""
+    messages = []
+    while True:
+        try:
+            messages.append(json.loads(await asyncio.wait_for(ws.recv(), timeout=idle)))
+        except asyncio.TimeoutError:
+            return messages
+
 # Example Tests - Expand these for your assignment
 
 class TestAuthentication:
     
-    def test_valid_login_returns_token(self, session):
+    def test_valid_login_returns_token(self, session, schemas):
         """Example: Valid credentials should return JWT token"""
         login_data = {
             "email": config.analyst_email,
@@ -81,6 +67,7 @@ class TestAuthentication:
         data = response.json()
         assert "token" in data
         assert "user" in data
+        schemas.validate("LoginResponse", data)
         
         # TODO: Add more comprehensive validation
         # - Verify user data structure
@@ -90,7 +77,7 @@ class TestAuthentication:
 
 class TestQuestionAnswerAPI:
     
-    def test_submit_question_example(self, session, auth_headers):
+    def test_submit_question_example(self, session, auth_headers, schemas):
         """Example: Submit question and get job ID"""
         question_data = {
             "question": "What are the Scope 1 emissions for this company?",
@@ -107,6 +94,7 @@ class TestQuestionAnswerAPI:
         assert response.status_code == 202
         data = response.json()
         assert "jobId" in data
+        schemas.validate("JobResponse", data)
         
         # TODO: Expand this test
         # - Validate job ID format
@@ -114,6 +102,520 @@ class TestQuestionAnswerAPI:
         # - Test different question types
 
 
+class TestConcurrentSubmission:
+
+    @pytest.mark.asyncio
+    async def test_submit_many_questions_concurrently(self, analyst_async_client):
+        """Example: Many concurrent submissions each get a distinct job ID"""
+        items = [
+            {"question": "What are the Scope 1 emissions for this company?", "company": "Nokia"}
+            for _ in range(50)
+        ]
+
+        responses = await analyst_async_client.submit_many(items)
+
+        assert all(r.status_code == 202 for r in responses)
+        job_ids = [r.json()["jobId"] for r in responses]
+        assert len(set(job_ids)) == len(job_ids)
+        assert all(validate_uuid(job_id) for job_id in job_ids)
+
+    @pytest.mark.asyncio
+    async def test_batch_submission_reports_each_item(self, analyst_async_client, schemas):
+        """Example: One batch request queues the valid items and flags the invalid one in its slot"""
+        items = [{"question": "What is the company's carbon neutrality target?", "company": company}
+                 for company in ("Nokia", "Google", "Amazon")]
+        items.insert(1, {"question": "", "company": "Apple Inc"})
+
+        response = await analyst_async_client.submit_batch(items)
+
+        assert response.status_code == 202
+        body = schemas.validate("BatchResponse", response.json())
+        assert (body["accepted"], body["rejected"]) == (3, 1)
+        assert body["results"][1] == {"statusCode": 400, "error": "Question and company are required"}
+        job_ids = [result["jobId"] for result in body["results"] if "jobId" in result]
+        assert len(set(job_ids)) == 3
+        assert all(validate_uuid(job_id) for job_id in job_ids)
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_concurrent_jobs_reach_terminal_state(self, analyst_async_client, job_waiter):
+        """Example: Every submitted job ends up done or failed"""
+        items = [{"question": "Describe the company's renewable energy initiatives", "company": "Nokia"}] * 20
+        responses = await analyst_async_client.submit_many(items)
+        job_ids = [r.json()["jobId"] for r in responses]
+
+        results = await job_waiter.wait_all(job_ids, timeout=30)
+
+        assert [r["status"] for r in results if r["status"] not in ("done", "failed")] == []
+
+
+class TestJobStatusStream:
+
+    def test_stream_resumes_after_last_event_id(self, session, analyst_token, auth_headers, schemas):
+        """Example: Reconnecting with Last-Event-ID replays only newer events"""
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "What is the company's carbon neutrality target?", "company": "Google"},
+            headers=auth_headers
+        )
+        job_id = response.json()["jobId"]
+
+        # Wait for the queued -> running transition, which publishes the first event
+        deadline = time.monotonic() + 10
+        while session.get(f"{config.base_url}/api/v1/qa/{job_id}", headers=auth_headers).json()["status"] == "queued":
+            assert time.monotonic() < deadline
+            time.sleep(0.25)
+
+        def ours(event):
+            return event["data"].get("jobId") == job_id
+
+        stream_url = f"{config.base_url}/api/v1/qa/stream"
+        with session.get(stream_url, params={"token": analyst_token}, headers={"Last-Event-ID": "0"},
+                         stream=True, timeout=10) as response:
+            assert response.status_code == 200
+            assert response.headers["Content-Type"].startswith("text/event-stream")
+            events = read_sse_events(response, until=ours)
+
+        # A leading `reset` event is expected once older events have been dropped
+        ids = [event["id"] for event in events if event["event"] == "message"]
+        assert ids == sorted(set(ids))
+        event = events[-1]
+        assert ours(event)
+        schemas.validate("JobStatusEvent", event["data"])
+
+        with session.get(stream_url, params={"token": analyst_token},
+                         headers={"Last-Event-ID": str(event["id"] - 1)}, stream=True, timeout=10) as response:
+            resumed = read_sse_events(response, until=lambda e: True)
+        assert resumed[0]["id"] == event["id"]
+        assert resumed[0]["data"] == event["data"]
+
+
+class TestJobUpdateFeed:
+
+    @pytest.mark.asyncio
+    async def test_updates_reach_only_the_job_owner(self, session, analyst_token, admin_token,
+                                                    websocket_connect, frozen_clock):
+        """Example: Each user's WebSocket gets updates for their own jobs and nobody else's"""
+        ws_url = config.base_url.replace("http", "ws", 1)
+        sockets = {token: await websocket_connect(ws_url) for token in (analyst_token, admin_token)}
+        try:
+            job_ids = {}
+            for token, ws in sockets.items():
+                await ws.send(json.dumps({"type": "auth", "token": token}))
+                assert json.loads(await asyncio.wait_for(ws.recv(), timeout=5))["status"] == "success"
+                response = session.post(
+                    f"{config.base_url}/api/v1/qa",
+                    json={"question": "What is the company's board diversity policy?",
+                          "company": "Nokia" if token == analyst_token else "Google"},
+                    headers={"Authorization": f"Bearer {token}"}
+                )
+                job_ids[token] = response.json()["jobId"]
+
+            frozen_clock.advance(11)  # both jobs leave the queue and get an answer
+            seen = {token: {message["jobId"] for message in await read_ws_messages(ws)}
+                    for token, ws in sockets.items()}
+            assert job_ids[analyst_token] in seen[analyst_token] - seen[admin_token]
+            assert job_ids[admin_token] in seen[admin_token] - seen[analyst_token]
+        finally:
+            for ws in sockets.values():
+                await ws.close()
+
+
+class TestVirtualClock:
+
+    def test_job_lifecycle_with_frozen_clock(self, session, auth_headers, frozen_clock):
+        """Example: Advancing the clock drives a job through every state"""
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "How does the company handle waste management?", "company": "Amazon"},
+            headers=auth_headers
+        )
+        job_url = f"{config.base_url}/api/v1/qa/{response.json()['jobId']}"
+        assert session.get(job_url, headers=auth_headers).json()["status"] == "queued"
+
+        frozen_clock.advance(1)  # queue time is 1-3s, the AIML call at most 8s
+        assert session.get(job_url, headers=auth_headers).json()["status"] in ("queued", "running")
+
+        frozen_clock.advance(10)
+        job = session.get(job_url, headers=auth_headers).json()
+        assert job["status"] in ("done", "failed")
+
+    def test_token_expires_after_one_hour(self, session, frozen_clock):
+        """Example: A token stops working once the server clock passes expiresIn"""
+        response = session.post(
+            f"{config.base_url}/api/v1/auth/login",
+            json={"email": config.analyst_email, "password": config.analyst_password}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        expires_in = response.json()["expiresIn"]
+
+        frozen_clock.advance(expires_in - 1)
+        assert session.get(f"{config.base_url}/api/v1/qa", headers=headers).status_code == 200
+
+        frozen_clock.advance(1)
+        assert session.get(f"{config.base_url}/api/v1/qa", headers=headers).status_code == 401
+
+
+class TestSeededRandomness:
+
+    def test_same_seed_reproduces_job_outcomes(self, session, auth_headers, frozen_clock, mock_seed, rate_limits):
+        """Example: Reseeding replays the same delays, failures and answers"""
+        job_quota = rate_limits.state()["aimlJobs"]["limit"]
+
+        def run():
+            # The first run's AIML calls would otherwise still count against the second
+            rate_limits.set("aimlJobs", job_quota)
+            job_urls = []
+            for company in ("Nokia", "Apple Inc", "Google", "Amazon", "Microsoft Corporation"):
+                response = session.post(
+                    f"{config.base_url}/api/v1/qa",
+                    json={"question": "What are the Scope 1 emissions for this company?", "company": company},
+                    headers=auth_headers
+                )
+                job_urls.append(f"{config.base_url}/api/v1/qa/{response.json()['jobId']}")
+            frozen_clock.advance(11)
+            jobs = [session.get(url, headers=auth_headers).json() for url in job_urls]
+            return [(job["status"], job.get("result", {}).get("answer"), job.get("result", {}).get("confidence"))
+                    for job in jobs]
+
+        mock_seed.set("reproducible")
+        first = run()
+        mock_seed.set("reproducible")
+        assert run() == first
+
+
+class TestJobStatusQuery:
+
+    def test_changed_since_returns_only_jobs_that_moved(self, session, auth_headers, frozen_clock, schemas):
+        """Example: One status query covers many jobs, and asOf fetches only what changed"""
+        job_ids = []
+        for company in ("Nokia", "Google", "Amazon"):
+            response = session.post(
+                f"{config.base_url}/api/v1/qa",
+                json={"question": "How does the company handle waste management?", "company": company},
+                headers=auth_headers
+            )
+            job_ids.append(response.json()["jobId"])
+        unknown = str(uuid.uuid4())
+        status_url = f"{config.base_url}/api/v1/qa/status"
+
+        first = session.get(status_url, params={"ids": ",".join(job_ids + [unknown])}, headers=auth_headers).json()
+        assert [job["status"] for job in first["jobs"]] == ["queued"] * 3
+        assert first["missing"] == [unknown]
+
+        frozen_clock.advance(11)
+        second = session.post(status_url, json={"ids": job_ids, "changedSince": first["asOf"]},
+                              headers=auth_headers).json()
+        assert sorted(job["jobId"] for job in second["jobs"]) == sorted(job_ids)
+        assert all(job["status"] in ("done", "failed") for job in schemas.validate("JobStatusList", second)["jobs"])
+
+        third = session.post(status_url, json={"ids": job_ids, "changedSince": second["asOf"]},
+                             headers=auth_headers).json()
+        assert third["jobs"] == []
+
+    def test_other_users_jobs_are_reported_missing(self, session, auth_headers, admin_headers):
+        """Example: Another user's job ids read like unknown ones, one id or a thousand"""
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "How does the company handle waste management?", "company": "Nokia"},
+            headers=auth_headers
+        )
+        job_id = response.json()["jobId"]
+        status_url = f"{config.base_url}/api/v1/qa/status"
+
+        body = session.get(status_url, params={"ids": job_id}, headers=admin_headers).json()
+        assert (body["jobs"], body["evicted"], body["missing"]) == ([], [], [job_id])
+        body = session.post(status_url, json={"ids": [job_id]}, headers=admin_headers).json()
+        assert body["missing"] == [job_id]
+
+        body = session.get(status_url, params={"ids": job_id}, headers=auth_headers).json()
+        assert [job["jobId"] for job in body["jobs"]] == [job_id]
+
+    def test_other_users_job_is_not_found_by_id(self, session, auth_headers, admin_headers, frozen_clock):
+        """Example: Reading another user's job by id, held or evicted, answers 404"""
+        ttl = session.get(f"{config.base_url}/mock/stats").json()["jobs"]["ttlSeconds"]
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "How does the company handle waste management?", "company": "Google"},
+            headers=auth_headers
+        )
+        job_url = f"{config.base_url}/api/v1/qa/{response.json()['jobId']}"
+
+        assert session.get(job_url, headers=admin_headers).status_code == 404
+        held = session.get(job_url, params={"waitFor": "change", "timeout": 1}, headers=admin_headers)
+        assert held.status_code == 404
+
+        frozen_clock.advance(11 + ttl)
+        assert session.get(job_url, headers=admin_headers).status_code == 404
+        assert session.get(job_url, headers=auth_headers).status_code == 410
+
+
+class TestLongPoll:
+
+    @pytest.mark.asyncio
+    async def test_long_poll_answers_on_status_change(self, analyst_async_client, frozen_clock):
+        """Example: A held GET returns when the job moves on, not when a poll interval ends"""
+        response = await analyst_async_client.submit_question(
+            "What are the company's water conservation practices?", "Google"
+        )
+        job_id = response.json()["jobId"]
+
+        held = asyncio.create_task(analyst_async_client.get_job(job_id, wait_for="change", timeout=5))
+        await asyncio.sleep(0.2)
+        assert not held.done()  # the clock is frozen, so nothing has changed yet
+
+        frozen_clock.advance(3)  # past the 1-3s hand-off
+        response = await asyncio.wait_for(held, timeout=5)
+        assert response.json()["status"] == "running"
+
+        held = asyncio.create_task(analyst_async_client.get_job(job_id, wait_for="terminal", timeout=30))
+        await asyncio.sleep(0.2)
+        frozen_clock.advance(8)  # the AIML call ends within its 8s timeout
+        response = await asyncio.wait_for(held, timeout=5)
+        status = response.json()["status"]
+        assert status in ("done", "failed")
+
+        # A finished job never changes again, so this one is answered at its timeout
+        held = asyncio.create_task(analyst_async_client.get_job(job_id, wait_for="change", timeout=2))
+        await asyncio.sleep(0.2)
+        assert not held.done()
+        frozen_clock.advance(2)
+        response = await asyncio.wait_for(held, timeout=5)
+        assert response.json()["status"] == status
+
+
+class TestConditionalGet:
+
+    def test_unchanged_job_answers_304(self, session, auth_headers, frozen_clock, http_cache):
+        """Example: A repeated GET carries If-None-Match and gets a 304 until the job moves on"""
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "What are the company's water conservation practices?", "company": "Intel"},
+            headers=auth_headers
+        )
+        job_url = f"{config.base_url}/api/v1/qa/{response.json()['jobId']}"
+
+        first = session.get(job_url, headers=auth_headers)
+        etag = first.headers["ETag"]
+        assert first.json()["status"] == "queued"
+
+        response = session.get(job_url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+        if http_cache is not None:
+            # The fixture sends the validator itself and hands back the cached body
+            response = session.get(job_url, headers=auth_headers)
+            assert response.status_code == 200
+            assert response.headers["X-Http-Cache"] == "revalidated"
+            assert response.json() == first.json()
+
+        frozen_clock.advance(3)  # past the 1-3s hand-off; the AIML reply may follow within it
+        response = session.get(job_url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["status"] != "queued"
+
+
+class TestJobRetention:
+
+    def test_finished_job_is_evicted_after_ttl(self, session, auth_headers, frozen_clock, schemas):
+        """Example: A finished job answers 410 "evicted" once its TTL passes"""
+        ttl = session.get(f"{config.base_url}/mock/stats").json()["jobs"]["ttlSeconds"]
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "What are the company's water conservation practices?", "company": "Nokia"},
+            headers=auth_headers
+        )
+        job_url = f"{config.base_url}/api/v1/qa/{response.json()['jobId']}"
+
+        frozen_clock.advance(11)
+        assert session.get(job_url, headers=auth_headers).json()["status"] in ("done", "failed")
+
+        frozen_clock.advance(ttl)
+        response = session.get(job_url, headers=auth_headers)
+        assert response.status_code == 410
+        assert schemas.validate("EvictedJob", response.json())["status"] == "evicted"
+
+
+class TestAnswerHistory:
+
+    def test_history_pages_newest_first(self, session, auth_headers, frozen_clock):
+        """Example: Following nextCursor walks the user's answers without gaps or repeats"""
+        job_urls = []
+        for n in range(12):
+            response = session.post(
+                f"{config.base_url}/api/v1/qa",
+                json={"question": f"History check {n}: what is the carbon neutrality target?", "company": "Google"},
+                headers=auth_headers
+            )
+            job_urls.append(f"{config.base_url}/api/v1/qa/{response.json()['jobId']}")
+        frozen_clock.advance(11)
+        jobs = [session.get(url, headers=auth_headers).json() for url in job_urls]
+        done = {job["result"]["question"] for job in jobs if job["status"] == "done"}
+
+        answers, cursor = [], None
+        while True:
+            params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+            page = session.get(f"{config.base_url}/api/v1/qa", params=params, headers=auth_headers).json()
+            assert len(page["answers"]) <= 4
+            answers += page["answers"]
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+
+        timestamps = [answer["timestamp"] for answer in answers]
+        assert timestamps == sorted(timestamps, reverse=True)
+        assert done <= {answer["question"] for answer in answers}
+        assert session.get(f"{config.base_url}/api/v1/qa", params={"cursor": "bogus"},
+                           headers=auth_headers).status_code == 400
+
+
+class TestAimlRateLimit:
+
+    @pytest.mark.asyncio
+    async def test_throttled_request_reports_retry_after(self, async_client, mock_clock):
+        """Example: A 429 says when to retry, and retrying then succeeds"""
+        body = {"question": "What are Nokia's emissions?", "company": "Nokia"}
+        responses = await asyncio.gather(
+            *(async_client.request("POST", "/aiml/answer", json_body=body) for _ in range(11))
+        )
+
+        throttled = [r for r in responses if r.status_code == 429]
+        assert throttled
+        assert all(r.headers["RateLimit-Limit"] == "10" for r in responses)
+        retry_after = max(int(r.headers["Retry-After"]) for r in throttled)
+        assert throttled[0].json()["retryAfter"] >= 1
+
+        mock_clock.advance(retry_after)
+        response = await async_client.request("POST", "/aiml/answer", json_body=body)
+        assert response.status_code != 429
+
+
+class TestUserRateLimit:
+
+    def test_per_user_limit_throttles_and_recovers(self, session, auth_headers, frozen_clock, rate_limits):
+        """Example: Past the per-user limit requests get 429 until Retry-After passes"""
+        rate_limits.set("api", 3)
+        answers_url = f"{config.base_url}/api/v1/qa"
+        for remaining in (2, 1, 0):
+            response = session.get(answers_url, headers=auth_headers)
+            assert response.status_code == 200
+            assert response.headers["RateLimit-Remaining"] == str(remaining)
+
+        response = session.get(answers_url, headers=auth_headers)
+        assert response.status_code == 429
+        retry_after = int(response.headers["Retry-After"])
+        assert response.json()["retryAfter"] == retry_after
+
+        frozen_clock.advance(retry_after)
+        assert session.get(answers_url, headers=auth_headers).status_code == 200
+
+
+class TestAimlRetries:
+
+    def test_throttled_aiml_call_is_retried_after_retry_after(self, session, auth_headers, frozen_clock,
+                                                               mock_seed, rate_limits):
+        """Example: A job whose AIML call gets 429 waits retryAfter, retries and records each attempt"""
+        mock_seed.set("aiml-retries")
+        rate_limits.set("aimlJobs", 1, window_seconds=1)
+        job_urls = []
+        for company in ("Nokia", "Apple Inc", "Google", "Amazon"):
+            response = session.post(
+                f"{config.base_url}/api/v1/qa",
+                json={"question": "What is the company's carbon neutrality target?", "company": company},
+                headers=auth_headers
+            )
+            job_urls.append(f"{config.base_url}/api/v1/qa/{response.json()['jobId']}")
+
+        frozen_clock.advance(11)
+        jobs = [session.get(url, headers=auth_headers).json() for url in job_urls]
+        assert all(job["status"] in ("done", "failed") for job in jobs)
+        retried = [job["aimlAttempts"] for job in jobs if job["aimlAttempts"][0]["status"] == 429]
+        assert retried
+        for attempts in retried:
+            assert attempts[0]["retryInMs"] >= 1000
+            assert attempts[1]["startedAt"] > attempts[0]["startedAt"]
+
+
+class TestJobQueue:
+
+    def test_full_queue_refuses_with_retry_after(self, session, auth_headers, frozen_clock, scheduler, answer_cache):
+        """Example: Once the job queue is full, submissions get 503 and Retry-After"""
+        scheduler.set(workers=1, max_queue=1)
+        statuses = []
+        for _ in range(3):
+            response = session.post(
+                f"{config.base_url}/api/v1/qa",
+                json={"question": "Describe the company's renewable energy initiatives", "company": "Apple Inc"},
+                headers=auth_headers
+            )
+            statuses.append(response.status_code)
+            if response.status_code == 503:
+                break
+
+        assert statuses[-1] == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        stats = scheduler.state()
+        assert stats["queued"] == 1
+        assert stats["rejected"] >= 1
+        # The refused submission is not counted as a cache lookup
+        assert answer_cache.state()["misses"] == len(statuses) - 1
+
+
+class TestAnswerCache:
+
+    def test_repeated_question_is_answered_from_cache(self, session, auth_headers, admin_headers, frozen_clock,
+                                                      mock_seed, answer_cache, schemas):
+        """Example: A repeated (question, company) pair is done on submission; only the owner sees the source job"""
+        mock_seed.set("answer-cache")
+        answer_cache.set(1000, ttl_seconds=60)
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "What are the company's water conservation practices?", "company": "Siemens"},
+            headers=auth_headers
+        )
+        original_id = response.json()["jobId"]
+        frozen_clock.advance(11)
+        original = session.get(f"{config.base_url}/api/v1/qa/{original_id}", headers=auth_headers).json()
+        assert original["result"]["source"] == "aiml"
+
+        # Case and whitespace do not matter
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "what are the company's  WATER conservation practices? ", "company": "siemens"},
+            headers=auth_headers
+        )
+        assert schemas.validate("JobResponse", response.json())["status"] == "done"
+        cached = session.get(f"{config.base_url}/api/v1/qa/{response.json()['jobId']}", headers=auth_headers).json()
+        result = schemas.validate("Answer", cached["result"])
+        assert result["source"] == "cache"
+        assert result["cachedFrom"] == {"jobId": original_id, "answeredAt": original["result"]["timestamp"]}
+        assert result["answer"] == original["result"]["answer"]
+        assert "aimlAttempts" not in cached
+
+        # Another user gets the answer, but not a handle on the analyst's job
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "What are the company's water conservation practices?", "company": "Siemens"},
+            headers=admin_headers
+        )
+        assert response.json()["status"] == "done"
+        shared = session.get(f"{config.base_url}/api/v1/qa/{response.json()['jobId']}", headers=admin_headers).json()
+        assert shared["result"]["cachedFrom"] == {"answeredAt": original["result"]["timestamp"]}
+
+        frozen_clock.advance(60)  # past the TTL
+        response = session.post(
+            f"{config.base_url}/api/v1/qa",
+            json={"question": "What are the company's water conservation practices?", "company": "Siemens"},
+            headers=auth_headers
+        )
+        assert response.json()["status"] == "queued"
+        stats = answer_cache.state()
+        assert (stats["hits"], stats["misses"], stats["evictions"]["ttl"]) == (2, 2, 1)
+
+
 # TODO: Add more test classes
 # class TestFileUpload:
 #     pass
@@ -0,0 +1,78 @@
+"""Unit tests for record/replay in cassette.py"""
+import requests
+
+from cassette import REPLAY_HEADER, CassetteManager
+from stub_adapter import OpenStream, StubAdapter
+
+BASE_URL = "http://api.test"
+
+
+def cassette_session(manager: CassetteManager, inner: StubAdapter) -> requests.Session:
+    session = requests.Session()
+    session.mount(BASE_URL, manager.wrap_adapter(inner))
+    return session
+
+
+def respond(request):
+    if request.method == "POST":
+        return 202, {"Content-Type": "application/json", "Location": "/api/v1/qa/1"}, b'{"jobId": "1"}'
+    return 404, {"Content-Type": "application/json", "Date": "Sat, 17 Oct 2026 00:00:00 GMT"}, b'{"error": "gone"}'
+
+
+class TestCassette:
+
+    def test_recorded_responses_replay_without_the_server(self, tmp_path):
+        recorder = CassetteManager(tmp_path, "record", spec_hash="spec-1")
+        recorder.start("test_example")
+        session = cassette_session(recorder, StubAdapter(respond))
+        submitted = session.post(f"{BASE_URL}/api/v1/qa", json={"question": "q"})
+        missing = session.get(f"{BASE_URL}/api/v1/qa/2")
+        recorder.stop()
+
+        server = StubAdapter(respond)
+        player = CassetteManager(tmp_path, "replay", spec_hash="spec-1")
+        player.start("test_example")
+        session = cassette_session(player, server)
+        replayed = session.post(f"{BASE_URL}/api/v1/qa", json={"question": "q"})
+        replayed_missing = session.get(f"{BASE_URL}/api/v1/qa/2")
+
+        assert player.replaying
+        assert server.requests == []
+        assert (replayed.status_code, replayed.json()) == (submitted.status_code, submitted.json())
+        assert replayed.headers["Location"] == "/api/v1/qa/1"
+        assert replayed.headers[REPLAY_HEADER] == "replay"
+        assert (replayed_missing.status_code, replayed_missing.content) == (404, missing.content)
+        assert "Date" not in replayed_missing.headers
+
+    def test_cassette_from_another_spec_is_rerecorded(self, tmp_path):
+        recorder = CassetteManager(tmp_path, "record", spec_hash="spec-1")
+        recorder.start("test_example")
+        cassette_session(recorder, StubAdapter(respond)).get(f"{BASE_URL}/api/v1/qa/2")
+        recorder.stop()
+
+        player = CassetteManager(tmp_path, "replay", spec_hash="spec-2")
+        player.start("test_example")
+        server = StubAdapter(respond)
+        assert cassette_session(player, server).get(f"{BASE_URL}/api/v1/qa/2").status_code == 404
+        assert not player.replaying
+        assert len(server.requests) == 1
+
+    def test_streamed_response_records_what_the_caller_read(self, tmp_path):
+        stream = OpenStream(b"id: 1\ndata: {}\n\n", b"id: 2\ndata: {}\n\n")
+        recorder = CassetteManager(tmp_path, "record", spec_hash="spec-1")
+        recorder.start("test_stream")
+        session = cassette_session(recorder, StubAdapter(
+            lambda request: (200, {"Content-Type": "text/event-stream; charset=utf-8"}, stream)
+        ))
+        with session.get(f"{BASE_URL}/api/v1/qa/stream", stream=True) as response:
+            lines = response.iter_lines(decode_unicode=True)
+            assert [next(lines), next(lines)] == ["id: 1", "data: {}"]
+        recorder.stop()
+        assert stream.chunks == [b"id: 2\ndata: {}\n\n"]
+
+        player = CassetteManager(tmp_path, "replay", spec_hash="spec-1")
+        player.start("test_stream")
+        session = cassette_session(player, StubAdapter(respond))
+        with session.get(f"{BASE_URL}/api/v1/qa/stream", stream=True) as response:
+            assert response.status_code == 200
+            assert list(response.iter_lines(decode_unicode=True)) == ["id: 1", "data: {}", ""]
@@ -0,0 +1,51 @@
+"""Unit tests for the conditional-GET adapter in http_cache.py"""
+import requests
+
+from http_cache import CACHE_HEADER, ConditionalCache
+from stub_adapter import OpenStream, StubAdapter
+
+BASE_URL = "http://api.test"
+
+
+def wrapped_session(cache: ConditionalCache, respond) -> requests.Session:
+    session = requests.Session()
+    session.mount(BASE_URL, cache.wrap_adapter(StubAdapter(respond)))
+    return session
+
+
+class TestConditionalAdapter:
+
+    def test_revalidated_body_is_served_from_cache(self):
+        def respond(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return 304, {"ETag": '"v1"'}, b""
+            return 200, {"ETag": '"v1"', "Content-Type": "application/json"}, b'{"status": "done"}'
+
+        cache = ConditionalCache()
+        session = wrapped_session(cache, respond)
+        first = session.get(f"{BASE_URL}/api/v1/qa/1", headers={"Authorization": "Bearer a"})
+        second = session.get(f"{BASE_URL}/api/v1/qa/1", headers={"Authorization": "Bearer a"})
+
+        assert second.status_code == 200
+        assert second.json() == first.json() == {"status": "done"}
+        assert second.headers[CACHE_HEADER] == "revalidated"
+        assert cache.revalidated == 1
+
+    def test_responses_without_etag_are_not_kept(self):
+        cache = ConditionalCache()
+        session = wrapped_session(cache, lambda request: (200, {}, b"{}"))
+        session.get(f"{BASE_URL}/health")
+        session.get(f"{BASE_URL}/health")
+        assert cache.get(cache.key(f"{BASE_URL}/health", {})) is None
+
+    def test_streamed_get_yields_events_without_reading_the_whole_body(self):
+        stream = OpenStream(b"id: 1\ndata: {}\n\n", b"id: 2\ndata: {}\n\n")
+        session = wrapped_session(ConditionalCache(), lambda request: (
+            200, {"Content-Type": "text/event-stream; charset=utf-8", "ETag": '"s"'}, stream
+        ))
+
+        with session.get(f"{BASE_URL}/api/v1/qa/stream", stream=True) as response:
+            lines = response.iter_lines(decode_unicode=True)
+            assert next(lines) == "id: 1"
+            assert next(lines) == "data: {}"
+        assert stream.chunks == [b"id: 2\ndata: {}\n\n"]
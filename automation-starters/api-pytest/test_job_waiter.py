@@ -0,0 +1,114 @@
+"""Unit tests for JobWaiter in job_waiter.py"""
+import asyncio
+import json
+from typing import Dict, List
+
+import pytest
+
+from async_client import ApiResponse
+from job_waiter import JobWaiter
+
+
+class FakeClient:
+    """The part of AsyncApiClient JobWaiter uses, answering from `statuses`"""
+
+    base_url = "http://api.test"
+    token = "token"
+
+    def __init__(self, statuses: Dict[str, str]):
+        self.statuses = statuses
+        self.queries: List[List[str]] = []
+
+    @staticmethod
+    def respond(status_code: int, body: dict) -> ApiResponse:
+        return ApiResponse(status_code, {}, json.dumps(body).encode(), "GET", "http://api.test", 0.0)
+
+    async def get_statuses(self, job_ids, changed_since=None, token=None) -> ApiResponse:
+        self.queries.append(list(job_ids))
+        jobs = [{"jobId": job_id, "status": self.statuses[job_id], "updatedAt": "t"}
+                for job_id in job_ids if job_id in self.statuses]
+        return self.respond(200, {"jobs": jobs, "evicted": [], "missing": [], "asOf": "t"})
+
+    async def get_job(self, job_id, token=None) -> ApiResponse:
+        return self.respond(200, {"jobId": job_id, "status": self.statuses[job_id]})
+
+
+class FakeSocket:
+    """Authenticated socket that delivers whatever is put on `updates`"""
+
+    def __init__(self):
+        self.updates: asyncio.Queue = asyncio.Queue()
+        self.sent: List[dict] = []
+
+    async def send(self, message: str) -> None:
+        self.sent.append(json.loads(message))
+        await self.updates.put({"type": "auth", "status": "success"})
+
+    async def recv(self) -> str:
+        return json.dumps(await self.updates.get())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        return await self.recv()
+
+    async def close(self) -> None:
+        pass
+
+
+def connect_to(socket: FakeSocket):
+    async def connect(url: str) -> FakeSocket:
+        return socket
+    return connect
+
+
+class TestJobWaiter:
+
+    @pytest.mark.asyncio
+    async def test_socket_update_resolves_the_wait(self):
+        socket, client = FakeSocket(), FakeClient({"job-1": "queued"})
+        async with JobWaiter(client, connect=connect_to(socket)) as waiter:
+            assert socket.sent == [{"type": "auth", "token": "token"}]
+            waiting = asyncio.create_task(waiter.wait("job-1", timeout=2))
+            await asyncio.sleep(0)
+            client.statuses["job-1"] = "done"
+            await socket.updates.put({"jobId": "job-1", "status": "done", "timestamp": "t"})
+
+            assert (await waiting)["status"] == "done"
+            assert waiter.streaming
+            assert [status for status, _, _ in waiter.transitions["job-1"]] == ["queued", "done"]
+
+    @pytest.mark.asyncio
+    async def test_job_finished_before_the_socket_was_authenticated(self):
+        client = FakeClient({"job-1": "done", "job-2": "failed", "job-3": "running"})
+        async with JobWaiter(client, connect=connect_to(FakeSocket())) as waiter:
+            results = await waiter.wait_all(["job-1", "job-2"], timeout=1)
+            assert [result["status"] for result in results] == ["done", "failed"]
+            # One status query covers every job a wait_all starts tracking
+            assert client.queries == [["job-1", "job-2"]]
+
+            with pytest.raises(asyncio.TimeoutError):
+                await waiter.wait("job-3", timeout=0.2)
+
+    @pytest.mark.asyncio
+    async def test_stale_query_does_not_undo_a_socket_update(self):
+        socket, client = FakeSocket(), FakeClient({"job-1": "running"})
+        async with JobWaiter(client, connect=connect_to(socket)) as waiter:
+            waiter._record("job-1", "done", "t")
+            await waiter._query(["job-1"])
+            assert waiter._status["job-1"] == "done"
+
+    @pytest.mark.asyncio
+    async def test_polls_when_the_socket_cannot_be_opened(self):
+        async def refuse(url: str):
+            raise OSError("connection refused")
+
+        client = FakeClient({"job-1": "running"})
+        async with JobWaiter(client, connect=refuse, poll_min=0.01, poll_max=0.02) as waiter:
+            waiting = asyncio.create_task(waiter.wait("job-1", timeout=2))
+            await asyncio.sleep(0.05)
+            client.statuses["job-1"] = "done"
+
+            assert (await waiting)["status"] == "done"
+            assert not waiter.streaming
@@ -0,0 +1,81 @@
+"""Unit tests for timestamp parsing and aggregation in k6_analyze.py"""
+import gzip
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from k6_analyze import K6Analysis, parse_time
+
+NOON = datetime(2026, 10, 17, 12, tzinfo=timezone.utc).timestamp()
+
+
+def point(metric: str, time: str, value: float, **tags) -> str:
+    return json.dumps({"type": "Point", "metric": metric, "data": {"time": time, "value": value, "tags": tags}})
+
+
+class TestParseTime:
+
+    @pytest.mark.parametrize("text, expected", [
+        ("2026-10-17T12:00:00Z", NOON),
+        ("2026-10-17T12:00:00.5Z", NOON + 0.5),
+        ("2026-10-17T12:00:00.123456789Z", NOON + 0.123456789),
+        ("2026-10-17T14:00:00.25+02:00", NOON + 0.25),
+        ("2026-10-17T06:30:00-05:30", NOON),
+    ])
+    def test_fraction_and_zone(self, text, expected):
+        assert parse_time(text) == pytest.approx(expected, abs=1e-6)
+
+    def test_same_second_in_another_zone_is_not_served_from_the_cache(self):
+        assert parse_time("2026-10-17T12:00:00Z") == NOON
+        assert parse_time("2026-10-17T12:00:00+01:00") == NOON - 3600
+        assert parse_time("2026-10-17T12:00:00.75Z") == NOON + 0.75
+
+
+class TestK6Analysis:
+
+    def test_only_tracked_points_are_folded_in(self):
+        analysis = K6Analysis()
+        analysis.feed([
+            json.dumps({"type": "Metric", "metric": "http_req_duration", "data": {"type": "trend"}}),
+            point("http_req_waiting", "2026-10-17T12:00:00Z", 100),
+            point("http_req_duration", "2026-10-17T12:00:00Z", 100, method="GET",
+                  url=f"http://localhost:3000/api/v1/qa/{uuid.uuid4()}", status="200"),
+            point("errors", "2026-10-17T12:00:01Z", 1),
+            point("errors", "2026-10-17T12:00:02Z", 0),
+        ])
+        report = analysis.report()
+
+        assert report["points"] == 3
+        duration = report["metrics"]["http_req_duration"]
+        assert duration["overall"]["count"] == 1
+        assert list(duration["by_tag"]["route"]) == ["/api/v1/qa/{jobId}"]
+        assert report["metrics"]["errors"]["overall"] == {"count": 2, "hits": 1, "rate": 0.5}
+
+    def test_merged_runs_share_buckets_on_absolute_time(self):
+        first, second = K6Analysis(bucket_seconds=10), K6Analysis(bucket_seconds=10)
+        first.feed([point("http_req_duration", "2026-10-17T12:00:05Z", 100),
+                    point("http_req_duration", "2026-10-17T12:00:15Z", 100)])
+        second.feed([point("http_req_duration", "2026-10-17T11:59:55.5Z", 200),
+                     point("http_req_duration", "2026-10-17T13:00:07+01:00", 200)])
+
+        report = first.merge(second).report()
+        assert report["start"] == NOON - 4.5
+        assert report["points"] == 4
+        series = report["metrics"]["http_req_duration"]["series"]
+        assert [(bucket["offset"], bucket["count"]) for bucket in series] == [(0, 1), (10, 2), (20, 1)]
+
+    def test_files_are_merged_into_one_report(self, tmp_path):
+        plain, packed = tmp_path / "a.json", tmp_path / "b.json.gz"
+        plain.write_text(point("qa_submission_time", "2026-10-17T12:00:00Z", 50) + "\n")
+        with gzip.open(packed, "wt", encoding="utf-8") as handle:
+            handle.write(point("qa_submission_time", "2026-10-17T12:00:30Z", 70, method="POST") + "\n")
+
+        analysis = K6Analysis()
+        analysis.feed_file(str(plain))
+        analysis.feed_file(str(packed))
+        submissions = analysis.report()["metrics"]["qa_submission_time"]
+        assert submissions["overall"]["count"] == 2
+        assert submissions["by_tag"]["method"]["POST"]["count"] == 1
+        assert [bucket["offset"] for bucket in submissions["series"]] == [0, 30]
@@ -0,0 +1,72 @@
+"""Unit tests for route keys and worker merging in latency_plugin.py"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from async_client import ApiResponse
+from cassette import REPLAY_HEADER
+from latency_plugin import LatencyPlugin, LatencyRecorder, route_patterns
+
+BASE_URL = "http://api.test"
+
+
+@pytest.fixture
+def recorder() -> LatencyRecorder:
+    return LatencyRecorder()
+
+
+class TestRouteKeys:
+
+    def test_job_ids_collapse_into_the_spec_template(self, recorder):
+        for _ in range(3):
+            recorder.record("get", f"{BASE_URL}/api/v1/qa/{uuid.uuid4()}?wait=5", 0.01)
+        assert list(recorder.summary()) == ["GET /api/v1/qa/{jobId}"]
+        assert recorder.summary()["GET /api/v1/qa/{jobId}"]["count"] == 3
+
+    @pytest.mark.parametrize("path", ["/api/v1/qa/stream", "/api/v1/qa/status", "/api/v1/qa/batch"])
+    def test_literal_siblings_win_over_the_template(self, recorder, path):
+        assert recorder.route(f"{BASE_URL}{path}?ids=a,b") == path
+
+    def test_literal_path_wins_whatever_the_spec_order(self, tmp_path):
+        spec_path = tmp_path / "api-spec.yaml"
+        spec_path.write_text(yaml.safe_dump({"paths": {"/jobs/{jobId}": {}, "/jobs/stream": {}}}, sort_keys=False))
+        matches = [template for pattern, template in route_patterns(spec_path) if pattern.match("/jobs/stream")]
+        assert matches[0] == "/jobs/stream"
+
+    def test_unknown_paths_still_collapse_ids(self, recorder):
+        job_id = uuid.uuid4()
+        assert recorder.route(f"{BASE_URL}/mock/jobs/{job_id}/events") == "/mock/jobs/{id}/events"
+        assert recorder.route(f"{BASE_URL}/health") == "/health"
+
+    def test_replayed_responses_are_not_timed(self, recorder):
+        url = f"{BASE_URL}/api/v1/qa"
+        recorder.async_hook(ApiResponse(202, {REPLAY_HEADER: "replay"}, b"{}", "POST", url, 0.5))
+        recorder.async_hook(ApiResponse(202, {}, b"{}", "POST", url, 0.5))
+        assert recorder.summary()["POST /api/v1/qa"]["count"] == 1
+
+
+class TestWorkerMerge:
+
+    def test_worker_histograms_merge_into_the_controller(self):
+        worker = LatencyRecorder()
+        worker.record("GET", f"{BASE_URL}/api/v1/qa/{uuid.uuid4()}", 0.2)
+        worker.record("POST", f"{BASE_URL}/api/v1/qa", 0.1)
+        node = SimpleNamespace(workeroutput={"latency": {
+            key: histogram.to_state() for key, histogram in worker.histograms.items()
+        }})
+
+        controller = LatencyPlugin(config=None)
+        controller.recorder.record("GET", f"{BASE_URL}/api/v1/qa/{uuid.uuid4()}", 0.3)
+        controller.pytest_testnodedown(node, error=None)
+
+        summary = controller.recorder.summary()
+        assert {key: stats["count"] for key, stats in summary.items()} == {
+            "GET /api/v1/qa/{jobId}": 2, "POST /api/v1/qa": 1,
+        }
+
+    def test_worker_that_crashed_contributes_nothing(self):
+        controller = LatencyPlugin(config=None)
+        controller.pytest_testnodedown(SimpleNamespace(), error="crashed")
+        assert controller.recorder.summary() == {}
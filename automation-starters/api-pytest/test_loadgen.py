@@ -0,0 +1,65 @@
+"""Unit tests for the arrival schedule in loadgen.py"""
+import math
+
+import pytest
+
+from loadgen import SCENARIOS, arrival_times, parse_duration, parse_stages
+
+
+def expected_arrivals(stages, start_rate=0.0) -> float:
+    """Area under the piecewise-linear rate curve"""
+    total, rate = 0.0, start_rate
+    for duration, target in stages:
+        total += (rate + target) / 2 * duration
+        rate = target
+    return total
+
+
+class TestArrivalTimes:
+
+    def test_constant_rate_is_evenly_spaced(self):
+        times = list(arrival_times([(2, 10)], start_rate=10))
+        assert times == pytest.approx([0.1 * n for n in range(1, 21)])
+
+    def test_ramp_up_follows_the_integrated_rate(self):
+        # r(t) = t, so A(t) = t^2 / 2 and arrival n lands at sqrt(2n)
+        times = list(arrival_times([(10, 10)]))
+        assert len(times) == 50
+        assert times == pytest.approx([math.sqrt(2 * n) for n in range(1, 51)])
+
+    def test_ramp_down_to_zero_ends_with_the_stage(self):
+        # r(t) = 10 - t, so A(t) = 10t - t^2 / 2
+        times = list(arrival_times([(10, 0)], start_rate=10))
+        assert len(times) == 50
+        assert times[0] == pytest.approx(10 - math.sqrt(100 - 2))
+        assert times[-1] == pytest.approx(10)
+
+    @pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+    def test_scenarios_issue_the_expected_count_in_order(self, scenario):
+        stages = SCENARIOS[scenario]
+        times = list(arrival_times(stages))
+        assert len(times) == math.floor(expected_arrivals(stages) + 1e-9)
+        assert all(earlier < later for earlier, later in zip(times, times[1:]))
+        assert 0 < times[0] and times[-1] <= sum(duration for duration, _ in stages) + 1e-9
+
+    def test_fractional_arrivals_carry_across_stages(self):
+        # 0.5 expected arrivals per stage: the only one lands when the second stage ends
+        times = list(arrival_times([(1, 1), (1, 0)]))
+        assert times == pytest.approx([2.0])
+
+    def test_zero_length_stage_jumps_the_rate(self):
+        times = list(arrival_times([(0, 10), (1, 10)]))
+        assert times == pytest.approx([0.1 * n for n in range(1, 11)])
+
+    def test_idle_stage_issues_nothing(self):
+        assert list(arrival_times([(5, 0)])) == []
+
+
+class TestParsing:
+
+    @pytest.mark.parametrize("text, seconds", [("90", 90), ("90s", 90), ("2m", 120), ("1.5m", 90), ("1h", 3600)])
+    def test_parse_duration(self, text, seconds):
+        assert parse_duration(text) == seconds
+
+    def test_parse_stages(self):
+        assert parse_stages("30s:50,1m:50,30s:0") == [(30, 50), (60, 50), (30, 0)]
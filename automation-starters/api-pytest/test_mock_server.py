@@ -0,0 +1,64 @@
+"""Unit tests for MockServer in mock_server.py, with a stand-in for `node`"""
+import stat
+import sys
+import textwrap
+
+import pytest
+import requests
+
+from mock_server import MockServer
+
+# Acts like `node server.js` with PORT=0: binds an ephemeral port, prints the
+# banner server.js prints and answers /health
+FAKE_NODE = textwrap.dedent("""\
+    import http.server, os, sys
+    assert sys.argv[1:] == ["server.js"] and os.path.isfile("server.js"), sys.argv
+    if os.environ["PORT"] != "0":
+        sys.exit("expected PORT=0, got " + os.environ["PORT"])
+
+    class Health(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == "/health" else 404)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("localhost", 0), Health)
+    print(f"Mock API server running on http://localhost:{server.server_port}", flush=True)
+    server.serve_forever()
+""")
+
+
+def fake_node(tmp_path, source: str) -> str:
+    script = tmp_path / "node"
+    script.write_text(f"#!{sys.executable}\n{source}")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return str(script)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stand-in node is a shebang script")
+class TestMockServer:
+
+    def test_reports_the_port_the_server_bound(self, tmp_path):
+        server = MockServer(tmp_path / "server.log", node_bin=fake_node(tmp_path, FAKE_NODE))
+        try:
+            base_url = server.start()
+            assert base_url == server.base_url
+            assert base_url != "http://localhost:0"
+            assert requests.get(f"{base_url}/health", timeout=1).status_code == 200
+        finally:
+            server.stop()
+        with pytest.raises(requests.ConnectionError):
+            requests.get(f"{base_url}/health", timeout=1)
+        server.stop()  # stopping twice is harmless
+
+    def test_server_that_exits_fails_fast(self, tmp_path):
+        server = MockServer(
+            tmp_path / "server.log",
+            node_bin=fake_node(tmp_path, "import sys\nsys.exit('EADDRINUSE')\n"),
+            startup_timeout=10,
+        )
+        with pytest.raises(RuntimeError, match="did not start"):
+            server.start()
+        assert "EADDRINUSE" in (tmp_path / "server.log").read_text()
@@ -0,0 +1,60 @@
+"""Unit tests for the compiled validators in schema_validators.py"""
+import pytest
+import yaml
+
+from schema_validators import SchemaError, SchemaValidators, load_validators
+
+
+def write_spec(tmp_path, schemas: dict):
+    spec_path = tmp_path / "api-spec.yaml"
+    spec_path.write_text(yaml.safe_dump({"components": {"schemas": schemas}}))
+    return spec_path
+
+
+class TestSchemaValidators:
+
+    def test_array_length_limits_from_the_spec(self):
+        validators = SchemaValidators()
+        question = {"question": "What are the Scope 1 emissions for this company?", "company": "Nokia"}
+        assert validators.validate("BatchRequest", {"items": [question]})
+
+        with pytest.raises(SchemaError, match=r"\$\.items: fewer than 1 items"):
+            validators.validate("BatchRequest", {"items": []})
+        with pytest.raises(SchemaError, match=r"\$\.items: more than 100 items"):
+            validators.validate("BatchRequest", {"items": [question] * 101})
+
+    def test_errors_name_the_failing_path(self, tmp_path):
+        validate = load_validators(write_spec(tmp_path, {
+            "Job": {"type": "object", "required": ["jobId"], "properties": {
+                "jobId": {"type": "string", "format": "uuid"},
+                "tags": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}},
+            }},
+        }))["Job"]
+
+        validate({"jobId": "6f1c6f55-0c3a-4d5e-9a57-2f1c9b7e3d10", "tags": ["a"]})
+        with pytest.raises(SchemaError, match=r"\$: missing required property jobId"):
+            validate({})
+        with pytest.raises(SchemaError, match=r"\$\.jobId: not a valid uuid"):
+            validate({"jobId": "job-1"})
+        with pytest.raises(SchemaError, match=r"\$\.tags\[1\]: not one of"):
+            validate({"jobId": "6f1c6f55-0c3a-4d5e-9a57-2f1c9b7e3d10", "tags": ["a", "c"]})
+
+    def test_unsupported_keyword_fails_compilation(self, tmp_path):
+        spec_path = write_spec(tmp_path, {
+            "Ids": {"type": "object", "properties": {"ids": {"type": "array", "uniqueItems": True}}},
+        })
+        with pytest.raises(ValueError, match=r"Ids\.ids: unsupported schema keyword\(s\) uniqueItems"):
+            load_validators(spec_path)
+
+    def test_unsupported_format_fails_compilation(self, tmp_path):
+        spec_path = write_spec(tmp_path, {"Site": {"type": "string", "format": "uri"}})
+        with pytest.raises(ValueError, match=r"Site: unsupported format 'uri'"):
+            load_validators(spec_path)
+
+    def test_display_hints_and_annotations_are_accepted(self, tmp_path):
+        validate = load_validators(write_spec(tmp_path, {
+            "Login": {"type": "object", "description": "Credentials", "properties": {
+                "password": {"type": "string", "format": "password", "example": "secret"},
+            }},
+        }))["Login"]
+        validate({"password": "anything"})
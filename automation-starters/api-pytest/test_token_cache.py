@@ -0,0 +1,73 @@
+"""Unit tests for TokenCache in token_cache.py"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from token_cache import TokenCache
+
+BASE_URL = "http://api.test"
+
+
+class FakeLogin:
+    """Login callable issuing numbered tokens valid for `expires_in` seconds"""
+
+    def __init__(self, expires_in: float = 3600, delay: float = 0.0):
+        self.expires_in = expires_in
+        self.delay = delay
+        self.calls = 0
+        self._guard = threading.Lock()
+
+    def __call__(self, email: str, password: str) -> dict:
+        time.sleep(self.delay)
+        with self._guard:
+            self.calls += 1
+            return {"token": f"{email}-{self.calls}", "expiresIn": self.expires_in}
+
+
+class TestTokenCache:
+
+    def test_fresh_token_is_reused(self):
+        login = FakeLogin()
+        cache = TokenCache(login, BASE_URL)
+        assert cache.get("analyst@test.com", "pw") == cache.get("analyst@test.com", "pw") == "analyst@test.com-1"
+        assert cache.get("admin@test.com", "pw") == "admin@test.com-2"
+        assert cache.logins == login.calls == 2
+
+    def test_token_inside_the_refresh_margin_is_replaced(self):
+        login = FakeLogin(expires_in=30)
+        cache = TokenCache(login, BASE_URL, refresh_margin=60)
+        assert cache.get("analyst@test.com", "pw") == "analyst@test.com-1"
+        assert cache.get("analyst@test.com", "pw") == "analyst@test.com-2"
+
+    def test_concurrent_misses_collapse_into_one_login(self):
+        login = FakeLogin(delay=0.05)
+        cache = TokenCache(login, BASE_URL)
+        with ThreadPoolExecutor(8) as pool:
+            tokens = set(pool.map(lambda _: cache.get("analyst@test.com", "pw"), range(8)))
+        assert tokens == {"analyst@test.com-1"}
+        assert login.calls == 1
+
+    def test_workers_share_one_login_through_the_directory(self, tmp_path):
+        login = FakeLogin(delay=0.05)
+        workers = [TokenCache(login, BASE_URL, shared_dir=tmp_path) for _ in range(4)]
+        with ThreadPoolExecutor(len(workers)) as pool:
+            tokens = set(pool.map(lambda worker: worker.get("analyst@test.com", "pw"), workers))
+        assert tokens == {"analyst@test.com-1"}
+        assert login.calls == 1
+        assert sorted(worker.logins for worker in workers) == [0, 0, 0, 1]
+
+    def test_expired_shared_token_is_not_handed_out(self, tmp_path):
+        login = FakeLogin(expires_in=30)
+        TokenCache(login, BASE_URL, shared_dir=tmp_path).get("analyst@test.com", "pw")
+        other = TokenCache(login, BASE_URL, refresh_margin=60, shared_dir=tmp_path)
+        assert other.get("analyst@test.com", "pw") == "analyst@test.com-2"
+
+    def test_invalidate_reaches_other_workers(self, tmp_path):
+        login = FakeLogin()
+        first, second = (TokenCache(login, BASE_URL, shared_dir=tmp_path) for _ in range(2))
+        first.get("analyst@test.com", "pw")
+        first.invalidate("analyst@test.com")
+        assert second.get("analyst@test.com", "pw") == "analyst@test.com-2"
+
+        first.clear()
+        assert list(tmp_path.glob("*.json")) == []
@@ -0,0 +1,103 @@
+"""Expiry-aware JWT cache shared by the authentication fixtures.
+
+Tokens are kept until `refresh_margin` seconds before the `expiresIn` the
+login endpoint returned. Concurrent callers that miss the cache at the same
+moment are collapsed into a single login: threads through a per-user lock,
+pytest-xdist workers through a file lock on a shared directory.
+"""
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from filelock import FileLock
+
+# Login callable: (email, password) -> parsed LoginResponse body
+LoginFn = Callable[[str, str], dict]
+
+
+class TokenCache:
+    """Caches one JWT per (base_url, email) until shortly before it expires"""
+
+    def __init__(
+        self,
+        login: LoginFn,
+        base_url: str,
+        refresh_margin: float = 60.0,
+        shared_dir: Optional[Path] = None,
+    ):
+        self._login = login
+        self.base_url = base_url
+        self.refresh_margin = refresh_margin
+        self.shared_dir = shared_dir
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.logins = 0
+
+    def _key(self, email: str) -> str:
+        return hashlib.sha1(f"{self.base_url}|{email}".encode()).hexdigest()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _fresh(self, entry: Optional[Tuple[str, float]]) -> bool:
+        return entry is not None and entry[1] - self.refresh_margin > time.time()
+
+    def get(self, email: str, password: str) -> str:
+        """Return a valid token for the user, logging in only on a miss"""
+        key = self._key(email)
+        entry = self._tokens.get(key)
+        if self._fresh(entry):
+            return entry[0]
+
+        with self._lock_for(key):
+            # Another thread may have logged in while we waited
+            entry = self._tokens.get(key)
+            if self._fresh(entry):
+                return entry[0]
+
+            if self.shared_dir is None:
+                entry = self._fetch(email, password)
+            else:
+                entry = self._fetch_shared(key, email, password)
+            self._tokens[key] = entry
+            return entry[0]
+
+    def invalidate(self, email: str) -> None:
+        """Drop the cached token, e.g. after a test logs the user out"""
+        key = self._key(email)
+        self._tokens.pop(key, None)
+        if self.shared_dir is not None:
+            with FileLock(str(self.shared_dir / f"{key}.lock")):
+                (self.shared_dir / f"{key}.json").unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Drop every cached token, e.g. after the server clock moved past their expiry"""
+        self._tokens.clear()
+        if self.shared_dir is not None:
+            for path in self.shared_dir.glob("*.json"):
+                with FileLock(str(path.with_suffix(".lock"))):
+                    path.unlink(missing_ok=True)
+
+    def _fetch(self, email: str, password: str) -> Tuple[str, float]:
+        data = self._login(email, password)
+        self.logins += 1
+        return data["token"], time.time() + data["expiresIn"]
+
+    def _fetch_shared(self, key: str, email: str, password: str) -> Tuple[str, float]:
+        """Read the token another worker stored, or log in and store it"""
+        path = self.shared_dir / f"{key}.json"
+        with FileLock(str(self.shared_dir / f"{key}.lock")):
+            if path.is_file():
+                stored = json.loads(path.read_text())
+                entry = (stored["token"], stored["expiresAt"])
+                if self._fresh(entry):
+                    return entry
+
+            entry = self._fetch(email, password)
+            path.write_text(json.dumps({"token": entry[0], "expiresAt": entry[1]}))
+            return entry
@@ -14,11 +14,681 @@ const wss = new WebSocket.Server({ server });
 // Configuration
 const PORT = process.env.PORT || 3001;
 const JWT_SECRET = 'test-secret-key-for-assignment';
+const CLOCK_SCALE = parseFloat(process.env.CLOCK_SCALE || '1'); // virtual ms per real ms
+const RANDOM_SEED = process.env.RANDOM_SEED || String(Date.now());
+const JOB_TTL_SECONDS = parseFloat(process.env.JOB_TTL_SECONDS || '600'); // after done/failed
+const JOB_STORE_MAX = parseInt(process.env.JOB_STORE_MAX || '10000', 10);
+const ANSWER_HISTORY_LIMIT = parseInt(process.env.ANSWER_HISTORY_LIMIT || '100', 10); // per user
+const ANSWER_PAGE_SIZE = 10;
+const ANSWER_CACHE_MAX = parseInt(process.env.ANSWER_CACHE_MAX || '1000', 10); // (company, question) pairs; 0 turns it off
+const ANSWER_CACHE_TTL_SECONDS = parseFloat(process.env.ANSWER_CACHE_TTL_SECONDS || '3600');
+const API_RATE_LIMIT = parseInt(process.env.API_RATE_LIMIT || '100', 10); // per user per minute
+const UPLOAD_RATE_LIMIT = parseInt(process.env.UPLOAD_RATE_LIMIT || '5', 10); // per admin per hour
+const AIML_WORKERS = parseInt(process.env.AIML_WORKERS || '200', 10); // jobs processed at once
+const JOB_QUEUE_MAX = parseInt(process.env.JOB_QUEUE_MAX || '2000', 10); // jobs waiting for a worker
+const QA_BATCH_MAX = parseInt(process.env.QA_BATCH_MAX || '100', 10); // items per POST /api/v1/qa/batch
+const STATUS_QUERY_GET_MAX = 100; // ids per GET /api/v1/qa/status, keeping the URL short
+const STATUS_QUERY_POST_MAX = 1000; // ids per POST /api/v1/qa/status
+const LONG_POLL_MAX_SECONDS = 30; // longest ?timeout= for GET /api/v1/qa/{jobId}?waitFor=
+const LONG_POLL_DEFAULT_SECONDS = 15;
+const JOB_ID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$/i;
+const AIML_URL = process.env.AIML_URL || ''; // empty: job workers call the AIML handler in-process
+const AIML_TIMEOUT_MS = 8000; // documented AIML timeout, covering every attempt of one call
+const AIML_MAX_ATTEMPTS = parseInt(process.env.AIML_MAX_ATTEMPTS || '3', 10);
+const AIML_RETRY_BASE_MS = 500; // first backoff; doubles per attempt, with jitter
+const AIML_RATE_LIMIT = 10; // documented /aiml/answer requests per minute, per client
+// The job workers are one more AIML client, so by default they get the same quota
+const AIML_JOB_RATE_LIMIT = parseInt(process.env.AIML_JOB_RATE_LIMIT || String(AIML_RATE_LIMIT), 10);
+
+// Simulated job timing, in virtual ms: the hand-off from a worker to the AIML
+// service, the service's response time and the share of calls that hang
+// until the AIML timeout
+const JOB_HANDOFF_MIN_MS = 1000;
+const JOB_HANDOFF_SPREAD_MS = 2000;
+const AIML_RESPONSE_MIN_MS = 500;
+const AIML_RESPONSE_SPREAD_MS = 1000;
+const AIML_STALL_RATE = 0.1;
+// Mean worker time per job under that model, before retries
+const EXPECTED_SERVICE_MS = JOB_HANDOFF_MIN_MS + JOB_HANDOFF_SPREAD_MS / 2 +
+  (1 - AIML_STALL_RATE) * (AIML_RESPONSE_MIN_MS + AIML_RESPONSE_SPREAD_MS / 2) +
+  AIML_STALL_RATE * AIML_TIMEOUT_MS;
+
+// Seeded randomness. Every subsystem draws from its own mulberry32 stream
+// derived from the seed, so a run is reproducible and, e.g., generating an
+// extra answer does not shift the sequence of job failures.
+const RANDOM_STREAMS = ['jobTiming', 'jobFailures', 'answers', 'confidence', 'aiml', 'aimlRetries'];
+const random = {};
+let randomSeed;
+
+function xmur3(str) {
+  let h = 1779033703 ^ str.length;
+  for (let i = 0; i < str.length; i++) {
+    h = Math.imul(h ^ str.charCodeAt(i), 3432918353);
+    h = (h << 13) | (h >>> 19);
+  }
+  h = Math.imul(h ^ (h >>> 16), 2246822507);
+  h = Math.imul(h ^ (h >>> 13), 3266489909);
+  return (h ^ (h >>> 16)) >>> 0;
+}
+
+function mulberry32(state) {
+  return () => {
+    state = (state + 0x6D2B79F5) | 0;
+    let t = Math.imul(state ^ (state >>> 15), 1 | state);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function seedRandom(seed) {
+  randomSeed = String(seed);
+  RANDOM_STREAMS.forEach(name => {
+    random[name] = mulberry32(xmur3(`${randomSeed}:${name}`));
+  });
+}
+
+seedRandom(RANDOM_SEED);
+
+// Virtual clock. Job timers, timestamps, the AIML rate-limit window and JWT
+// expiry all read this clock instead of Date.now()/setTimeout, so tests can
+// run it faster than real time (CLOCK_SCALE=100), freeze it (CLOCK_SCALE=0)
+// and move it by hand with POST /mock/clock/advance.
+class VirtualClock {
+  constructor(scale) {
+    this.scale = scale;
+    this.realBase = Date.now();
+    this.virtualBase = this.realBase;
+    this.timers = []; // { at, fn } sorted by due time, FIFO for equal times
+    this.wakeup = null;
+  }
+
+  now() {
+    return this.virtualBase + (Date.now() - this.realBase) * this.scale;
+  }
+
+  seconds() {
+    return Math.floor(this.now() / 1000);
+  }
+
+  iso() {
+    return new Date(this.now()).toISOString();
+  }
+
+  rebase(virtualNow) {
+    this.realBase = Date.now();
+    this.virtualBase = virtualNow;
+  }
+
+  // Returns a handle for clearTimeout
+  setTimeout(fn, delayMs) {
+    const timer = { at: this.now() + delayMs, fn };
+    let lo = 0;
+    let hi = this.timers.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (this.timers[mid].at <= timer.at) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    this.timers.splice(lo, 0, timer);
+    if (lo === 0) {
+      this.schedule();
+    }
+    return timer;
+  }
+
+  // Drops a pending timer; a timer that already fired is ignored
+  clearTimeout(timer) {
+    const index = this.timers.indexOf(timer);
+    if (index === -1) return;
+    this.timers.splice(index, 1);
+    if (index === 0) {
+      this.schedule();
+    }
+  }
+
+  setScale(scale) {
+    this.rebase(this.now());
+    this.scale = scale;
+    this.schedule();
+  }
+
+  // Jump ahead, firing every timer that falls due on the way at its own due
+  // time, so timers scheduled by those callbacks also fire in order
+  advance(ms) {
+    const target = this.now() + ms;
+    while (this.timers.length && this.timers[0].at <= target) {
+      const timer = this.timers.shift();
+      this.rebase(Math.max(timer.at, this.now()));
+      this.fire(timer);
+    }
+    this.rebase(Math.max(target, this.now()));
+    this.schedule();
+  }
+
+  runDue() {
+    while (this.timers.length && this.timers[0].at <= this.now()) {
+      this.fire(this.timers.shift());
+    }
+    this.schedule();
+  }
+
+  fire(timer) {
+    try {
+      timer.fn();
+    } catch (error) {
+      console.error('Virtual timer failed:', error);
+    }
+  }
+
+  // One real timeout for the earliest virtual timer; none while frozen
+  schedule() {
+    clearTimeout(this.wakeup);
+    this.wakeup = null;
+    if (!this.timers.length || this.scale <= 0) {
+      return;
+    }
+    const delay = Math.max(0, (this.timers[0].at - this.now()) / this.scale);
+    this.wakeup = setTimeout(() => this.runDue(), Math.min(delay, 2 ** 31 - 1));
+  }
+}
+
+// Same check as PUT /mock/clock: NaN would break every timestamp, a negative
+// scale would run time backwards
+if (!(CLOCK_SCALE >= 0)) {
+  console.error(`CLOCK_SCALE must be a non-negative number, got "${process.env.CLOCK_SCALE}"`);
+  process.exit(1);
+}
+const clock = new VirtualClock(CLOCK_SCALE);
+
+// Each user's history is a ring of this many answers; an empty ring has no slot
+// to write to, so 0 is refused like any other non-positive or non-numeric value
+if (!(ANSWER_HISTORY_LIMIT >= 1)) {
+  console.error(`ANSWER_HISTORY_LIMIT must be a positive integer, got "${process.env.ANSWER_HISTORY_LIMIT}"`);
+  process.exit(1);
+}
 
 // Middleware
 app.use(cors());
 app.use(express.json({ limit: '10mb' }));
-app.use(express.static('public'));
+app.use(express.static(path.join(__dirname, 'public')));
+
+// Bounded job store. Terminal jobs expire JOB_TTL_SECONDS (virtual time)
+// after finishing, and beyond JOB_STORE_MAX entries the least recently used
+// job is dropped. Evicted ids are remembered (up to the same cap) so lookups
+// can answer 410 "evicted" instead of 404. Expiry is swept lazily on every
+// access, which keeps a long soak at a steady-state heap without a timer.
+const JOB_OVERHEAD_BYTES = 200; // Map entry, object header and property slots
+
+class JobStore {
+  constructor({ maxEntries, ttlMs }) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.entries = new Map(); // jobId -> job, least recently used first
+    this.sizes = new Map(); // jobId -> approximate bytes
+    this.bytes = 0;
+    this.expiries = []; // [{ jobId, at }] in finishing order, i.e. expiry order
+    this.expiryHead = 0;
+    this.tombstones = new Map(); // jobId -> { reason: 'ttl' | 'capacity', userId }, oldest first
+    this.evictions = { ttl: 0, capacity: 0 };
+  }
+
+  // Lookup without refreshing recency, for the processing timers
+  peek(jobId) {
+    return this.entries.get(jobId);
+  }
+
+  // With userId, only a job that user owns; another user's stays untouched
+  get(jobId, userId) {
+    this.sweep();
+    const job = this.entries.get(jobId);
+    if (!job || (userId !== undefined && job.userId !== userId)) {
+      return undefined;
+    }
+    this.entries.delete(jobId);
+    this.entries.set(jobId, job);
+    return job;
+  }
+
+  set(job) {
+    this.sweep();
+    this.entries.set(job.jobId, job);
+    this.account(job);
+    while (this.entries.size > this.maxEntries) {
+      this.evict(this.entries.keys().next().value, 'capacity');
+    }
+  }
+
+  // Called when a job reaches done/failed: its size grew and its TTL starts
+  finish(job) {
+    if (!this.entries.has(job.jobId)) {
+      return;
+    }
+    this.account(job);
+    job.expiresAt = clock.now() + this.ttlMs;
+    this.expiries.push({ jobId: job.jobId, at: job.expiresAt });
+  }
+
+  // Why the job was evicted; with userId, only if that user owned it
+  evicted(jobId, userId) {
+    const tombstone = this.tombstones.get(jobId);
+    if (!tombstone || (userId !== undefined && tombstone.userId !== userId)) {
+      return undefined;
+    }
+    return tombstone.reason;
+  }
+
+  account(job) {
+    const size = JSON.stringify(job).length + JOB_OVERHEAD_BYTES;
+    this.bytes += size - (this.sizes.get(job.jobId) || 0);
+    this.sizes.set(job.jobId, size);
+  }
+
+  evict(jobId, reason) {
+    const { userId } = this.entries.get(jobId);
+    this.entries.delete(jobId);
+    this.bytes -= this.sizes.get(jobId) || 0;
+    this.sizes.delete(jobId);
+    this.evictions[reason]++;
+    this.tombstones.set(jobId, { reason, userId });
+    if (this.tombstones.size > this.maxEntries) {
+      this.tombstones.delete(this.tombstones.keys().next().value);
+    }
+  }
+
+  sweep() {
+    const now = clock.now();
+    while (this.expiryHead < this.expiries.length && this.expiries[this.expiryHead].at <= now) {
+      const { jobId, at } = this.expiries[this.expiryHead++];
+      const job = this.entries.get(jobId);
+      if (job && job.expiresAt === at) {
+        this.evict(jobId, 'ttl');
+      }
+    }
+    // Drop the consumed prefix once it dominates the queue
+    if (this.expiryHead > 1024 && this.expiryHead * 2 > this.expiries.length) {
+      this.expiries = this.expiries.slice(this.expiryHead);
+      this.expiryHead = 0;
+    }
+  }
+
+  stats() {
+    this.sweep();
+    return {
+      entries: this.entries.size,
+      approxBytes: this.bytes,
+      maxEntries: this.maxEntries,
+      ttlSeconds: this.ttlMs / 1000,
+      evictions: { ...this.evictions },
+      tombstones: this.tombstones.size
+    };
+  }
+}
+
+// Job scheduler: a FIFO queue drained by a fixed pool of AIML workers. A job
+// waits in the queue until a worker is free, so under load queueing delay
+// grows instead of every job running at once. Once the queue holds maxQueue
+// jobs, submissions are refused with a Retry-After estimated from the
+// recent service time.
+const WAIT_SAMPLES = 1024; // recent queue waits kept for the p95
+
+class JobScheduler {
+  constructor({ workers, maxQueue, serviceMs }) {
+    this.workers = workers;
+    this.maxQueue = maxQueue;
+    this.queue = []; // { run, at }, consumed from `head`
+    this.head = 0;
+    this.busy = 0;
+    this.accepted = 0;
+    this.rejected = 0;
+    this.serviceMs = serviceMs; // moving average of worker time per job, from the expected one
+    this.waits = new Array(WAIT_SAMPLES);
+    this.waitCount = 0;
+    this.waitTotal = 0;
+    this.waitMax = 0;
+  }
+
+  get depth() {
+    return this.queue.length - this.head;
+  }
+
+  // Whether n more jobs fit, counting idle workers that would take some at once
+  accepts(n) {
+    return this.depth + Math.max(0, n - (this.workers - this.busy)) <= this.maxQueue;
+  }
+
+  get full() {
+    return !this.accepts(1);
+  }
+
+  // Counts a submission turned away because the queue is full; returns the
+  // time until a queue slot is likely to free up
+  refuse() {
+    this.rejected++;
+    return this.serviceMs / this.workers;
+  }
+
+  // Queues run(done); run calls done() when its worker is free again
+  submit(run) {
+    this.submitAll([run]);
+  }
+
+  // Queues several runs back to back, in order
+  submitAll(runs) {
+    const at = clock.now();
+    for (const run of runs) {
+      this.queue.push({ run, at });
+    }
+    this.accepted += runs.length;
+    this.pump();
+  }
+
+  pump() {
+    while (this.busy < this.workers && this.depth > 0) {
+      const { run, at } = this.queue[this.head];
+      this.queue[this.head++] = undefined;
+      if (this.head > 1024 && this.head * 2 > this.queue.length) {
+        this.queue = this.queue.slice(this.head);
+        this.head = 0;
+      }
+
+      const started = clock.now();
+      this.recordWait(started - at);
+      this.busy++;
+      let finished = false;
+      run(() => {
+        if (finished) return;
+        finished = true;
+        this.busy--;
+        this.serviceMs = this.serviceMs * 0.9 + (clock.now() - started) * 0.1;
+        this.pump();
+      });
+    }
+  }
+
+  recordWait(ms) {
+    this.waits[this.waitCount % WAIT_SAMPLES] = ms;
+    this.waitCount++;
+    this.waitTotal += ms;
+    this.waitMax = Math.max(this.waitMax, ms);
+  }
+
+  resize({ workers = this.workers, maxQueue = this.maxQueue }) {
+    this.workers = workers;
+    this.maxQueue = maxQueue;
+    this.pump();
+  }
+
+  stats() {
+    const recent = this.waits.slice(0, Math.min(this.waitCount, WAIT_SAMPLES)).sort((a, b) => a - b);
+    return {
+      workers: this.workers,
+      busy: this.busy,
+      queued: this.depth,
+      maxQueue: this.maxQueue,
+      accepted: this.accepted,
+      rejected: this.rejected,
+      waitMs: {
+        count: this.waitCount,
+        mean: this.waitCount ? this.waitTotal / this.waitCount : 0,
+        p95: recent.length ? recent[Math.min(recent.length - 1, Math.floor(recent.length * 0.95))] : 0,
+        max: this.waitMax
+      },
+      serviceMs: Math.round(this.serviceMs)
+    };
+  }
+}
+
+// The AIML service behind POST /aiml/answer. reply(status, payload, rateLimit)
+// is called exactly once; `limiter` and `key` pick whose quota the call uses.
+function aimlService(body, limiter, key, reply) {
+  const { question, company } = body || {};
+  if (!question || !company) {
+    return reply(400, { error: 'Question and company are required' });
+  }
+
+  const rateLimit = limiter.hit(key);
+  if (!rateLimit.allowed) {
+    return reply(429, {
+      error: 'Too Many Requests - Rate limit exceeded',
+      retryAfter: Math.ceil(rateLimit.retryAfterMs / 1000)
+    }, rateLimit);
+  }
+
+  // Simulate occasional server errors
+  if (random.aiml() < 0.05) {
+    return reply(500, { error: 'Internal server error' }, rateLimit);
+  }
+
+  // Simulate processing time
+  clock.setTimeout(() => {
+    reply(200, {
+      answer: generateAnswer(question, company),
+      confidence: generateConfidence()
+    }, rateLimit);
+  }, random.aiml() * AIML_RESPONSE_SPREAD_MS + AIML_RESPONSE_MIN_MS);
+}
+
+// Client the job workers use to reach the AIML service. With AIML_URL set it
+// posts over a keep-alive connection pool; otherwise it calls aimlService
+// directly, counted against the `aimlJobs` quota (the documented 10/min
+// unless AIML_JOB_RATE_LIMIT says otherwise). In-process is the default
+// because a frozen virtual clock can drive it, but not a socket round trip,
+// even one to this server's own /aiml/answer. 429s, 5xx and network errors are retried with exponential
+// backoff and jitter, waiting at least the service's retryAfter, until the
+// 8-second timeout for the whole call runs out.
+class AimlClient {
+  constructor({ url, timeoutMs, maxAttempts, baseDelayMs, maxSockets }) {
+    this.url = url ? new URL(url) : null;
+    this.agent = url ? new http.Agent({ keepAlive: true, maxSockets }) : null;
+    this.timeoutMs = timeoutMs;
+    this.maxAttempts = maxAttempts;
+    this.baseDelayMs = baseDelayMs;
+  }
+
+  // One attempt: callback(status, payload), status 0 for network errors.
+  // Returns the in-flight request, if any, so a timeout can abort it.
+  send(body, callback) {
+    if (!this.url) {
+      aimlService(body, rateLimits.aimlJobs, 'processing-api', (status, payload) => callback(status, payload));
+      return null;
+    }
+
+    const data = JSON.stringify(body);
+    const req = http.request(this.url, {
+      method: 'POST',
+      agent: this.agent,
+      headers: { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(data) }
+    }, (res) => {
+      let text = '';
+      res.setEncoding('utf8');
+      res.on('data', chunk => { text += chunk; });
+      res.on('end', () => {
+        let payload = null;
+        try {
+          payload = JSON.parse(text);
+        } catch (error) {
+          // Non-JSON error pages are treated like any other failed attempt
+        }
+        if (payload && payload.retryAfter === undefined && res.headers['retry-after']) {
+          payload.retryAfter = Number(res.headers['retry-after']);
+        }
+        callback(res.statusCode, payload);
+      });
+    });
+    req.on('error', () => callback(0, null));
+    req.end(data);
+    return req;
+  }
+
+  // done(error, payload, attempts); `stall` simulates an upstream hang that
+  // only the timeout ends
+  answer(body, { stall = false } = {}, done) {
+    const deadline = clock.now() + this.timeoutMs;
+    const attempts = [];
+    let current = null; // { record, sentAt, req }
+    let finished = false;
+    let timeout = null;
+    let retry = null;
+
+    const finish = (error, payload) => {
+      if (finished) return;
+      finished = true;
+      clock.clearTimeout(timeout);
+      clock.clearTimeout(retry);
+      if (current && current.record.status === null) {
+        current.record.durationMs = Math.round(clock.now() - current.sentAt);
+        if (current.req) current.req.destroy();
+      }
+      done(error, payload, attempts);
+    };
+
+    timeout = clock.setTimeout(() => finish('AIML service timeout - please try again'), this.timeoutMs);
+
+    const attempt = () => {
+      if (finished) return;
+      const record = { attempt: attempts.length + 1, startedAt: clock.iso(), status: null, durationMs: null };
+      attempts.push(record);
+      const sentAt = clock.now();
+      current = { record, sentAt, req: null };
+      if (stall) return;
+
+      current.req = this.send(body, (status, payload) => {
+        if (finished || record.status !== null) return;
+        record.status = status;
+        record.durationMs = Math.round(clock.now() - sentAt);
+        if (status === 200 && payload) {
+          return finish(null, payload);
+        }
+
+        const retryable = status === 0 || status === 429 || status >= 500;
+        const backoff = this.baseDelayMs * 2 ** (attempts.length - 1) * (0.5 + random.aimlRetries() * 0.5);
+        const delay = Math.max(backoff, ((payload && payload.retryAfter) || 0) * 1000);
+        if (!retryable || attempts.length >= this.maxAttempts || clock.now() + delay >= deadline) {
+          return finish(status === 429
+            ? 'AIML service rate limit exceeded - please try again'
+            : 'AIML service error - please try again');
+        }
+        record.retryInMs = Math.round(delay);
+        retry = clock.setTimeout(attempt, delay);
+      });
+    };
+
+    attempt();
+  }
+}
+
+// Per-user answer history: a fixed-size ring of the user's latest results.
+// Every answer gets a sequence number; a cursor is the (opaque) sequence
+// number to continue below, so a page costs O(page size) whatever the
+// number of users or answers.
+class AnswerHistory {
+  constructor(capacity) {
+    this.capacity = capacity;
+    this.ring = new Array(capacity);
+    this.total = 0; // answers ever added; the newest has sequence total - 1
+  }
+
+  add(answer) {
+    this.ring[this.total % this.capacity] = answer;
+    this.total++;
+  }
+
+  // Newest first, starting below sequence `before`
+  page(limit, before = this.total) {
+    const oldest = Math.max(0, this.total - this.capacity);
+    const page = [];
+    let seq = Math.min(before, this.total) - 1;
+    for (; seq >= oldest && page.length < limit; seq--) {
+      page.push(this.ring[seq % this.capacity]);
+    }
+    return { answers: page, next: seq >= oldest ? seq + 1 : null };
+  }
+}
+
+// Answers by normalized (company, question), so a repeated question skips
+// the AIML step. Least recently used first; an entry expires ttlMs of
+// virtual time after the AIML service produced it, however often it is hit.
+// Expired entries are dropped when looked up or pushed out by newer ones.
+class AnswerCache {
+  constructor({ maxEntries, ttlMs }) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.entries = new Map(); // key -> { answer, confidence, jobId, userId, answeredAt, expiresAt }
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = { ttl: 0, capacity: 0 };
+  }
+
+  // Case and runs of whitespace do not make a question new
+  static key({ question, company }) {
+    const normalize = text => String(text).trim().replace(/\s+/g, ' ').toLowerCase();
+    return `${normalize(company)}\n${normalize(question)}`;
+  }
+
+  // Looks an answer up without counting it or refreshing its recency, so a
+  // submission that is then refused leaves the stats alone; always null
+  // while the cache is off
+  peek(item) {
+    if (this.maxEntries === 0) return null;
+    const key = AnswerCache.key(item);
+    const entry = this.entries.get(key);
+    if (entry && entry.expiresAt <= clock.now()) {
+      this.entries.delete(key);
+      this.evictions.ttl++;
+      return null;
+    }
+    return entry || null;
+  }
+
+  // Counts the outcome of a peek once the submission is accepted
+  record(item, entry) {
+    if (this.maxEntries === 0) return;
+    if (!entry) {
+      this.misses++;
+      return;
+    }
+    const key = AnswerCache.key(item);
+    if (this.entries.get(key) === entry) {
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+    }
+    this.hits++;
+  }
+
+  set(item, entry) {
+    if (this.maxEntries === 0) return;
+    const key = AnswerCache.key(item);
+    this.entries.delete(key);
+    this.entries.set(key, { ...entry, expiresAt: clock.now() + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+      this.evictions.capacity++;
+    }
+  }
+
+  stats() {
+    const lookups = this.hits + this.misses;
+    return {
+      entries: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlSeconds: this.ttlMs / 1000,
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups ? this.hits / lookups : 0,
+      evictions: { ...this.evictions }
+    };
+  }
+}
+
+const encodeCursor = (seq) => Buffer.from(`a${seq}`).toString('base64url');
+
+function decodeCursor(cursor) {
+  const match = /^a(\d+)$/.exec(Buffer.from(cursor, 'base64url').toString());
+  return match ? parseInt(match[1], 10) : null;
+}
 
 // In-memory storage
 const users = [
@@ -38,13 +708,128 @@ const users = [
   }
 ];
 
-const jobs = new Map();
-const answers = [];
+const jobs = new JobStore({ maxEntries: JOB_STORE_MAX, ttlMs: JOB_TTL_SECONDS * 1000 });
+const scheduler = new JobScheduler({ workers: AIML_WORKERS, maxQueue: JOB_QUEUE_MAX, serviceMs: EXPECTED_SERVICE_MS });
+const aimlClient = new AimlClient({
+  url: AIML_URL,
+  timeoutMs: AIML_TIMEOUT_MS,
+  maxAttempts: AIML_MAX_ATTEMPTS,
+  baseDelayMs: AIML_RETRY_BASE_MS,
+  maxSockets: AIML_WORKERS
+});
+const answerHistories = new Map(); // userId -> AnswerHistory
+// Replaced, not mutated, by PUT /mock/answer-cache
+let answerCache = new AnswerCache({ maxEntries: ANSWER_CACHE_MAX, ttlMs: ANSWER_CACHE_TTL_SECONDS * 1000 });
 const companies = ['Nokia', 'Apple Inc', 'Microsoft Corporation', 'Google', 'Amazon'];
 
-// Rate limiting for AIML service
-const aimlRateLimit = new Map();
-const AIML_RATE_LIMIT = 10; // requests per minute
+// Sliding-window rate limiter. Each key keeps only the counts of the
+// current and previous fixed window; the previous one is weighted by how
+// much of it still overlaps the sliding window, so a hit is O(1) and a key
+// costs the same memory however busy it is. Keys idle for two windows are
+// reaped by a sweep that runs at most once per window.
+class SlidingWindowLimiter {
+  constructor({ limit, windowMs }) {
+    this.limit = limit;
+    this.windowMs = windowMs;
+    this.keys = new Map(); // key -> { window, current, previous }
+    this.nextSweep = 0;
+  }
+
+  hit(key) {
+    const now = clock.now();
+    if (now >= this.nextSweep) {
+      this.sweep(now);
+    }
+
+    const window = Math.floor(now / this.windowMs);
+    let entry = this.keys.get(key);
+    if (!entry) {
+      entry = { window, current: 0, previous: 0 };
+      this.keys.set(key, entry);
+    } else if (entry.window !== window) {
+      entry.previous = entry.window === window - 1 ? entry.current : 0;
+      entry.current = 0;
+      entry.window = window;
+    }
+
+    const elapsed = now - window * this.windowMs;
+    const weight = 1 - elapsed / this.windowMs;
+    const used = entry.previous * weight + entry.current;
+    const allowed = used + 1 <= this.limit;
+    if (allowed) {
+      entry.current++;
+    }
+
+    return {
+      allowed,
+      limit: this.limit,
+      remaining: Math.max(0, Math.floor(this.limit - used - (allowed ? 1 : 0))),
+      resetMs: this.windowMs - elapsed,
+      retryAfterMs: allowed ? 0 : this.retryAfter(entry, elapsed)
+    };
+  }
+
+  // Time until the weighted count drops low enough to admit one more request
+  retryAfter(entry, elapsed) {
+    const room = this.limit - 1;
+    if (entry.current > room) {
+      // Blocked by this window alone: wait for it to become the previous one
+      // and decay to `room`
+      return this.windowMs - elapsed + this.windowMs * (1 - room / entry.current);
+    }
+    return Math.max(0, this.windowMs * (1 - (room - entry.current) / entry.previous) - elapsed);
+  }
+
+  sweep(now = clock.now()) {
+    const stale = Math.floor(now / this.windowMs) - 1;
+    for (const [key, entry] of this.keys) {
+      if (entry.window < stale) {
+        this.keys.delete(key);
+      }
+    }
+    this.nextSweep = now + this.windowMs;
+  }
+
+  stats() {
+    return { limit: this.limit, windowSeconds: this.windowMs / 1000, keys: this.keys.size };
+  }
+}
+
+// Sets the draft-standard RateLimit-* headers, plus Retry-After when blocked
+function setRateLimitHeaders(res, result) {
+  res.set({
+    'RateLimit-Limit': String(result.limit),
+    'RateLimit-Remaining': String(result.remaining),
+    'RateLimit-Reset': String(Math.ceil(result.resetMs / 1000))
+  });
+  if (!result.allowed) {
+    res.set('Retry-After', String(Math.ceil(result.retryAfterMs / 1000)));
+  }
+}
+
+// Rate limits by name; routes look them up per request, so /mock/rate-limits
+// can swap one out for a test
+const rateLimits = {
+  aiml: new SlidingWindowLimiter({ limit: AIML_RATE_LIMIT, windowMs: 60000 }), // per client IP
+  api: new SlidingWindowLimiter({ limit: API_RATE_LIMIT, windowMs: 60000 }), // per user, authenticated routes
+  upload: new SlidingWindowLimiter({ limit: UPLOAD_RATE_LIMIT, windowMs: 3600000 }), // per admin
+  aimlJobs: new SlidingWindowLimiter({ limit: AIML_JOB_RATE_LIMIT, windowMs: 60000 }) // job workers' AIML quota
+};
+
+// Middleware counting the request against a per-user limit; goes after verifyToken
+function userRateLimit(name) {
+  return (req, res, next) => {
+    const result = rateLimits[name].hit(req.user.userId);
+    setRateLimitHeaders(res, result);
+    if (!result.allowed) {
+      return res.status(429).json({
+        error: 'Too Many Requests - Rate limit exceeded',
+        retryAfter: Math.ceil(result.retryAfterMs / 1000)
+      });
+    }
+    next();
+  };
+}
 
 // Multer configuration for file uploads
 const upload = multer({
@@ -58,18 +843,53 @@ const upload = multer({
   }
 });
 
-// WebSocket connections
+// WebSocket connections: userId -> Set of authenticated sockets, so every
+// tab a user has open gets their updates and nobody else's
 const wsConnections = new Map();
 
+function addWsConnection(userId, ws) {
+  if (ws.userId === userId) return;
+  removeWsConnection(ws);
+  let sockets = wsConnections.get(userId);
+  if (!sockets) {
+    sockets = new Set();
+    wsConnections.set(userId, sockets);
+  }
+  sockets.add(ws);
+  ws.userId = userId;
+}
+
+function removeWsConnection(ws) {
+  const sockets = wsConnections.get(ws.userId);
+  if (!sockets) return;
+  sockets.delete(ws);
+  if (sockets.size === 0) {
+    wsConnections.delete(ws.userId);
+  }
+}
+
+// Server-Sent Events: open streams and a replay buffer per user, so a
+// reconnecting client resumes from Last-Event-ID instead of refetching jobs
+const SSE_REPLAY_LIMIT = 100; // events kept per user
+const SSE_RETRY_MS = 3000;
+const SSE_HEARTBEAT_MS = 15000;
+const sseClients = new Map(); // userId -> Set of open responses
+const sseReplay = new Map(); // userId -> { events: [{ id, frame }], evictedId }
+let sseEventId = 0; // monotonically increasing across all users
+
 // Helper functions
 function generateToken(user) {
   return jwt.sign(
-    { userId: user.id, email: user.email, role: user.role },
+    { userId: user.id, email: user.email, role: user.role, iat: clock.seconds() },
     JWT_SECRET,
     { expiresIn: '1h' }
   );
 }
 
+function decodeToken(token) {
+  return jwt.verify(token, JWT_SECRET, { clockTimestamp: clock.seconds() });
+}
+
 function verifyToken(req, res, next) {
   const authHeader = req.headers.authorization;
   
@@ -80,7 +900,7 @@ function verifyToken(req, res, next) {
   const token = authHeader.substring(7);
   
   try {
-    const decoded = jwt.verify(token, JWT_SECRET);
+    const decoded = decodeToken(token);
     req.user = decoded;
     next();
   } catch (error) {
@@ -95,100 +915,157 @@ function requireAdmin(req, res, next) {
   next();
 }
 
-function simulateAIMLProcessing(jobId) {
-  const job = jobs.get(jobId);
-  if (!job) return;
+// Runs on a scheduler worker; calls done() once the worker is free again
+function simulateAIMLProcessing(jobId, done) {
+  const job = jobs.peek(jobId);
+  if (!job) return done();
 
-  // Simulate processing time
-  setTimeout(() => {
-    const job = jobs.get(jobId);
-    if (job && job.status === 'queued') {
-      job.status = 'running';
-      broadcastJobUpdate(job);
-      
-      // Simulate processing completion
-      setTimeout(() => {
-        const job = jobs.get(jobId);
-        if (job && job.status === 'running') {
-          // Simulate occasional failures
-          if (Math.random() < 0.1) {
-            job.status = 'failed';
-            job.error = 'AIML service timeout - please try again';
-          } else {
-            job.status = 'done';
-            job.completedAt = new Date().toISOString();
-            job.result = {
-              question: job.question,
-              company: job.company,
-              answer: generateAnswer(job.question, job.company),
-              confidence: generateConfidence(),
-              timestamp: new Date().toISOString()
-            };
-            
-            // Add to answers history
-            answers.unshift(job.result);
-            if (answers.length > 10) {
-              answers.pop();
-            }
-          }
-          broadcastJobUpdate(job);
+  // Simulate the hand-off to the AIML service; the job still reads as queued
+  clock.setTimeout(() => {
+    const job = jobs.peek(jobId);
+    if (!job || job.status !== 'queued') return done();
+    job.status = 'running';
+    broadcastJobUpdate(job);
+
+    // 10% of calls hang upstream and run into the AIML timeout
+    const stall = random.jobFailures() < AIML_STALL_RATE;
+    aimlClient.answer({ question: job.question, company: job.company }, { stall }, (error, answer, attempts) => {
+      const job = jobs.peek(jobId);
+      if (job && job.status === 'running') {
+        job.aimlAttempts = attempts;
+        if (error) {
+          job.status = 'failed';
+          job.error = error;
+        } else {
+          const { answer: text, confidence } = answer;
+          answerCache.set(job, {
+            answer: text, confidence, jobId: job.jobId, userId: job.userId, answeredAt: clock.iso()
+          });
+          completeJob(job, { answer: text, confidence, source: 'aiml' });
         }
-      }, Math.random() * 5000 + 2000); // 2-7 seconds processing
-    }
-  }, Math.random() * 2000 + 1000); // 1-3 seconds queue time
+        jobs.finish(job);
+        broadcastJobUpdate(job);
+      }
+      done();
+    });
+  }, random.jobTiming() * JOB_HANDOFF_SPREAD_MS + JOB_HANDOFF_MIN_MS);
+}
+
+// Marks a job done with an answer and adds it to the owner's answer history;
+// the caller finishes and broadcasts the job
+function completeJob(job, answer) {
+  job.status = 'done';
+  job.completedAt = clock.iso();
+  job.result = {
+    question: job.question,
+    company: job.company,
+    ...answer,
+    timestamp: clock.iso()
+  };
+
+  let history = answerHistories.get(job.userId);
+  if (!history) {
+    history = new AnswerHistory(ANSWER_HISTORY_LIMIT);
+    answerHistories.set(job.userId, history);
+  }
+  history.add(job.result);
 }
 
 function generateAnswer(question, company) {
   const templates = [
-    `${company}'s Scope 1 emissions for 2023 were approximately ${Math.floor(Math.random() * 100000)} tCO2e, representing a ${Math.floor(Math.random() * 20)}% ${Math.random() > 0.5 ? 'increase' : 'decrease'} from the previous year.`,
-    `${company} has committed to achieving carbon neutrality by ${2030 + Math.floor(Math.random() * 20)}, with interim targets of ${Math.floor(Math.random() * 50 + 30)}% reduction by 2030.`,
-    `${company}'s sustainability initiatives include renewable energy adoption (${Math.floor(Math.random() * 100)}% renewable by 2030), waste reduction programs, and water conservation measures.`,
-    `According to ${company}'s latest ESG report, their environmental score improved by ${Math.floor(Math.random() * 30)}% year-over-year, driven by enhanced ${Math.random() > 0.5 ? 'energy efficiency' : 'waste management'} practices.`
+    `${company}'s Scope 1 emissions for 2023 were approximately ${Math.floor(random.answers() * 100000)} tCO2e, representing a ${Math.floor(random.answers() * 20)}% ${random.answers() > 0.5 ? 'increase' : 'decrease'} from the previous year.`,
+    `${company} has committed to achieving carbon neutrality by ${2030 + Math.floor(random.answers() * 20)}, with interim targets of ${Math.floor(random.answers() * 50 + 30)}% reduction by 2030.`,
+    `${company}'s sustainability initiatives include renewable energy adoption (${Math.floor(random.answers() * 100)}% renewable by 2030), waste reduction programs, and water conservation measures.`,
+    `According to ${company}'s latest ESG report, their environmental score improved by ${Math.floor(random.answers() * 30)}% year-over-year, driven by enhanced ${random.answers() > 0.5 ? 'energy efficiency' : 'waste management'} practices.`
   ];
   
-  return templates[Math.floor(Math.random() * templates.length)];
+  return templates[Math.floor(random.answers() * templates.length)];
 }
 
 function generateConfidence() {
   // Occasionally return invalid confidence for testing
-  if (Math.random() < 0.05) {
+  if (random.confidence() < 0.05) {
     return 1.2; // Invalid confidence > 1
   }
-  return Math.round((Math.random() * 0.4 + 0.6) * 100) / 100; // 0.6-1.0 range
+  return Math.round((random.confidence() * 0.4 + 0.6) * 100) / 100; // 0.6-1.0 range
 }
 
 function broadcastJobUpdate(job) {
   const update = {
     jobId: job.jobId,
     status: job.status,
-    timestamp: new Date().toISOString()
+    timestamp: clock.iso()
   };
+  // Every status change is broadcast, so this is where it is stamped
+  job.updatedAt = update.timestamp;
+  job.version++;
   
-  wsConnections.forEach((ws, userId) => {
-    if (ws.readyState === WebSocket.OPEN) {
-      ws.send(JSON.stringify(update));
-    }
-  });
+  // Serialized once and shared by the owner's sockets and SSE streams
+  const data = JSON.stringify(update);
+  const sockets = wsConnections.get(job.userId);
+  if (sockets) {
+    sockets.forEach(ws => {
+      if (ws.readyState === WebSocket.OPEN) {
+        ws.send(data);
+      }
+    });
+  }
+
+  publishJobEvent(job.userId, data);
+  wakeJobWaiters(job);
 }
 
-function checkAIMLRateLimit(ip) {
-  const now = Date.now();
-  const windowStart = now - 60000; // 1 minute window
-  
-  if (!aimlRateLimit.has(ip)) {
-    aimlRateLimit.set(ip, []);
+// Long-polls parked on a job: jobId -> Set of wake(job) callbacks. Woken by
+// broadcastJobUpdate, so a held request answers on the same status change
+// the sockets see; each callback removes itself once it has answered.
+const jobWaiters = new Map();
+
+const LONG_POLL_CONDITIONS = {
+  terminal: (job) => job.status === 'done' || job.status === 'failed',
+  change: (job, initial) => job.status !== initial
+};
+
+function addJobWaiter(jobId, wake) {
+  let waiters = jobWaiters.get(jobId);
+  if (!waiters) {
+    waiters = new Set();
+    jobWaiters.set(jobId, waiters);
   }
-  
-  const requests = aimlRateLimit.get(ip);
-  const recentRequests = requests.filter(timestamp => timestamp > windowStart);
-  
-  if (recentRequests.length >= AIML_RATE_LIMIT) {
-    return false;
+  waiters.add(wake);
+}
+
+function removeJobWaiter(jobId, wake) {
+  const waiters = jobWaiters.get(jobId);
+  if (waiters && waiters.delete(wake) && waiters.size === 0) {
+    jobWaiters.delete(jobId);
+  }
+}
+
+function wakeJobWaiters(job) {
+  const waiters = jobWaiters.get(job.jobId);
+  if (waiters) {
+    waiters.forEach(wake => wake(job));
+  }
+}
+
+function publishJobEvent(userId, data) {
+  const id = ++sseEventId;
+  const frame = `id: ${id}\ndata: ${data}\n\n`;
+
+  let replay = sseReplay.get(userId);
+  if (!replay) {
+    replay = { events: [], evictedId: 0 };
+    sseReplay.set(userId, replay);
+  }
+  replay.events.push({ id, frame });
+  if (replay.events.length > SSE_REPLAY_LIMIT) {
+    replay.evictedId = replay.events.shift().id;
+  }
+
+  const clients = sseClients.get(userId);
+  if (clients) {
+    clients.forEach(res => res.write(frame));
   }
-  
-  recentRequests.push(now);
-  aimlRateLimit.set(ip, recentRequests);
-  return true;
 }
 
 // Routes
@@ -226,67 +1103,243 @@ app.post('/api/v1/auth/login', (req, res) => {
   });
 });
 
-app.post('/api/v1/auth/logout', verifyToken, (req, res) => {
+app.post('/api/v1/auth/logout', verifyToken, userRateLimit('api'), (req, res) => {
   res.json({ message: 'Logout successful' });
 });
 
 // Question & Answer API
-app.post('/api/v1/qa', verifyToken, (req, res) => {
-  const { question, company } = req.body;
-  
+// Shared by single and batch submission: { status, error } or null if valid
+function validateQuestion(item) {
+  const { question, company } = item || {};
   if (!question || !company) {
-    return res.status(400).json({ error: 'Question and company are required' });
-  }
-  
-  if (question.length === 0) {
-    return res.status(400).json({ error: 'Question cannot be empty' });
+    return { status: 400, error: 'Question and company are required' };
   }
-  
   if (question.length > 10000) {
-    return res.status(413).json({ error: 'Question too long - maximum 10,000 characters' });
+    return { status: 413, error: 'Question too long - maximum 10,000 characters' };
   }
-  
+  return null;
+}
+
+function refuseFullQueue(res) {
+  const retryAfter = Math.max(1, Math.ceil(scheduler.refuse() / 1000));
+  res.set('Retry-After', String(retryAfter));
+  return res.status(503).json({ error: 'Service Unavailable - job queue is full', retryAfter });
+}
+
+// Stores a queued job and returns it with the scheduler run that processes
+// it. A job with a cached answer is done at once and has no run.
+function createJob({ question, company }, userId, cached = null) {
   const jobId = uuidv4();
   const job = {
     jobId,
     question,
     company,
     status: 'queued',
-    submittedAt: new Date().toISOString(),
-    userId: req.user.userId
+    submittedAt: clock.iso(),
+    userId
   };
+  job.updatedAt = job.submittedAt;
+  job.version = 1; // bumped on every status change; the job's ETag
+  jobs.set(job);
+
+  if (cached) {
+    // The cache is shared, but job ids are not: only the owner learns which job answered
+    const cachedFrom = { answeredAt: cached.answeredAt };
+    if (cached.userId === userId) {
+      cachedFrom.jobId = cached.jobId;
+    }
+    completeJob(job, {
+      answer: cached.answer,
+      confidence: cached.confidence,
+      source: 'cache',
+      cachedFrom
+    });
+    jobs.finish(job);
+    broadcastJobUpdate(job);
+    return { job, run: null };
+  }
+  return { job, run: done => simulateAIMLProcessing(jobId, done) };
+}
+
+app.post('/api/v1/qa', verifyToken, userRateLimit('api'), (req, res) => {
+  const invalid = validateQuestion(req.body);
+  if (invalid) {
+    return res.status(invalid.status).json({ error: invalid.error });
+  }
+
+  // A cached answer needs no worker, so it is served even when the queue is full
+  const cached = answerCache.peek(req.body);
+  if (!cached && scheduler.full) {
+    return refuseFullQueue(res);
+  }
+  answerCache.record(req.body, cached);
   
-  jobs.set(jobId, job);
+  const { job, run } = createJob(req.body, req.user.userId, cached);
   
-  // Start processing simulation
-  simulateAIMLProcessing(jobId);
+  // Queue for an AIML worker
+  if (run) {
+    scheduler.submit(run);
+  }
   
   res.status(202).json({
-    jobId,
-    status: 'queued',
+    jobId: job.jobId,
+    status: job.status,
     submittedAt: job.submittedAt
   });
 });
 
-app.get('/api/v1/qa/:jobId', verifyToken, (req, res) => {
-  const { jobId } = req.params;
-  
-  // Validate UUID format
-  const uuidRegex = /^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$/i;
-  if (!uuidRegex.test(jobId)) {
+// Batch submission: one token check, body parse and rate-limit hit for up to
+// QA_BATCH_MAX items. Invalid items get an error in their slot; the valid
+// ones are queued together, or not at all if the queue cannot take them all.
+app.post('/api/v1/qa/batch', verifyToken, userRateLimit('api'), (req, res) => {
+  const { items } = req.body || {};
+  if (!Array.isArray(items) || items.length === 0 || items.length > QA_BATCH_MAX) {
+    return res.status(400).json({ error: `items must be an array of 1 to ${QA_BATCH_MAX} questions` });
+  }
+
+  const checks = items.map(validateQuestion);
+  const valid = items.filter((item, index) => !checks[index]);
+  if (valid.length === 0) {
+    return res.status(400).json({
+      error: 'No valid items in batch',
+      results: checks.map(({ status, error }) => ({ statusCode: status, error }))
+    });
+  }
+
+  const cached = valid.map(item => answerCache.peek(item));
+  if (!scheduler.accepts(cached.filter(entry => !entry).length)) {
+    return refuseFullQueue(res);
+  }
+  valid.forEach((item, index) => answerCache.record(item, cached[index]));
+
+  const created = valid.map((item, index) => createJob(item, req.user.userId, cached[index]));
+  scheduler.submitAll(created.filter(({ run }) => run).map(({ run }) => run));
+
+  let next = 0;
+  const results = checks.map(invalid => {
+    if (invalid) {
+      return { statusCode: invalid.status, error: invalid.error };
+    }
+    const { job } = created[next++];
+    return { jobId: job.jobId, status: job.status, submittedAt: job.submittedAt };
+  });
+  res.status(202).json({ accepted: valid.length, rejected: items.length - valid.length, results });
+});
+
+// Job status stream (SSE). EventSource cannot set headers, so the token may
+// also come from the query string. Registered before /qa/:jobId.
+app.get('/api/v1/qa/stream', (req, res) => {
+  const authHeader = req.headers.authorization;
+  const token = req.query.token ||
+    (authHeader && authHeader.startsWith('Bearer ') ? authHeader.substring(7) : null);
+
+  if (!token) {
+    return res.status(401).json({ error: 'Unauthorized - No token provided' });
+  }
+
+  let user;
+  try {
+    user = decodeToken(token);
+  } catch (error) {
+    return res.status(401).json({ error: 'Unauthorized - Invalid token' });
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  res.write(`retry: ${SSE_RETRY_MS}\n\n`);
+
+  const lastEventId = parseInt(req.headers['last-event-id'] || req.query.lastEventId, 10);
+  if (!Number.isNaN(lastEventId)) {
+    const replay = sseReplay.get(user.userId) || { events: [], evictedId: 0 };
+    // Events were dropped since the client's last one, or the server restarted
+    if (lastEventId < replay.evictedId || lastEventId > sseEventId) {
+      res.write(`event: reset\ndata: ${JSON.stringify({ lastEventId: sseEventId })}\n\n`);
+    }
+    replay.events.forEach(event => {
+      if (event.id > lastEventId) {
+        res.write(event.frame);
+      }
+    });
+  }
+
+  if (!sseClients.has(user.userId)) {
+    sseClients.set(user.userId, new Set());
+  }
+  sseClients.get(user.userId).add(res);
+
+  const heartbeat = setInterval(() => res.write(': ping\n\n'), SSE_HEARTBEAT_MS);
+  req.on('close', () => {
+    clearInterval(heartbeat);
+    const clients = sseClients.get(user.userId);
+    clients.delete(res);
+    if (clients.size === 0) {
+      sseClients.delete(user.userId);
+    }
+  });
+});
+
+// Multi-job status: one token check and rate-limit hit for many jobs.
+// `changedSince` (normally the previous response's asOf) leaves out jobs
+// whose status has not changed since; evicted and unknown ids are always
+// listed, in `evicted` and `missing`. Registered before /qa/:jobId.
+// Other users' jobs are reported as missing, exactly like unknown ids
+function jobStatusQuery(res, userId, rawIds, changedSince, maxIds) {
+  const ids = [...new Set(Array.isArray(rawIds) ? rawIds : [])];
+  if (ids.length === 0 || ids.length > maxIds) {
+    return res.status(400).json({ error: `ids must list 1 to ${maxIds} job IDs` });
+  }
+  if (!ids.every(id => typeof id === 'string' && JOB_ID_PATTERN.test(id))) {
     return res.status(400).json({ error: 'Invalid job ID format' });
   }
-  
-  const job = jobs.get(jobId);
-  
-  if (!job) {
-    return res.status(404).json({ error: 'Job not found' });
+
+  let since = null;
+  if (changedSince !== undefined) {
+    since = Date.parse(changedSince);
+    if (Number.isNaN(since)) {
+      return res.status(400).json({ error: 'changedSince must be an ISO 8601 timestamp' });
+    }
   }
-  
+
+  const asOf = clock.iso();
+  const found = [];
+  const evicted = [];
+  const missing = [];
+  for (const jobId of ids) {
+    const job = jobs.get(jobId, userId);
+    if (job) {
+      // Inclusive, so a change in the same millisecond as asOf is not lost
+      if (since === null || Date.parse(job.updatedAt) >= since) {
+        found.push(jobStatusBody(job));
+      }
+    } else if (jobs.evicted(jobId, userId)) {
+      evicted.push({ jobId, status: 'evicted', error: 'Job expired and was removed from the job store' });
+    } else {
+      missing.push(jobId);
+    }
+  }
+  res.json({ asOf, jobs: found, evicted, missing });
+}
+
+app.get('/api/v1/qa/status', verifyToken, userRateLimit('api'), (req, res) => {
+  const ids = [].concat(req.query.ids || []).join(',').split(',').filter(Boolean);
+  jobStatusQuery(res, req.user.userId, ids, req.query.changedSince, STATUS_QUERY_GET_MAX);
+});
+
+app.post('/api/v1/qa/status', verifyToken, userRateLimit('api'), (req, res) => {
+  const { ids, changedSince } = req.body || {};
+  jobStatusQuery(res, req.user.userId, ids, changedSince, STATUS_QUERY_POST_MAX);
+});
+
+function jobStatusBody(job) {
   const response = {
     jobId: job.jobId,
     status: job.status,
-    submittedAt: job.submittedAt
+    submittedAt: job.submittedAt,
+    updatedAt: job.updatedAt
   };
   
   if (job.completedAt) {
@@ -300,19 +1353,133 @@ app.get('/api/v1/qa/:jobId', verifyToken, (req, res) => {
   if (job.error) {
     response.error = job.error;
   }
+
+  if (job.aimlAttempts) {
+    response.aimlAttempts = job.aimlAttempts;
+  }
+  
+  return response;
+}
+
+// Strong ETags from version counters: a matching If-None-Match gets a 304
+// before the body is built or serialized
+function notModified(req, res, etag) {
+  res.set('ETag', etag);
+  const header = req.headers['if-none-match'];
+  if (!header) return false;
+  const match = header.trim() === '*' ||
+    header.split(',').some(tag => tag.trim().replace(/^W\//, '') === etag);
+  if (match) {
+    res.status(304).end();
+  }
+  return match;
+}
+
+// Another user's job gets the same 404 as one that never existed
+function sendJobStatus(req, res, jobId) {
+  const job = jobs.get(jobId, req.user.userId);
+  
+  if (!job) {
+    if (jobs.evicted(jobId, req.user.userId)) {
+      return res.status(410).json({
+        jobId,
+        status: 'evicted',
+        error: 'Job expired and was removed from the job store'
+      });
+    }
+    return res.status(404).json({ error: 'Job not found' });
+  }
+
+  if (notModified(req, res, `"j${job.version}"`)) return;
+  res.json(jobStatusBody(job));
+}
+
+// With ?waitFor=terminal (until done/failed) or ?waitFor=change (until the
+// status moves on from the current one) the request is held for up to
+// `timeout` seconds; on timeout it answers with the status as it is then.
+app.get('/api/v1/qa/:jobId', verifyToken, userRateLimit('api'), (req, res) => {
+  const { jobId } = req.params;
   
-  res.json(response);
+  // Validate UUID format
+  if (!JOB_ID_PATTERN.test(jobId)) {
+    return res.status(400).json({ error: 'Invalid job ID format' });
+  }
+
+  const { waitFor } = req.query;
+  if (waitFor === undefined) {
+    return sendJobStatus(req, res, jobId);
+  }
+
+  const ready = LONG_POLL_CONDITIONS[waitFor];
+  if (!ready) {
+    return res.status(400).json({ error: "waitFor must be 'terminal' or 'change'" });
+  }
+  const timeout = req.query.timeout === undefined ? LONG_POLL_DEFAULT_SECONDS : Number(req.query.timeout);
+  if (!Number.isInteger(timeout) || timeout < 1 || timeout > LONG_POLL_MAX_SECONDS) {
+    return res.status(400).json({ error: `timeout must be an integer between 1 and ${LONG_POLL_MAX_SECONDS}` });
+  }
+
+  const job = jobs.peek(jobId);
+  if (!job || job.userId !== req.user.userId || ready(job, job.status)) {
+    return sendJobStatus(req, res, jobId);
+  }
+
+  const initial = job.status;
+  let answered = false;
+  let timer = null;
+  const stop = () => {
+    answered = true;
+    removeJobWaiter(jobId, wake);
+    clock.clearTimeout(timer);
+  };
+  const answer = () => {
+    if (answered) return;
+    stop();
+    sendJobStatus(req, res, jobId);
+  };
+  const wake = (updated) => {
+    if (ready(updated, initial)) answer();
+  };
+
+  addJobWaiter(jobId, wake);
+  timer = clock.setTimeout(answer, timeout * 1000);
+  res.on('close', () => {
+    // Client went away first: just stop listening
+    if (!answered) stop();
+  });
 });
 
-app.get('/api/v1/qa', verifyToken, (req, res) => {
-  const userAnswers = answers.filter(answer => true); // In real app, filter by user
+app.get('/api/v1/qa', verifyToken, userRateLimit('api'), (req, res) => {
+  const limit = req.query.limit === undefined ? ANSWER_PAGE_SIZE : Number(req.query.limit);
+  if (!Number.isInteger(limit) || limit < 1 || limit > ANSWER_PAGE_SIZE) {
+    return res.status(400).json({ error: `limit must be an integer between 1 and ${ANSWER_PAGE_SIZE}` });
+  }
+
+  let before;
+  if (req.query.cursor !== undefined) {
+    before = decodeCursor(String(req.query.cursor));
+    if (before === null) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
+  }
+
+  // The history's answer count versions every page of it; pages differ per user
+  const history = answerHistories.get(req.user.userId);
+  res.vary('Authorization');
+  if (notModified(req, res, `"h${history ? history.total : 0}"`)) return;
+  if (!history) {
+    return res.json({ answers: [], nextCursor: null });
+  }
+  const { answers, next } = history.page(limit, before);
   res.json({
-    answers: userAnswers.slice(0, 10)
+    answers,
+    nextCursor: next === null ? null : encodeCursor(next)
   });
 });
 
 // File Upload API
-app.post('/api/v1/admin/companies/upload', verifyToken, requireAdmin, upload.single('file'), (req, res) => {
+app.post('/api/v1/admin/companies/upload', verifyToken, userRateLimit('api'), requireAdmin, userRateLimit('upload'),
+  upload.single('file'), (req, res) => {
   if (!req.file) {
     return res.status(400).json({ error: 'No file uploaded' });
   }
@@ -357,33 +1524,130 @@ app.post('/api/v1/admin/companies/upload', verifyToken, requireAdmin, upload.sin
 
 // AIML Service
 app.post('/aiml/answer', (req, res) => {
-  const { question, company } = req.body;
-  
-  if (!question || !company) {
-    return res.status(400).json({ error: 'Question and company are required' });
-  }
-  
-  // Check rate limit
   const clientIp = req.ip || req.connection.remoteAddress;
-  if (!checkAIMLRateLimit(clientIp)) {
-    return res.status(429).json({ 
-      error: 'Too Many Requests - Rate limit exceeded',
-      retryAfter: 60
-    });
+  aimlService(req.body, rateLimits.aiml, clientIp, (status, payload, rateLimit) => {
+    if (rateLimit) {
+      setRateLimitHeaders(res, rateLimit);
+    }
+    res.status(status).json(payload);
+  });
+});
+
+// Virtual clock controls (mock server only, no auth so they work with expired tokens)
+function clockState() {
+  return {
+    now: clock.iso(),
+    scale: clock.scale,
+    pendingTimers: clock.timers.length
+  };
+}
+
+app.get('/mock/clock', (req, res) => {
+  res.json(clockState());
+});
+
+app.put('/mock/clock', (req, res) => {
+  const { scale } = req.body;
+  if (typeof scale !== 'number' || !(scale >= 0)) {
+    return res.status(400).json({ error: 'scale must be a non-negative number' });
   }
-  
-  // Simulate occasional server errors
-  if (Math.random() < 0.05) {
-    return res.status(500).json({ error: 'Internal server error' });
+  clock.setScale(scale);
+  res.json(clockState());
+});
+
+app.post('/mock/clock/advance', (req, res) => {
+  const { seconds } = req.body;
+  if (typeof seconds !== 'number' || !(seconds >= 0)) {
+    return res.status(400).json({ error: 'seconds must be a non-negative number' });
   }
-  
-  // Simulate processing time
-  setTimeout(() => {
-    res.json({
-      answer: generateAnswer(question, company),
-      confidence: generateConfidence()
-    });
-  }, Math.random() * 1000 + 500); // 0.5-1.5 second response
+  clock.advance(seconds * 1000);
+  res.json(clockState());
+});
+
+// Store statistics (mock server only)
+app.get('/mock/stats', (req, res) => {
+  res.json({
+    jobs: jobs.stats(),
+    scheduler: scheduler.stats(),
+    answerCache: answerCache.stats(),
+    rateLimits: rateLimitState(),
+    heapUsedBytes: process.memoryUsage().heapUsed
+  });
+});
+
+// Job scheduler controls (mock server only). Shrinking the pool lets running
+// jobs finish; growing it starts queued jobs right away.
+app.get('/mock/scheduler', (req, res) => {
+  res.json(scheduler.stats());
+});
+
+app.put('/mock/scheduler', (req, res) => {
+  const { workers, maxQueue } = req.body || {};
+  for (const value of [workers, maxQueue]) {
+    if (value !== undefined && !(Number.isInteger(value) && value >= 1)) {
+      return res.status(400).json({ error: 'workers and maxQueue must be positive integers' });
+    }
+  }
+  scheduler.resize({ workers, maxQueue });
+  res.json(scheduler.stats());
+});
+
+// Rate limit controls (mock server only). PUT replaces the named limiters,
+// which also resets their counts: {"api": {"limit": 1000, "windowSeconds": 60}}
+function rateLimitState() {
+  return Object.fromEntries(Object.entries(rateLimits).map(([name, limiter]) => [name, limiter.stats()]));
+}
+
+app.get('/mock/rate-limits', (req, res) => {
+  res.json(rateLimitState());
+});
+
+app.put('/mock/rate-limits', (req, res) => {
+  const updates = Object.entries(req.body || {});
+  for (const [name, value] of updates) {
+    if (!(name in rateLimits)) {
+      return res.status(400).json({ error: `Unknown rate limit: ${name}` });
+    }
+    const { limit, windowSeconds } = value || {};
+    const validWindow = windowSeconds === undefined || (typeof windowSeconds === 'number' && windowSeconds > 0);
+    if (!Number.isInteger(limit) || limit < 1 || !validWindow) {
+      return res.status(400).json({ error: 'limit must be a positive integer and windowSeconds positive' });
+    }
+  }
+  for (const [name, { limit, windowSeconds }] of updates) {
+    const windowMs = windowSeconds === undefined ? rateLimits[name].windowMs : windowSeconds * 1000;
+    rateLimits[name] = new SlidingWindowLimiter({ limit, windowMs });
+  }
+  res.json(rateLimitState());
+});
+
+// Answer cache controls (mock server only). PUT replaces the cache, which
+// also clears its entries and counters; {"maxEntries": 0} turns it off.
+app.get('/mock/answer-cache', (req, res) => {
+  res.json(answerCache.stats());
+});
+
+app.put('/mock/answer-cache', (req, res) => {
+  const { maxEntries = answerCache.maxEntries, ttlSeconds = answerCache.ttlMs / 1000 } = req.body || {};
+  if (!Number.isInteger(maxEntries) || maxEntries < 0 || typeof ttlSeconds !== 'number' || !(ttlSeconds > 0)) {
+    return res.status(400).json({ error: 'maxEntries must be a non-negative integer and ttlSeconds positive' });
+  }
+  answerCache = new AnswerCache({ maxEntries, ttlMs: ttlSeconds * 1000 });
+  res.json(answerCache.stats());
+});
+
+// Random seed controls (mock server only)
+app.get('/mock/seed', (req, res) => {
+  res.json({ seed: randomSeed, streams: RANDOM_STREAMS });
+});
+
+app.put('/mock/seed', (req, res) => {
+  const { seed } = req.body;
+  if (typeof seed !== 'string' && typeof seed !== 'number') {
+    return res.status(400).json({ error: 'seed must be a string or number' });
+  }
+  seedRandom(seed);
+  res.json({ seed: randomSeed, streams: RANDOM_STREAMS });
 });
 
 // WebSocket handling
@@ -395,8 +1659,8 @@ wss.on('connection', (ws, req) => {
       const data = JSON.parse(message);
       if (data.type === 'auth' && data.token) {
         try {
-          const decoded = jwt.verify(data.token, JWT_SECRET);
-          wsConnections.set(decoded.userId, ws);
+          const decoded = decodeToken(data.token);
+          addWsConnection(decoded.userId, ws);
           ws.send(JSON.stringify({ type: 'auth', status: 'success' }));
         } catch (error) {
           ws.send(JSON.stringify({ type: 'auth', status: 'error', message: 'Invalid token' }));
@@ -408,13 +1672,7 @@ wss.on('connection', (ws, req) => {
   });
   
   ws.on('close', () => {
-    // Remove connection from map
-    for (const [userId, connection] of wsConnections.entries()) {
-      if (connection === ws) {
-        wsConnections.delete(userId);
-        break;
-      }
-    }
+    removeWsConnection(ws);
     console.log('WebSocket connection closed');
   });
 });
@@ -434,10 +1692,15 @@ app.use((req, res) => {
 });
 
 // Start server
+// PORT=0 binds an ephemeral port; log the one actually assigned
 server.listen(PORT, () => {
-  console.log(`🚀 Mock API Server running on http://localhost:${PORT}`);
+  const { port } = server.address();
+  console.log(`🚀 Mock API Server running on http://localhost:${port}`);
   console.log(`📚 API Documentation: Check docs/api-reference.md`);
-  console.log(`🔧 WebSocket endpoint: ws://localhost:${PORT}`);
+  console.log(`🔧 WebSocket endpoint: ws://localhost:${port}`);
+  console.log(`📡 SSE endpoint: http://localhost:${port}/api/v1/qa/stream?token=<jwt>`);
+  console.log(`⏱️  Clock scale: ${clock.scale}x (PUT /mock/clock, POST /mock/clock/advance)`);
+  console.log(`🎲 Random seed: ${randomSeed} (RANDOM_SEED, PUT /mock/seed)`);
   console.log(`👤 Test Users:`);
   console.log(`   Analyst: analyst@test.com / TestPass123!`);
   console.log(`   Admin: admin@test.com / AdminPass123!`);
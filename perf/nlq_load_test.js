@@ -1,16 +1,20 @@
 import http from 'k6/http';
 import { check, sleep } from 'k6';
-import { Rate, Trend } from 'k6/metrics';
+import { Counter, Rate, Trend } from 'k6/metrics';
 
 // Custom metrics
 const errorRate = new Rate('errors');
 const qaSubmissionTime = new Trend('qa_submission_time');
 const jobStatusTime = new Trend('job_status_time');
+const throttled = new Counter('throttled'); // 429s from rate limits, 503s from a full job queue
+const cachedAnswers = new Rate('cached_answers'); // jobs done on submission from the answer cache
 
 // Configuration
 const BASE_URL = __ENV.BASE_URL || 'http://localhost:3001';
 const ANALYST_EMAIL = __ENV.ANALYST_EMAIL || 'analyst@test.com';
 const ANALYST_PASSWORD = __ENV.ANALYST_PASSWORD || 'TestPass123!';
+const BATCH_SIZE = parseInt(__ENV.BATCH_SIZE || '1', 10); // >1: submit through POST /api/v1/qa/batch
+const STATUS_QUERY = __ENV.STATUS_QUERY || 'single'; // 'multi': poll every recent job through /api/v1/qa/status
 
 // Test configuration
 export const options = {
@@ -33,6 +37,7 @@ export const options = {
 // Global variables
 let authToken = '';
 const submittedJobs = [];
+let statusAsOf = null; // asOf of this VU's last multi-job status query
 
 // Test data
 const testQuestions = [
@@ -107,7 +112,24 @@ export default function (data) {
   sleep(Math.random() * 2 + 1); // 1-3 second delay
 }
 
+function rememberJob(jobId) {
+  submittedJobs.push({
+    jobId: jobId,
+    submittedAt: Date.now(),
+  });
+
+  // Keep only recent jobs to avoid memory issues
+  if (submittedJobs.length > 50) {
+    submittedJobs.splice(0, submittedJobs.length - 40);
+  }
+}
+
 function testQuestionSubmission(headers) {
+  if (BATCH_SIZE > 1) {
+    testBatchSubmission(headers);
+    return;
+  }
+
   const question = testQuestions[Math.floor(Math.random() * testQuestions.length)];
   const company = testCompanies[Math.floor(Math.random() * testCompanies.length)];
   
@@ -122,6 +144,7 @@ function testQuestionSubmission(headers) {
 
   // Record custom metrics
   qaSubmissionTime.add(duration);
+  if (response.status === 429 || response.status === 503) throttled.add(1);
   
   const success = check(response, {
     'QA submission status is 202': (r) => r.status === 202,
@@ -136,7 +159,7 @@ function testQuestionSubmission(headers) {
     'QA response has valid status': (r) => {
       if (r.status === 202) {
         const body = JSON.parse(r.body);
-        return body.status === 'queued';
+        return body.status === 'queued' || body.status === 'done';
       }
       return false;
     },
@@ -148,25 +171,65 @@ function testQuestionSubmission(headers) {
   } else {
     errorRate.add(0);
     if (response.status === 202) {
-      const jobId = JSON.parse(response.body).jobId;
-      submittedJobs.push({
-        jobId: jobId,
-        submittedAt: Date.now(),
-      });
-      
-      // Keep only recent jobs to avoid memory issues
-      if (submittedJobs.length > 50) {
-        submittedJobs.splice(0, 10);
-      }
+      const body = JSON.parse(response.body);
+      cachedAnswers.add(body.status === 'done');
+      rememberJob(body.jobId);
     }
   }
 }
 
+function testBatchSubmission(headers) {
+  const items = [];
+  for (let i = 0; i < BATCH_SIZE; i++) {
+    items.push({
+      question: testQuestions[Math.floor(Math.random() * testQuestions.length)],
+      company: testCompanies[Math.floor(Math.random() * testCompanies.length)],
+    });
+  }
+
+  const startTime = Date.now();
+  const response = http.post(`${BASE_URL}/api/v1/qa/batch`, JSON.stringify({ items }), { headers });
+  const duration = Date.now() - startTime;
+
+  // One sample per request: the threshold applies to the batch round trip
+  qaSubmissionTime.add(duration);
+  if (response.status === 429 || response.status === 503) throttled.add(1);
+
+  const success = check(response, {
+    'QA batch status is 202': (r) => r.status === 202,
+    'QA batch response time < 500ms': (r) => duration < 500,
+    'QA batch accepted every item': (r) => {
+      if (r.status === 202) {
+        const body = JSON.parse(r.body);
+        return body.accepted === BATCH_SIZE &&
+          body.results.every(result => result.status === 'queued' || result.status === 'done');
+      }
+      return false;
+    },
+  });
+
+  if (!success) {
+    errorRate.add(1);
+    console.error(`QA batch submission failed: ${response.status} ${response.body}`);
+  } else {
+    errorRate.add(0);
+    JSON.parse(response.body).results.forEach(result => {
+      cachedAnswers.add(result.status === 'done');
+      rememberJob(result.jobId);
+    });
+  }
+}
+
 function testJobStatusCheck(headers) {
   // Check status of a recently submitted job
   const recentJobs = submittedJobs.filter(job => Date.now() - job.submittedAt < 300000); // Last 5 minutes
   
   if (recentJobs.length === 0) return;
+
+  if (STATUS_QUERY === 'multi') {
+    testMultiJobStatusCheck(headers, recentJobs);
+    return;
+  }
   
   const randomJob = recentJobs[Math.floor(Math.random() * recentJobs.length)];
   
@@ -176,6 +239,7 @@ function testJobStatusCheck(headers) {
 
   // Record custom metrics
   jobStatusTime.add(duration);
+  if (response.status === 429 || response.status === 503) throttled.add(1);
 
   const success = check(response, {
     'Job status check is 200': (r) => r.status === 200,
@@ -204,8 +268,45 @@ function testJobStatusCheck(headers) {
   }
 }
 
+function testMultiJobStatusCheck(headers, recentJobs) {
+  // One request for every recent job; after the first poll only jobs that moved come back
+  const ids = recentJobs.map(job => job.jobId).join(',');
+  const since = statusAsOf ? `&changedSince=${encodeURIComponent(statusAsOf)}` : '';
+
+  const startTime = Date.now();
+  const response = http.get(`${BASE_URL}/api/v1/qa/status?ids=${ids}${since}`, {
+    headers,
+    tags: { name: `${BASE_URL}/api/v1/qa/status` },
+  });
+  const duration = Date.now() - startTime;
+
+  jobStatusTime.add(duration);
+  if (response.status === 429 || response.status === 503) throttled.add(1);
+
+  const success = check(response, {
+    'Job status query is 200': (r) => r.status === 200,
+    'Job status query response time < 200ms': (r) => duration < 200,
+    'Job status query has valid statuses': (r) => {
+      if (r.status === 200) {
+        const body = JSON.parse(r.body);
+        return body.jobs.every(job => ['queued', 'running', 'done', 'failed'].includes(job.status));
+      }
+      return false;
+    },
+  });
+
+  if (!success) {
+    errorRate.add(1);
+    console.error(`Job status query failed: ${response.status} ${response.body}`);
+  } else {
+    errorRate.add(0);
+    statusAsOf = JSON.parse(response.body).asOf;
+  }
+}
+
 function testGetRecentAnswers(headers) {
   const response = http.get(`${BASE_URL}/api/v1/qa`, { headers });
+  if (response.status === 429 || response.status === 503) throttled.add(1);
 
   const success = check(response, {
     'Get recent answers status is 200': (r) => r.status === 200,